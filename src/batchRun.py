@@ -0,0 +1,112 @@
+"""
+Runs the physics simulations without a window so that they can be used for long parameter studies, e.g.:
+    python batchRun.py solar --steps 10000 --count 500 --seed 1 --output solar.npz
+The final state of the simulation is written to the output file (.npz or .csv) and the timings are printed and, if '--timing' is
+given, written to a JSON file. With '--record' every step is also written to a trajectory file that can be replayed with 
+'trajectory.py'.
+"""
+import argparse
+import csv
+import json
+import random
+import time
+import numpy as np
+import integrators
+import physics
+import trajectory
+
+# The 'SYSTEMS' dictionary maps the name used on the command line to a function that creates a headless simulation with the given
+# number of bodies/particles and any extra keyword arguments.
+SYSTEMS = {
+    "solar": lambda count, **options: physics.SolarSystem(None, body_num=count, **options),
+    "nbody": lambda count, **options: physics.NBodySystem(None, body_num=count, **options),
+    "particles": lambda count, **options: physics.PointParticleSystem(None, count, **options),
+}
+
+
+def run_batch(system_name: str, steps: int, count: int, seed: int, record=None, keyframe_interval=1, **options):
+    """
+    Creates the chosen simulation with the random number generator seeded by 'seed' (so that the same arguments always give the
+    same run) and steps it 'steps' times. If 'record' is a file path then the run is recorded to it as a trajectory, with a frame
+    every 'keyframe_interval' steps. Returns the simulation object and a dictionary of timings in seconds.
+    """
+    if system_name not in SYSTEMS:
+        raise ValueError(f"Unknown system '{system_name}', choose from {list(SYSTEMS)}")
+
+    random.seed(seed)
+    start = time.perf_counter()
+    system = SYSTEMS[system_name](count, **options)
+    recorder = trajectory.TrajectoryRecorder(record, system, steps, keyframe_interval) if record else None
+    setup_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for step in range(steps):
+        system.step()
+        if recorder:
+            recorder.record(system)
+    run_time = time.perf_counter() - start
+    if recorder:
+        recorder.close()
+
+    timing = {"system": system_name, "steps": steps, "count": count, "seed": seed, "setup_seconds": setup_time,
+              "run_seconds": run_time, "seconds_per_step": run_time / steps if steps else 0.0}
+    return system, timing
+
+
+def write_state(state: dict, path: str) -> None:
+    """
+    Writes a dictionary of equal length arrays to a '.npz' file, or to a '.csv' file with one column per array.
+    """
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(list(state))
+            writer.writerows(zip(*[values.tolist() for values in state.values()]))
+    else:
+        np.savez(path, **state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a physics simulation without a window.")
+    parser.add_argument("system", choices=list(SYSTEMS))
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--count", type=int, default=500, help="number of bodies or particles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="state.npz", help="file for the final state (.npz or .csv)")
+    parser.add_argument("--timing", help="optional JSON file for the timings")
+    parser.add_argument("--legacy", action="store_true", help="use the original one-object-per-body code paths")
+    parser.add_argument("--vectorised", action="store_true",
+                        help="move the particles as NumPy arrays, faster but with collisions in a different order")
+    parser.add_argument("--record", help="optional trajectory file to record every step to")
+    parser.add_argument("--keyframe-interval", type=int, default=1, help="steps between recorded frames")
+    parser.add_argument("--integrator", choices=list(integrators.INTEGRATORS), help="integrator for the solar system")
+    parser.add_argument("--dt", type=float, help="time step for the solar system")
+    parser.add_argument("--adaptive", action="store_true", help="give each solar body its own power of two fraction of dt")
+    args = parser.parse_args()
+
+    options = {}
+    if args.legacy and args.system == "solar":
+        options["vectorised"] = False
+    elif args.legacy and args.system == "particles":
+        options["broad_phase"] = False
+    if args.system == "particles" and args.vectorised:
+        options["vectorised"] = True
+    if args.system == "solar" and args.integrator:
+        options["integrator"] = args.integrator
+    if args.system == "solar" and args.dt:
+        options["dt"] = args.dt
+    if args.system == "solar" and args.adaptive:
+        options["adaptive"] = True
+
+    system, timing = run_batch(args.system, args.steps, args.count, args.seed, args.record, args.keyframe_interval, **options)
+    write_state(system.get_state(), args.output)
+
+    print(f"{args.system}: {args.count} bodies, {args.steps} steps in {timing['run_seconds']:.3f} s "
+          f"({timing['seconds_per_step'] * 1000:.3f} ms per step, setup {timing['setup_seconds']:.3f} s)")
+    if args.timing:
+        with open(args.timing, "w") as file:
+            json.dump(timing, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Solves a whole worksheet of SUVAT problems from a CSV file without a window, e.g.:
+    python batchSuvat.py worksheet.csv --output answers.csv --places 2
+The CSV file needs a column for each of s, u, v, a and t (any other columns, e.g. a question number, are kept as they are). Each
+row is one problem, written in the same way as in the General SUVAT Solver: the missing variable is 'X', the variable to be worked
+out is '?' and the other three are numbers. The answers are written into the '?' cells of the output file, and a cell is left
+empty if the problem has no real answer.
+"""
+import argparse
+import csv
+import time
+import numpy as np
+import suvat
+
+
+def read_problems(path: str) -> tuple:
+    """
+    Reads a CSV file of problems and returns (rows, missing, unknown, values), where 'rows' is the list of the file's rows as
+    dictionaries, 'missing' and 'unknown' are lists of variable names and 'values' is an (n, 5) array for 'suvat.solve_many'.
+    """
+    with open(path, newline="") as file:
+        rows = list(csv.DictReader(file))
+    if rows and any(name not in rows[0] for name in suvat.VARIABLE_NAMES):
+        raise ValueError(f"'{path}' needs a column for each of {suvat.VARIABLE_NAMES}")
+
+    missing, unknown = [], []
+    values = np.full((len(rows), len(suvat.VARIABLE_NAMES)), np.nan)
+    for i, row in enumerate(rows):
+        cells = [row[name].strip() for name in suvat.VARIABLE_NAMES]
+        if cells.count("X") != 1 or cells.count("?") != 1:
+            raise ValueError(f"Row {i + 1} of '{path}' should have exactly one 'X' and one '?', not {cells}")
+        missing.append(suvat.VARIABLE_NAMES[cells.index("X")])
+        unknown.append(suvat.VARIABLE_NAMES[cells.index("?")])
+        values[i] = [float(cell) if cell not in ("X", "?") else np.nan for cell in cells]
+    return rows, missing, unknown, values
+
+
+def write_answers(path: str, rows: list, unknown: list, answers: np.ndarray, places=None) -> None:
+    """
+    Writes the rows back to a CSV file with each answer in its '?' cell, rounded to 'places' decimal places if it is given.
+    """
+    columns = list(rows[0]) if rows else suvat.VARIABLE_NAMES
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, columns)
+        writer.writeheader()
+        for row, name, answer in zip(rows, unknown, answers.tolist()):
+            if answer != answer:
+                row[name] = ""
+            else:
+                row[name] = round(answer, places) if places is not None else answer
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a CSV file of SUVAT problems.")
+    parser.add_argument("problems", help="CSV file with s, u, v, a and t columns, 'X' for the missing and '?' for the unknown")
+    parser.add_argument("--output", default="answers.csv", help="CSV file for the problems with their answers")
+    parser.add_argument("--places", type=int, help="decimal places to round the answers to")
+    args = parser.parse_args()
+
+    rows, missing, unknown, values = read_problems(args.problems)
+    start = time.perf_counter()
+    answers, indexes = suvat.solve_many(missing, unknown, values)
+    solve_time = time.perf_counter() - start
+    write_answers(args.output, rows, unknown, answers, args.places)
+    print(f"{len(rows)} problems solved in {solve_time * 1000:.2f} ms ({int(np.isnan(answers).sum())} with no real answer), "
+          f"answers written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
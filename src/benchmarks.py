@@ -0,0 +1,433 @@
+"""
+Benchmarks for the simulations and widgets in this program. They use SDL's 'dummy' video driver so that they can be run without a
+window, e.g.: 'python benchmarks.py collisions' or 'python benchmarks.py integrators'.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import contextlib
+import json
+import math
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pygame
+import inputDispatcher
+import integrators
+import physics
+import rendering
+import tests
+
+# The default 'Point Particles' screen has 150 particles in a 800 x 650 window. The benchmarks scale the size of the box with the
+# number of particles so that the particles are just as crowded (and collide just as often) at every size.
+DEFAULT_PARTICLE_DENSITY = 150 / (800 * 650)
+
+
+def time_frames(system, frames):
+    """
+    Runs one step of the system and then draws it with 'update_menu', 'frames' times, and returns the mean time per frame in 
+    milliseconds.
+    """
+    start = time.perf_counter()
+    for frame in range(frames):
+        system.step()
+        system.update_menu([])
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def make_particle_system(particle_num, broad_phase, seed, vectorised=False):
+    """
+    Creates a 'PointParticleSystem' on an off-screen surface that is big enough for 'particle_num' particles at the default density.
+    """
+    scale = math.sqrt(particle_num / (DEFAULT_PARTICLE_DENSITY * 800 * 650))
+    surface = pygame.Surface((int(800 * scale), int(650 * scale)))
+    random.seed(seed)
+    return physics.PointParticleSystem(surface, particle_num, broad_phase=broad_phase, vectorised=vectorised)
+
+
+def collision_benchmark(particle_nums, frames=20, pairwise_limit=2000, seed=0):
+    """
+    Times a frame of the 'Point Particles' simulation with and without the spatial hash broad phase for each number of particles.
+    The pairwise check is O(n^2) so it is skipped above 'pairwise_limit' particles. Where both are run, it also checks that they
+    give exactly the same particle positions.
+    """
+    print(f"{'particles':>10} {'pairwise ms':>12} {'grid ms':>10} {'speed up':>9} {'identical':>10}")
+    for particle_num in particle_nums:
+        grid_system = make_particle_system(particle_num, True, seed)
+        grid_ms = time_frames(grid_system, frames)
+
+        if particle_num <= pairwise_limit:
+            pairwise_system = make_particle_system(particle_num, False, seed)
+            pairwise_ms = time_frames(pairwise_system, frames)
+            identical = all((p1.x, p1.y, p1.angle, p1.speed) == (p2.x, p2.y, p2.angle, p2.speed)
+                            for p1, p2 in zip(grid_system.particle_objs, pairwise_system.particle_objs))
+            print(f"{particle_num:>10} {pairwise_ms:>12.2f} {grid_ms:>10.2f} {pairwise_ms / grid_ms:>8.1f}x {str(identical):>10}")
+        else:
+            print(f"{particle_num:>10} {'-':>12} {grid_ms:>10.2f} {'-':>9} {'-':>10}")
+
+
+def time_steps(system, steps):
+    """
+    Runs 'steps' steps of the system without drawing it and returns the mean time per step in milliseconds.
+    """
+    start = time.perf_counter()
+    for step in range(steps):
+        system.step()
+    return (time.perf_counter() - start) / steps * 1000
+
+
+def particle_benchmark(particle_nums, steps=20, seed=0):
+    """
+    Times a step of the 'Point Particles' simulation (moving, bouncing and colliding every particle, without drawing) for the
+    original one-object-per-particle code with the spatial hash and for the vectorised 'PointParticleArrays'.
+    """
+    print(f"{'particles':>10} {'objects ms':>11} {'arrays ms':>10} {'speed up':>9}")
+    for particle_num in particle_nums:
+        objects_ms = time_steps(make_particle_system(particle_num, True, seed), steps)
+        arrays_ms = time_steps(make_particle_system(particle_num, True, seed, vectorised=True), steps)
+        print(f"{particle_num:>10} {objects_ms:>11.2f} {arrays_ms:>10.2f} {objects_ms / arrays_ms:>8.1f}x")
+
+
+def integrator_benchmark(time_steps, simulated_time=2.0, body_num=2000, seed=0):
+    """
+    Runs the same headless solar system for 'simulated_time' with every integrator and time step, and prints the wall-clock time
+    against the median relative change in each planet's energy (see 'SolarSystem.get_energy'). This shows how much larger a time
+    step each integrator can take for the same accuracy as the original semi-implicit Euler with dt = 0.001.
+    """
+    print(f"{'integrator':>20} {'dt':>7} {'steps':>6} {'wall ms':>9} {'ms/step':>8} {'energy drift':>13}")
+    for name in integrators.INTEGRATORS:
+        for dt in time_steps:
+            random.seed(seed)
+            system = physics.SolarSystem(None, body_num=body_num, integrator=name, dt=dt)
+            start_energy = system.get_energy()
+            steps = max(int(round(simulated_time / dt)), 1)
+
+            start = time.perf_counter()
+            for step in range(steps):
+                system.step()
+            wall_ms = (time.perf_counter() - start) * 1000
+
+            drift = np.median(np.abs((system.get_energy() - start_energy) / start_energy))
+            print(f"{name:>20} {dt:>7g} {steps:>6} {wall_ms:>9.1f} {wall_ms / steps:>8.3f} {drift:>13.2e}")
+
+
+def periapsis(system):
+    """
+    Returns an array of how close each planet of a (vectorised) solar system gets to the sun on its current orbit, using the
+    energy and angular momentum of the Kepler orbit. This is the closest pass that an integrator has to get right for the planet.
+    """
+    bodies = system.planet_physics_objs
+    gm = bodies.g * system.sun_mass
+    x, y = bodies.x - 400, bodies.y - 400
+    velocity_x, velocity_y = bodies.momentum_x / bodies.mass, bodies.momentum_y / bodies.mass
+    energy = (velocity_x ** 2 + velocity_y ** 2) / 2 - gm / np.sqrt(x ** 2 + y ** 2)
+    angular_momentum = x * velocity_y - y * velocity_x
+    eccentricity = np.sqrt(np.maximum(1 + 2 * energy * angular_momentum ** 2 / gm ** 2, 0))
+    return angular_momentum ** 2 / (gm * (1 + eccentricity))
+
+
+def adaptive_benchmark(configurations, simulated_time=2.0, body_num=2000, seed=0):
+    """
+    Runs the same headless solar system for 'simulated_time' with each configuration (a dictionary of 'SolarSystem' keyword 
+    arguments) and prints the total number of force calculations, the wall-clock time, the median relative change in each planet's
+    energy and the fraction of planets whose energy changed by more than 1% (these are the planets that passed too close to the sun
+    for their time step). The last fraction is split by each planet's starting periapsis: the close passes (at least 1 pixel from
+    the centre of the sun) that a small enough time step should keep stable, and the passes within a pixel of the point mass,
+    which need a time step so small that none of the configurations here can follow them.
+    """
+    print(f"{'configuration':>58} {'force evaluations':>18} {'wall ms':>9} {'energy drift':>13} {'> 1%':>6} "
+          f"{'rp >= 1':>8} {'rp < 1':>7}")
+    for options in configurations:
+        random.seed(seed)
+        system = physics.SolarSystem(None, body_num=body_num, **options)
+        start_energy = system.get_energy()
+        close = periapsis(system) >= 1
+        steps = max(int(round(simulated_time / system.planet_physics_objs.dt)), 1)
+
+        start = time.perf_counter()
+        for step in range(steps):
+            system.step()
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        drift = np.abs((system.get_energy() - start_energy) / start_energy)
+        unstable = drift > 0.01
+        name = ", ".join(f"{key}={value:g}" if isinstance(value, float) else f"{key}={value}" for key, value in options.items())
+        print(f"{name:>58} {system.planet_physics_objs.force_evaluations:>18} {wall_ms:>9.1f} {np.median(drift):>13.2e} "
+              f"{np.mean(unstable):>6.1%} {np.mean(unstable[close]):>8.1%} {np.mean(unstable[~close]):>7.1%}")
+
+
+# The 'WIDGET_SCENARIOS' dictionary maps a name to each of the button tests in 'tests.py'. Each one returns a list of buttons.
+WIDGET_SCENARIOS = {
+    "button": tests.all_button_stress_test,
+    "v_slider": tests.v_slider_stress_test,
+    "h_slider": tests.h_slider_stress_test,
+    "text_button": tests.text_button_stress_test,
+    "text_input": tests.text_input_test,
+    "text_input_expansion": tests.text_input_test_2,
+    "drop_down": tests.drop_down_test,
+    "all_types": tests.all_button_types_test,
+}
+
+
+def synthetic_input(button_ls, frames, seed=0):
+    """
+    Returns a list of (mouse position, events) for each frame. The mouse moves between points inside the buttons (and sometimes
+    off all of them), and there are clicks on about 1 in 10 frames and key presses (letters and backspace) on about 1 in 4.
+    """
+    rng = random.Random(seed)
+    # The points are picked away from the left edge of each button, a horizontal slider moved so that its centre is half its width
+    # to the left of where it started divides by zero when it works out its value.
+    points = [(rng.randrange(button.pygame_button_object.left + 1, button.pygame_button_object.right),
+               rng.randrange(button.pygame_button_object.top, button.pygame_button_object.bottom)) for button in button_ls]
+    points.append((1, 1))
+    script = []
+    mouse_xy = points[0]
+    for frame in range(frames):
+        if rng.random() < 0.3:
+            mouse_xy = rng.choice(points)
+        events = [pygame.event.Event(pygame.MOUSEMOTION, pos=mouse_xy, rel=(0, 0), buttons=(0, 0, 0))]
+        if rng.random() < 0.1:
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=mouse_xy, button=1))
+            events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=mouse_xy, button=1))
+        if rng.random() < 0.25:
+            key, unicode = rng.choice([(pygame.K_a, "a"), (pygame.K_b, "b"), (pygame.K_1, "1"), (pygame.K_BACKSPACE, "")])
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=unicode, mod=0))
+        script.append((mouse_xy, events))
+    return script
+
+
+@contextlib.contextmanager
+def scripted_mouse(position):
+    """
+    The buttons find the mouse with 'pygame.mouse.get_pos', which the dummy video driver always returns (0, 0) for, so while the
+    benchmark runs it returns the position in the one item list 'position' instead.
+    """
+    get_pos = pygame.mouse.get_pos
+    pygame.mouse.get_pos = lambda: tuple(position[0])
+    try:
+        yield
+    finally:
+        pygame.mouse.get_pos = get_pos
+
+
+def time_widgets(surface, scenario, copies, frames, seed=0, retained=False):
+    """
+    Builds 'copies' copies of the scenario's buttons and plays the same synthetic input to them for 'frames' frames, calling
+    'update' and 'draw' on every button each frame (or, if 'retained' is True, updating them with an 'InputDispatcher' and
+    drawing them with a 'rendering.RetainedLayer' as the menus do). Returns the mean time per frame in milliseconds and the 
+    number of buttons.
+    """
+    random.seed(seed)
+    button_ls = [button for copy in range(copies) for button in WIDGET_SCENARIOS[scenario](surface)]
+    script = synthetic_input(button_ls, frames, seed)
+    dispatcher = inputDispatcher.InputDispatcher()
+    layer = rendering.RetainedLayer(surface)
+    position = [script[0][0]]
+
+    # 'TextButton' prints its text when clicked, which is left in so that the time is the same as in the program.
+    with scripted_mouse(position), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        for mouse_xy, events in script:
+            position[0] = mouse_xy
+            if retained:
+                dispatcher.dispatch(button_ls, events)
+                layer.draw(button_ls)
+            else:
+                surface.fill((0, 0, 0))
+                for button in button_ls:
+                    button.update(events)
+                    button.draw()
+        frame_ms = (time.perf_counter() - start) / frames * 1000
+    return frame_ms, len(button_ls)
+
+
+def widget_benchmark(scenarios, copies, frames=200, seed=0, baseline_path=None, save_baseline=False, tolerance=1.25):
+    """
+    Times every widget scenario from 'tests.py' at each number of copies with the same synthetic input, both drawing every button
+    on every frame and as the menus do (with the input dispatcher and the retained layer). The results are keyed by "scenario x copies". If 'baseline_path' is given then
+    each result is compared against the time saved in it, and any that are more than 'tolerance' times slower are reported as
+    regressions, or the results are saved to it if 'save_baseline' is True. Returns the list of regressions.
+    """
+    surface = pygame.Surface((800, 650))
+    results = {}
+    print(f"{'scenario':>22} {'copies':>7} {'buttons':>8} {'frame ms':>9} {'us/button':>10} {'retained ms':>12}")
+    for scenario in scenarios:
+        for copy_num in copies:
+            frame_ms, button_num = time_widgets(surface, scenario, copy_num, frames, seed)
+            retained_ms, _ = time_widgets(surface, scenario, copy_num, frames, seed, retained=True)
+            results[f"{scenario} x {copy_num}"] = {"frame_ms": frame_ms, "retained_ms": retained_ms}
+            print(f"{scenario:>22} {copy_num:>7} {button_num:>8} {frame_ms:>9.3f} {frame_ms * 1000 / button_num:>10.2f} "
+                  f"{retained_ms:>12.3f}")
+
+    regressions = []
+    if baseline_path and save_baseline:
+        with open(baseline_path, "w") as file:
+            json.dump({"frames": frames, "seed": seed, "results": results}, file, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+    elif baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path) as file:
+            baseline = json.load(file)["results"]
+        for key, timings in results.items():
+            for name, value in timings.items():
+                if key in baseline and value > baseline[key][name] * tolerance:
+                    regressions.append(f"{key} {name}: {value:.3f} ms, baseline {baseline[key][name]:.3f} ms")
+        print("\n".join(["Regressions:"] + regressions) if regressions else f"No regressions against {baseline_path}")
+    return regressions
+
+
+# This is run in a new Python process for each run of the startup benchmark. It times importing 'main' and then runs the program
+# until the first frame is sent to the display, and prints the results as JSON on its last line.
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+import json, os, sys
+import pygame
+import main
+imported = time.perf_counter()
+
+def first_frame(*args):
+    print(json.dumps({"import_ms": (imported - start) * 1000, "first_frame_ms": (time.perf_counter() - start) * 1000,
+                      "modules": len(sys.modules), "sympy_imported": "sympy" in sys.modules,
+                      "database_opened": os.path.exists("database.db")}), flush=True)
+    os._exit(0)
+
+pygame.display.update = first_frame
+main.main()
+"""
+
+
+def time_startup(runs=5):
+    """
+    Starts the program 'runs' times, each in a new Python process in an empty temporary folder, and returns the results of each
+    run from 'STARTUP_SCRIPT' with the time until the first frame as seen from outside the process ('process_ms', which includes
+    starting Python) added.
+    """
+    source = os.path.dirname(os.path.abspath(__file__))
+    python_path = [source, os.environ["PYTHONPATH"]] if os.environ.get("PYTHONPATH") else [source]
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1", PYTHONPATH=os.pathsep.join(python_path))
+    results = []
+    for run in range(runs):
+        with tempfile.TemporaryDirectory() as folder:
+            start = time.perf_counter()
+            process = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT], cwd=folder, env=environment, capture_output=True,
+                                     text=True, timeout=120)
+            process_ms = (time.perf_counter() - start) * 1000
+        if process.returncode != 0 or not process.stdout.strip():
+            raise RuntimeError(f"The program did not reach its first frame:\n{process.stderr}")
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        result["process_ms"] = process_ms
+        results.append(result)
+    return results
+
+
+def startup_benchmark(runs=5, baseline_path=None, save_baseline=False, tolerance=1.25):
+    """
+    Times starting the program (see 'time_startup') and prints the median of each time. It also checks that the main menu is drawn
+    without importing sympy or opening the database, which should only happen when they are first needed. If 'baseline_path' is
+    given then the medians are compared against it (or saved to it) in the same way as in 'widget_benchmark'. Returns the list of
+    regressions.
+    """
+    results = time_startup(runs)
+    medians = {name: float(np.median([result[name] for result in results]))
+               for name in ("import_ms", "first_frame_ms", "process_ms")}
+    print(f"{'runs':>5} {'import ms':>10} {'first frame ms':>15} {'process ms':>11} {'modules':>8}")
+    print(f"{runs:>5} {medians['import_ms']:>10.1f} {medians['first_frame_ms']:>15.1f} {medians['process_ms']:>11.1f} "
+          f"{results[0]['modules']:>8}")
+
+    regressions = []
+    for name in ("sympy_imported", "database_opened"):
+        if any(result[name] for result in results):
+            regressions.append(f"{name} before the first frame")
+    if baseline_path and save_baseline:
+        with open(baseline_path, "w") as file:
+            json.dump({"runs": runs, "results": medians}, file, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+    elif baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path) as file:
+            baseline = json.load(file)["results"]
+        for name, value in medians.items():
+            if name in baseline and value > baseline[name] * tolerance:
+                regressions.append(f"{name}: {value:.1f} ms, baseline {baseline[name]:.1f} ms")
+    if regressions or baseline_path and not save_baseline:
+        print("\n".join(["Regressions:"] + regressions) if regressions else f"No regressions against {baseline_path}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the A Level Physics Helper.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    collisions = subparsers.add_parser("collisions", help="point particle collisions with and without the spatial hash")
+    collisions.add_argument("--particles", type=int, nargs="+", default=[150, 500, 1000, 2000, 5000, 10000, 20000])
+    collisions.add_argument("--frames", type=int, default=20)
+    collisions.add_argument("--pairwise-limit", type=int, default=2000)
+    collisions.add_argument("--seed", type=int, default=0)
+
+    particles = subparsers.add_parser("particles", help="point particle steps with particle objects and with NumPy arrays")
+    particles.add_argument("--particles", type=int, nargs="+", default=[150, 1000, 5000, 20000])
+    particles.add_argument("--steps", type=int, default=20)
+    particles.add_argument("--seed", type=int, default=0)
+
+    integrator = subparsers.add_parser("integrators", help="energy drift against wall-clock time for each solar body integrator")
+    integrator.add_argument("--dt", type=float, nargs="+", default=[0.001, 0.005, 0.01, 0.02, 0.05])
+    integrator.add_argument("--time", type=float, default=2.0, help="simulated time for each run")
+    integrator.add_argument("--bodies", type=int, default=2000)
+    integrator.add_argument("--seed", type=int, default=0)
+
+    adaptive = subparsers.add_parser("timesteps", help="global against adaptive (block) time steps for the solar system")
+    adaptive.add_argument("--dt", type=float, default=0.05, help="base time step for the adaptive runs")
+    adaptive.add_argument("--max-level", type=int, nargs="+", default=[6, 8])
+    adaptive.add_argument("--time", type=float, default=2.0, help="simulated time for each run")
+    adaptive.add_argument("--bodies", type=int, nargs="+", default=[2000, 20000])
+    adaptive.add_argument("--seed", type=int, default=0)
+
+    widgets = subparsers.add_parser("widgets", help="update and draw time of the button tests from 'tests.py'")
+    widgets.add_argument("--scenarios", nargs="+", choices=list(WIDGET_SCENARIOS), default=list(WIDGET_SCENARIOS))
+    widgets.add_argument("--copies", type=int, nargs="+", default=[1, 4, 16], help="copies of each scenario's buttons")
+    widgets.add_argument("--frames", type=int, default=200)
+    widgets.add_argument("--seed", type=int, default=0)
+    widgets.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    widgets.add_argument("--save-baseline", action="store_true", help="save the results to the '--baseline' file instead")
+    widgets.add_argument("--tolerance", type=float, default=1.25, help="how many times slower than the baseline is a regression")
+
+    startup = subparsers.add_parser("startup", help="import time and time to the first frame of the program")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--baseline", help="JSON file of earlier results to compare against")
+    startup.add_argument("--save-baseline", action="store_true", help="save the results to the '--baseline' file instead")
+    startup.add_argument("--tolerance", type=float, default=1.25, help="how many times slower than the baseline is a regression")
+
+    args = parser.parse_args()
+    pygame.init()
+
+    if args.benchmark == "collisions":
+        collision_benchmark(args.particles, args.frames, args.pairwise_limit, args.seed)
+    elif args.benchmark == "particles":
+        particle_benchmark(args.particles, args.steps, args.seed)
+    elif args.benchmark == "integrators":
+        integrator_benchmark(args.dt, args.time, args.bodies, args.seed)
+    elif args.benchmark == "timesteps":
+        # Each adaptive run is compared with global leapfrog steps of its largest (base) and smallest time step. It should be as
+        # stable as the smallest global step while calculating far fewer forces.
+        configurations = [{"integrator": "semi-implicit euler", "dt": 0.001}, {"integrator": "leapfrog", "dt": args.dt}]
+        for max_level in args.max_level:
+            configurations += [{"integrator": "leapfrog", "dt": args.dt / 2 ** max_level},
+                               {"integrator": "leapfrog", "dt": args.dt, "adaptive": True, "max_level": max_level}]
+        for body_num in args.bodies:
+            print(f"{body_num} bodies")
+            adaptive_benchmark(configurations, args.time, body_num, args.seed)
+    elif args.benchmark == "widgets":
+        regressions = widget_benchmark(args.scenarios, args.copies, args.frames, args.seed, args.baseline, args.save_baseline,
+                                       args.tolerance)
+        if regressions:
+            raise SystemExit(1)
+    elif args.benchmark == "startup":
+        if startup_benchmark(args.runs, args.baseline, args.save_baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
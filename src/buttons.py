@@ -2,6 +2,57 @@ import pygame
 import time
 from typing import List, Tuple
 
+# The fonts that have been loaded so far, keyed by (font name, size). 'pygame.font.SysFont' searches the system's fonts and loads
+# the font file every time it is called, so each font is only loaded once and then shared by every button that uses it.
+_FONTS = {}
+
+
+def get_font(font: str, text_size: int) -> object:
+    """
+    Returns the pygame font object for the font name and size, loading it the first time it is asked for.
+    """
+    key = (font, text_size)
+    if key not in _FONTS:
+        _FONTS[key] = pygame.font.SysFont(font, text_size)
+    return _FONTS[key]
+
+
+def clear_fonts() -> None:
+    """
+    Forgets every loaded font. This must be called if 'pygame.quit' is called and pygame is then started again, as the old font
+    objects can no longer be used.
+    """
+    _FONTS.clear()
+
+
+class FrameInput:
+    """
+    The input for one frame, worked out once from the frame's events and shared by every button that is updated in that frame, so
+    that each button does not have to find the mouse and search through all of the events itself.
+    """
+    __slots__ = ("events", "mouse_xy", "mouse_down", "mouse_up", "key_events")
+
+    def __init__(self: object, events: list, mouse_xy=None) -> object:
+        """
+        events: List[pygame.event.Event]
+            - the events from 'pygame.event.get' for this frame.
+        mouse_xy: Tuple[int, int] [None]
+            - the position of the mouse, if None then it is found with 'pygame.mouse.get_pos'.
+        """
+        self.events = events
+        self.mouse_xy = pygame.mouse.get_pos() if mouse_xy is None else mouse_xy
+        self.mouse_down = False
+        self.mouse_up = False
+        self.key_events = []
+        for event in events:
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.mouse_down = True
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.mouse_up = True
+            elif event.type == pygame.KEYDOWN:
+                self.key_events.append(event)
+
+
 class Button:
     """
     This is the base button class. It will be used as a parent class for all of the other button classes.
@@ -48,6 +99,8 @@ class Button:
         self.pygame_button_object = pygame.Rect(self.start_xy[0], self.start_xy[1], self.width, self.height)
         self.interactive = interactive
         self.current_events = []
+        self.events = []
+        self.frame_input = None
         self.clicked = False
 
     def draw(self: object) -> None:
@@ -61,9 +114,9 @@ class Button:
 
     def check_mouse_hover(self: object) -> bool:
         """
-        Finds the coordinates of the mouse and then uses the pygame rect method collidepoint().
+        Finds the coordinates of the mouse (from this frame's 'FrameInput') and then uses the pygame rect method collidepoint().
         """
-        mouse_xy = pygame.mouse.get_pos()
+        mouse_xy = self.frame_input.mouse_xy
         
         if self.pygame_button_object.collidepoint(mouse_xy):
             return True
@@ -74,10 +127,7 @@ class Button:
         """
         Checks the pygame event queue for a mousebuttondown event
         """
-        for event in self.events:
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                return True
-        return False
+        return self.frame_input.mouse_down
 
     def apply_mouse_hover(self: object) -> None:
         """
@@ -103,11 +153,13 @@ class Button:
         else:
             self.apply_mouse_hover()
 
-    def update(self: object, events: List[str]) -> None:
+    def update(self: object, events: List[str], frame_input=None) -> None:
         """
         Checks potential self.events, otherwise ensures that the button is reset.
+        'frame_input' is the 'FrameInput' for these events if it has already been made (e.g. by 'inputDispatcher.InputDispatcher').
         """
         self.events = events
+        self.frame_input = frame_input if frame_input is not None else FrameInput(events)
         if self.interactive:
             if self.check_mouse_hover():
                 self.apply_mouse_click_or_hover()
@@ -174,10 +226,7 @@ class BASE_SliderButton(Button):
         """
         Is needed so the slider can stop moving when the user is no longer dragging it.
         """
-        for event in self.events:
-            if event.type == pygame.MOUSEBUTTONUP:
-                return True
-        return False
+        return self.frame_input.mouse_up
     
     def apply_mouse_click(self: object) -> None:
         """
@@ -240,7 +289,7 @@ class HorizontalSliderButton(BASE_SliderButton):
         """
         Updates the x position of the button part of the slider.
         """
-        mouse_xy = pygame.mouse.get_pos()
+        mouse_xy = self.frame_input.mouse_xy
         if mouse_xy[0] >= self.neutral_position + self.limit - self.width//2:
             self.centre_pos[0] = self.neutral_position + self.limit - self.width//2
         elif mouse_xy[0] <= self.neutral_position - self.limit + self.width//2:
@@ -306,7 +355,7 @@ class VerticalSliderButton(BASE_SliderButton):
         """
         Updates the y position of the button part of the slider.
         """
-        mouse_xy = pygame.mouse.get_pos()
+        mouse_xy = self.frame_input.mouse_xy
         if mouse_xy[1] >= self.neutral_position + self.limit - self.height//2:
             self.centre_pos[1] = self.neutral_position + self.limit - self.height//2
         elif mouse_xy[1] <= self.neutral_position - self.limit + self.height//2:
@@ -364,9 +413,12 @@ class TextButton(Button):
         """
         super().__init__(screen, centre, width, height, bg_colour, border_colour, border_width, interactive)
 
-        self.sys_font = pygame.font.SysFont(font, text_size)
+        self.sys_font = get_font(font, text_size)
         self.text_colour = text_colour
         self.text = text
+        # The rendered lines of the text that was last drawn, see 'render_text'.
+        self.rendered_key = None
+        self.rendered_lines = []
 
     def apply_mouse_click(self: object) -> None:
         """
@@ -376,22 +428,44 @@ class TextButton(Button):
         super().apply_mouse_click()
         print(self.text)
 
-    def draw_text(self: object) -> None:
+    def displayed_text(self: object) -> str:
         """
-        This method will update the text to the current pygame surface.
+        Returns the text that is shown on the button.
         """
-        lines = str(self.text).split("\n")
+        return str(self.text)
+
+    def render_text(self: object, text: str) -> list:
+        """
+        Returns a list of the rendered pygame surface for each line of the text. Rendering text is the slowest part of drawing a
+        button, so the lines are kept and only rendered again when the text, its colour or the font changes.
+        """
+        key = (text, tuple(self.text_colour), self.sys_font)
+        if key != self.rendered_key:
+            self.rendered_lines = [self.sys_font.render(line, 1, self.text_colour) for line in text.split("\n")]
+            self.rendered_key = key
+        return self.rendered_lines
+
+    def text_layout(self: object) -> list:
+        """
+        Returns a list of (surface, rect) for each line of the text, where the rect is where the line is drawn on the screen.
+        """
+        lines = self.render_text(self.displayed_text())
         number_of_lines = len(lines)
-        if number_of_lines > 1:
-            for line_num, line in enumerate(lines):
-                textobj = self.sys_font.render(line, 1, self.text_colour)
-                textrect = textobj.get_rect()
-                textrect.center = [self.centre_pos[0], self.centre_pos[1] + ((line_num - 1)* 10)]
-                self.surface.blit(textobj, textrect)
-        else:
-            textobj = self.sys_font.render(str(self.text), 1, self.text_colour)
+        layout = []
+        for line_num, textobj in enumerate(lines):
             textrect = textobj.get_rect()
-            textrect.center = self.centre_pos
+            if number_of_lines > 1:
+                textrect.center = [self.centre_pos[0], self.centre_pos[1] + ((line_num - 1)* 10)]
+            else:
+                textrect.center = self.centre_pos
+            layout.append((textobj, textrect))
+        return layout
+
+    def draw_text(self: object) -> None:
+        """
+        This method will update the text to the current pygame surface.
+        """
+        for textobj, textrect in self.text_layout():
             self.surface.blit(textobj, textrect)
 
 
@@ -514,21 +588,20 @@ class TextInputBox(TextButton):
         """
         Will check all Pygame 'KEYDOWN' events to determine if the text in the button needs to be updated.
         """
-        for event in self.events:
-            if event.type == pygame.KEYDOWN:
-                # Checks if the size needs to be updated.
-                self.update_size()
-                if event.key == pygame.K_BACKSPACE:
-                    # [:-1] copies up to (i.e. not including) the last item in a list/string.
-                    self.text = self.text[:-1]
-                elif event.key == pygame.K_RETURN:
-                    self.apply_text_submit()
-                else:
-                    # 'unicode' is an attribute that certain Pygame events have that corresponds to the character they represent
-                    # i.e. the Pygame event that corresponds to the 'a' key being pressed will have a 'unicode' attribute of 'a'.
-                    # The unicode attribute also takes into account key modifiers so that when the keys 'a' and 'shift' and pressed,
-                    # the events have a single unicode attribute 'A'.
-                    self.text += event.unicode
+        for event in self.frame_input.key_events:
+            # Checks if the size needs to be updated.
+            self.update_size()
+            if event.key == pygame.K_BACKSPACE:
+                # [:-1] copies up to (i.e. not including) the last item in a list/string.
+                self.text = self.text[:-1]
+            elif event.key == pygame.K_RETURN:
+                self.apply_text_submit()
+            else:
+                # 'unicode' is an attribute that certain Pygame events have that corresponds to the character they represent
+                # i.e. the Pygame event that corresponds to the 'a' key being pressed will have a 'unicode' attribute of 'a'.
+                # The unicode attribute also takes into account key modifiers so that when the keys 'a' and 'shift' and pressed,
+                # the events have a single unicode attribute 'A'.
+                self.text += event.unicode
 
     def reset_button(self: object) -> None:
         """
@@ -539,22 +612,20 @@ class TextInputBox(TextButton):
         if self.text == "" and (self.border_colour == self.unselected_border_colour):
             self.text = self.default_text
 
-    def draw_text(self: object):
+    def displayed_text(self: object) -> str:
+        """
+        If the box is 'hidden' (e.g. for a password) then every character that has been typed is shown as a '*'.
+        """
         if not self.hidden or self.text == self.default_text:
-            super().draw_text()
-        else:
-            hidden_text = len(self.text) * "*"
-            textobj = self.sys_font.render(hidden_text, 1, self.text_colour)
-            textrect = textobj.get_rect()
-            textrect.center = self.centre_pos
-            self.surface.blit(textobj, textrect)
+            return super().displayed_text()
+        return len(self.text) * "*"
 
-    def update(self, events):
+    def update(self, events, frame_input=None):
         """
         It will call the super class's update and then also check if the user clicks off of the button. It will also check if it is
         currently selected and if so it will call the 'update_text' method to check if the button's text needs to be changed.
         """
-        super().update(events)
+        super().update(events, frame_input)
         self.check_default_text()
         if self.check_mouse_click() and not self.check_mouse_hover():
             self.border_colour = self.unselected_border_colour
@@ -640,12 +711,12 @@ class TextInputBoxRightExpansion(TextInputBox):
         self.end_xy = (self.centre_pos[0] + self.width//2, self.centre_pos[1] + self.height//2)
         self.pygame_button_object = pygame.Rect(self.start_xy[0], self.start_xy[1], self.width, self.height)
 
-    def update(self: object, events) -> None:
+    def update(self: object, events, frame_input=None) -> None:
         """
         It will call the super class's update and then also check if the user clicks off of the button. It will also check if it is
         currently selected and if so it will call the 'update_text' method to check if the button's text needs to be changed.
         """
-        super().update(events)
+        super().update(events, frame_input)
         self.update_text_pos()
 
 
@@ -722,17 +793,17 @@ class DropDownSelectButton(TextButton):
         super().apply_mouse_click()
         self.show_options = not self.show_options
 
-    def update(self: object, events) -> None:
+    def update(self: object, events, frame_input=None) -> None:
         """
         It will call the super class's update and then also check if the option button components are currently active.
         If so it will call each of their 'update' and 'draw' mehtods. Also if the user has clicked on one of the option
         buttons, then the current 'self.text' (i.e. the main button's text) will be set to the option button's text. This
         will give the user visual feedback that the option has been selected.
         """
-        super().update(events)
+        super().update(events, frame_input)
         if self.show_options:
             for option in self.option_objects:
-                option.update(events)
+                option.update(events, self.frame_input)
                 option.draw()
                 if option.check_mouse_click() and option.check_mouse_hover():
                     self.text = option.text
@@ -0,0 +1,23 @@
+"""
+Shared set up for the automated tests, which are run with 'python -m pytest' from this folder. The tests use SDL's 'dummy' video
+driver so that they run without a window, and the rearrangement cache and the recordings are kept in a temporary folder so that
+running the tests never changes the user's own files (see 'equationRegistry' and 'trajectory').
+"""
+import os
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ["PHYSICS_HELPER_CACHE_DIR"] = tempfile.mkdtemp(prefix="physics-helper-tests-")
+os.environ["PHYSICS_HELPER_DATA_DIR"] = os.path.join(os.environ["PHYSICS_HELPER_CACHE_DIR"], "recordings")
+
+import pygame
+import pytest
+
+
+@pytest.fixture
+def screen():
+    """
+    A pygame screen the same size as the program's window.
+    """
+    pygame.init()
+    yield pygame.display.set_mode((800, 650))
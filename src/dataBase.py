@@ -4,13 +4,11 @@ def generate_next_id(database, table):
     """
     The function will take the current database and the table that is being accessed and will return the next valid userID.
     This function will work for multiple different tables at a single time as it checks the last userID that was registered in
-    the table.
+    the table, which is a single query however many records there are.
     """
-    rows = database.read_all_data_from_table(table)
-    if len(rows) == 0:
+    last_id_str = database.read_last_id(table)
+    if last_id_str is None:
         last_id_str = "S000"
-    else:
-        last_id_str = rows[-1][0]
     formatted_id_int = int(last_id_str[1:])
     next_id_int = formatted_id_int + 1
     next_id = "S" + ((3 - len(str(next_id_int))) * "0") + str(next_id_int)
@@ -52,9 +50,43 @@ class DataBase:
         """
         This method will create the required tables if they do not already exist.
         """
-        self.cursor.execute("CREATE TABLE IF NOT EXISTS students (StudentID, firstName, surName, classID, passwordHash)")
+        self.cursor.execute("CREATE TABLE IF NOT EXISTS students (StudentID TEXT PRIMARY KEY, firstName TEXT, surName TEXT, "
+                            "classID TEXT, passwordHash TEXT)")
+        self.migrate_students_table()
         print("Database is open")
 
+    def migrate_students_table(self):
+        """
+        Databases made by older versions of the program have a 'students' table without any column types or a primary key, so
+        finding a student meant reading every record. This method copies the records of an old table (in the same order, keeping
+        the first record with each StudentID) into a new table where StudentID is the primary key, which SQLite keeps an index of.
+        The whole upgrade is one transaction, so if the program stops part way through the old table is left as it was and the
+        upgrade is tried again the next time the database is opened.
+        """
+        if self.students_table_is_typed():
+            return
+        # The 'sqlite3' module runs statements that change the tables (e.g. 'ALTER TABLE') straight away unless a transaction has
+        # been started, so one is started here. 'IMMEDIATE' stops another copy of the program from upgrading the table at the
+        # same time, and the table is checked again in case another copy has just upgraded it.
+        self.cursor.execute("BEGIN IMMEDIATE")
+        with self.connection:
+            if self.students_table_is_typed():
+                return
+            self.cursor.execute("ALTER TABLE students RENAME TO old_students")
+            self.cursor.execute("CREATE TABLE students (StudentID TEXT PRIMARY KEY, firstName TEXT, surName TEXT, classID TEXT, "
+                                "passwordHash TEXT)")
+            self.cursor.execute("INSERT OR IGNORE INTO students SELECT * FROM old_students ORDER BY rowid")
+            self.cursor.execute("DROP TABLE old_students")
+        print("Database students table upgraded")
+
+    def students_table_is_typed(self):
+        """
+        This method will return True if StudentID is the primary key of the 'students' table.
+        """
+        columns = self.cursor.execute("PRAGMA table_info(students)").fetchall()
+        # Each column is (position, name, type, not null, default value, position in the primary key).
+        return any(column[1] == "StudentID" and column[5] == 1 for column in columns)
+
     def close_connection(self):
         """
         This method will ensure that all of the data that has been changed is saved/commited to the database. Once this is successful
@@ -65,20 +97,37 @@ class DataBase:
 
     def add_data(self, table, data):
         """
-        This method will allow for a new record to be added to a specific table in the database.
+        This method will allow for a new record to be added to a specific table in the database. A record whose primary key is
+        already in the table is not added, which the primary key's index checks without reading the table. It returns True if the
+        record was added.
         """
-        rows = self.read_all_data_from_table(table)
-        first_items = [row[0] for row in rows]
-
-        if len(data) == 5 and data[0] not in first_items:
-            self.cursor.execute(f"INSERT INTO {table} VALUES(?, ?, ?, ?, ?)", data)
+        if len(data) != 5:
+            return False
+        self.cursor.execute(f"INSERT OR IGNORE INTO {table} VALUES(?, ?, ?, ?, ?)", data)
+        return self.cursor.rowcount == 1
 
     def remove_data(self, table, primary_key):
         """
         This method will delete a certain record from a given table in the database. This record is referenced by its primary key
         (this will be the userID).
         """
-        self.cursor.execute(f"DELETE FROM {table} WHERE StudentID = '{primary_key}'")
+        self.cursor.execute(f"DELETE FROM {table} WHERE StudentID = ?", (primary_key,))
+
+    def read_record(self, table, primary_key):
+        """
+        This method will return the record with the given primary key (this will be the userID) using the primary key's index, or
+        None if there is no such record.
+        """
+        self.cursor.execute(f"SELECT * FROM {table} WHERE StudentID = ?", (primary_key,))
+        return self.cursor.fetchone()
+
+    def read_last_id(self, table):
+        """
+        This method will return the primary key of the record that was added to the table last, or None if the table is empty.
+        """
+        self.cursor.execute(f"SELECT StudentID FROM {table} ORDER BY rowid DESC LIMIT 1")
+        row = self.cursor.fetchone()
+        return None if row is None else row[0]
 
     def read_all_data_from_table(self, table):
         """
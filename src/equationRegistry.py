@@ -0,0 +1,342 @@
+"""
+The equations that the equation solvers can solve, and every rearrangement of them that has been worked out. Rearranging an
+equation with 'sympy.solve' (and then simplifying it) is slow, especially on the first click after the program starts, so each
+rearrangement is saved to a cache file the first time it is worked out. The cache file is keyed by the equation's name and the
+variable that it is rearranged for, and it is only read when the first rearrangement is needed, so each rearrangement is only
+ever worked out once per user instead of once per launch.
+The cache file is kept in the user's own cache folder (or the folder in the 'PHYSICS_HELPER_CACHE_DIR' environment variable), as
+the folder that the program is installed in is often read only on school computers. It is thrown away if it was written by a
+different version of the cache format or of sympy, and a single entry is worked out again if its equation has been changed since
+it was saved or it cannot be read. The expressions in it are read with 'parse_srepr', which only builds a few kinds of sympy
+object, so a cache file that has been tampered with cannot run any code.
+"""
+import ast
+import cmath
+import json
+import math
+import os
+import threading
+import numpy as np
+import sympy
+
+# This number is increased whenever the layout of the cache file or the way that the rearrangements are worked out changes.
+CACHE_VERSION = 1
+CACHE_DIRECTORY_VARIABLE = "PHYSICS_HELPER_CACHE_DIR"
+
+
+def default_cache_path() -> str:
+    """
+    Returns the path of the cache file: in the folder named by the 'PHYSICS_HELPER_CACHE_DIR' environment variable if it is set,
+    otherwise in a 'physics-helper' folder in the user's cache folder (%LOCALAPPDATA% on Windows, otherwise $XDG_CACHE_HOME or
+    ~/.cache). The folder is only made when the cache file is first saved.
+    """
+    folder = os.environ.get(CACHE_DIRECTORY_VARIABLE)
+    if not folder:
+        user_cache = os.environ.get("LOCALAPPDATA") if os.name == "nt" else os.environ.get("XDG_CACHE_HOME")
+        folder = os.path.join(user_cache or os.path.join(os.path.expanduser("~"), ".cache"), "physics-helper")
+    return os.path.join(folder, "rearrangements.json")
+
+
+CACHE_PATH = default_cache_path()
+
+# The sympy classes and constants that can appear in a cached expression. These are the only names that 'parse_srepr' allows.
+SREPR_NAMES = {name: getattr(sympy, name) for name in ("Symbol", "Integer", "Rational", "Float", "Add", "Mul", "Pow", "sqrt",
+                                                        "exp", "log", "sin", "cos", "tan", "Abs", "pi", "E", "I")}
+
+
+def parse_srepr(text: str) -> object:
+    """
+    Turns the output of 'sympy.srepr' back into the sympy expression. Unlike 'sympy.sympify', which runs the text as Python code,
+    this only allows calls to the classes in 'SREPR_NAMES' with numbers and expressions as their arguments (and text only for the
+    name of a 'Symbol' and the digits and precision of a 'Float', as sympy would run text passed to anything else), and raises a
+    ValueError for anything else.
+    """
+    def build(node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)) and not isinstance(node.value, bool):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub) and isinstance(node.operand, ast.Constant):
+            value = build(node.operand)
+            if isinstance(value, (int, float)):
+                return -value
+        if isinstance(node, ast.Name) and node.id in SREPR_NAMES and not callable(SREPR_NAMES[node.id]):
+            return SREPR_NAMES[node.id]
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in SREPR_NAMES:
+            name = node.func.id
+            arguments = [build(argument) for argument in node.args]
+            keywords = {keyword.arg: build(keyword.value) for keyword in node.keywords}
+            if name == "Symbol":
+                valid = len(arguments) == 1 and isinstance(arguments[0], str) and not keywords
+            elif name == "Float":
+                valid = (len(arguments) == 1 and isinstance(arguments[0], (str, int, float)) and set(keywords) <= {"precision"}
+                         and all(isinstance(value, int) for value in keywords.values()))
+            else:
+                valid = not keywords and all(isinstance(argument, (int, float, sympy.Basic)) for argument in arguments)
+            if valid:
+                return SREPR_NAMES[name](*arguments, **keywords)
+        raise ValueError(f"'{text}' is not a sympy expression that can be read from the cache")
+
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as error:
+        raise ValueError(f"'{text}' is not a sympy expression that can be read from the cache") from error
+    expression = build(tree.body)
+    if not isinstance(expression, sympy.Basic):
+        raise ValueError(f"'{text}' is not a sympy expression that can be read from the cache")
+    return expression
+
+# The 'EQUATIONS' dictionary maps each equation's name to its sympy equation, the names of its variables (in the order that their
+# values are given in) and the names of the variables that should not be negative (e.g. time).
+EQUATIONS = {}
+
+
+def register(name: str, equation: object, variables: list, non_negative=()) -> None:
+    """
+    name: str
+        - the name that the equation is looked up by.
+    equation: sympy.Eq
+        - the equation, whose variables are sympy symbols named as in 'variables'.
+    variables: List[str]
+        - the names of the equation's variables.
+    non_negative: Tuple[str] [()]
+        - the variables that are physically not negative. When one of these has more than one possible value, the first value
+          that is not negative is chosen.
+    """
+    EQUATIONS[name] = (equation, list(variables), tuple(non_negative))
+
+
+c, f, wavelength = sympy.symbols('c f λ')
+register("Waves", sympy.Eq(c, f * wavelength), ["c", "f", "λ"])
+
+
+class RearrangementCache:
+    """
+    The rearrangements that have been worked out, kept in memory and in a JSON cache file. The equation and its solutions are
+    saved with 'sympy.srepr', which 'parse_srepr' turns back into exactly the same expressions.
+    """
+    def __init__(self: object, path=CACHE_PATH) -> object:
+        """
+        path: str [CACHE_PATH]
+            - the cache file, or None to only keep the rearrangements in memory.
+        """
+        self.path = path
+        self.entries = None
+        self.lock = threading.Lock()
+
+    def load(self: object) -> None:
+        """
+        Reads the cache file, starting with an empty cache if there is no cache file or it cannot be used.
+        """
+        self.entries = {}
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if (isinstance(data, dict) and data.get("version") == CACHE_VERSION and data.get("sympy") == sympy.__version__
+                and isinstance(data.get("entries"), dict)):
+            self.entries = data["entries"]
+
+    def save(self: object) -> None:
+        """
+        Writes the cache file, making its folder (which only the user can use) if it does not exist. If it cannot be written then
+        the rearrangements are only kept in memory for the rest of the time that the program is open.
+        """
+        if self.path is None:
+            return
+        data = {"version": CACHE_VERSION, "sympy": sympy.__version__, "entries": self.entries}
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+            # The file is written under another name and then renamed, so that a half written cache file is never read.
+            with open(self.path + ".tmp", "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=1, ensure_ascii=False)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as error:
+            print(f"The rearrangements cache could not be saved to {self.path} ({error}), it is only kept in memory")
+            self.path = None
+
+    def rearrange(self: object, name: str, unknown: str) -> tuple:
+        """
+        Returns (entry, simplified solutions) for the equation called 'name' rearranged for 'unknown', working it out with sympy
+        and adding it to the cache if it is not there. The entry is a dictionary of:
+            "equation"          - the srepr of the equation, to check that the equation has not changed since it was cached.
+            "solutions"         - the srepr of each solution from 'sympy.solve'.
+            "simplified"        - the srepr of each solution after 'sympy.simplify', which are the ones that are evaluated.
+            "pretty_equation", "plain_equation", "pretty_solutions" and "plain_solutions"
+                                - the printed forms that are shown by the equation solvers, as pretty printing is also slow.
+        """
+        equation, variables, non_negative = EQUATIONS[name]
+        key = f"{name}|{unknown}"
+        equation_text = sympy.srepr(equation)
+        with self.lock:
+            if self.entries is None:
+                self.load()
+            entry = self.entries.get(key)
+        if isinstance(entry, dict) and entry.get("equation") == equation_text:
+            try:
+                return entry, read_entry(entry)
+            except (ValueError, TypeError, KeyError):
+                # The entry is not in the right form, so it is worked out again.
+                pass
+
+        solutions = sympy.solve(equation, sympy.Symbol(unknown))
+        entry = {"equation": equation_text,
+                 "solutions": [sympy.srepr(solution) for solution in solutions],
+                 "simplified": [sympy.srepr(sympy.simplify(solution)) for solution in solutions],
+                 "pretty_equation": sympy.pretty(equation),
+                 "plain_equation": str(equation),
+                 "pretty_solutions": [sympy.pretty(solution) for solution in solutions],
+                 "plain_solutions": [str(solution) for solution in solutions]}
+        with self.lock:
+            self.entries[key] = entry
+            self.save()
+        return entry, read_entry(entry)
+
+    def clear(self: object) -> None:
+        """
+        Forgets every rearrangement, including the ones in the cache file.
+        """
+        with self.lock:
+            self.entries = {}
+            self.save()
+
+
+def read_entry(entry: dict) -> list:
+    """
+    Checks that a cache entry has every item in the right form and returns its simplified solutions as sympy expressions. Raises a
+    ValueError if it does not.
+    """
+    lists = ("solutions", "simplified", "pretty_solutions", "plain_solutions")
+    if not all(isinstance(entry[key], str) for key in ("equation", "pretty_equation", "plain_equation")):
+        raise ValueError("A cache entry has an equation that is not text")
+    if not all(isinstance(entry[key], list) and len(entry[key]) == len(entry["solutions"])
+               and all(isinstance(text, str) for text in entry[key]) for key in lists):
+        raise ValueError("A cache entry's solutions are not a list of text for each solution")
+    return [parse_srepr(text) for text in entry["simplified"]]
+
+
+# One cache is shared by every equation solver.
+CACHE = RearrangementCache()
+
+
+class Rearrangement:
+    """
+    One of the registered equations rearranged for one of its variables. Some rearrangements have more than one solution (e.g. 't'
+    in 's = ut + at²/2' is a quadratic), so there is one expression and one compiled function for each solution. The compiled
+    functions use the simplified solutions, and the solutions are shown as they come from 'sympy.solve'. Everything apart from the
+    compiled functions comes from the cache entry (see 'RearrangementCache.rearrange').
+    """
+    def __init__(self: object, name: str, unknown: str) -> object:
+        """
+        name: str
+            - the name of the equation in 'EQUATIONS'.
+        unknown: str
+            - the variable that the equation is rearranged for.
+        """
+        if name not in EQUATIONS:
+            raise ValueError(f"There is no equation called '{name}'")
+        self.equation_name = name
+        self.equation, variables, non_negative = EQUATIONS[name]
+        if unknown not in variables:
+            raise ValueError(f"'{unknown}' is not one of the variables {variables} of '{name}'")
+        self.unknown = unknown
+        self.unknown_symbol = sympy.Symbol(unknown)
+        self.non_negative = unknown in non_negative
+        # The variables that have to be known, in the order they were registered in.
+        self.known = [variable for variable in variables if variable != unknown]
+        self.known_symbols = [sympy.Symbol(variable) for variable in self.known]
+
+        entry, self.simplified = CACHE.rearrange(name, unknown)
+        self.functions = [sympy.lambdify(self.known_symbols, solution, modules="math") for solution in self.simplified]
+        self.pretty_equation = entry["pretty_equation"]
+        self.plain_equation = entry["plain_equation"]
+        self.pretty_solutions = entry["pretty_solutions"]
+        self.plain_solutions = entry["plain_solutions"]
+        # The NumPy versions of the functions are only compiled if the rearrangement is used by 'evaluate_many', and the complex
+        # number versions if 'evaluate' needs them.
+        self.array_functions = None
+        self.complex_functions = None
+
+    def evaluate(self: object, values: dict) -> tuple:
+        """
+        Returns (value, index of the solution used) for the known 'values' (a dictionary of variable name to float). The first
+        solution with a real, finite value is used, except for a variable that should not be negative where the first one that is
+        also not negative is used if there is one. If no solution has a real value then (None, 0) is returned.
+        """
+        arguments = [float(values[name]) for name in self.known]
+        results = []
+        for i, function in enumerate(self.functions):
+            try:
+                value = function(*arguments)
+            except (ValueError, ZeroDivisionError, OverflowError):
+                # The compiled function only uses the 'math' module, so e.g. the square root of a negative number raises an
+                # error, in which case the value is worked out again with complex numbers. A division by zero has no value with
+                # complex numbers either, so it is treated as no real value, as it is in 'evaluate_many'.
+                if self.complex_functions is None:
+                    # sympy's own "cmath" printer cannot print float constants, so the "math" printer is used with the
+                    # square root swapped for the complex number one.
+                    self.complex_functions = [sympy.lambdify(self.known_symbols, solution, modules=[{"sqrt": cmath.sqrt}, "math"])
+                                              for solution in self.simplified]
+                try:
+                    value = complex(self.complex_functions[i](*arguments))
+                except (ValueError, ZeroDivisionError, OverflowError):
+                    value = None
+                else:
+                    value = value.real if value.imag == 0 else None
+            if value is not None and math.isfinite(value):
+                results.append((float(value), i))
+
+        if not results:
+            return None, 0
+        if self.non_negative:
+            for value, i in results:
+                if value >= 0:
+                    return value, i
+        return results[0]
+
+    def evaluate_many(self: object, known_values: np.ndarray) -> tuple:
+        """
+        known_values: np.ndarray
+            - an array of shape (n, len(self.known)) with the values of the variables in 'self.known' for n problems.
+        Returns (values, indexes of the solutions used) as two arrays of length n, choosing the solution for each problem in the
+        same way as 'evaluate'. A problem with no real value has a value of NaN.
+        """
+        if self.array_functions is None:
+            self.array_functions = [sympy.lambdify(self.known_symbols, solution, modules="numpy") for solution in self.simplified]
+        known_values = np.asarray(known_values, dtype=float)
+        count = len(known_values)
+        # The square root of a negative number or a division by zero gives NaN or infinity, which is treated as no real value.
+        with np.errstate(all="ignore"):
+            results = np.array([np.broadcast_to(function(*known_values.T), (count,)) for function in self.array_functions],
+                               dtype=float).reshape(len(self.array_functions), count)
+        finite = np.isfinite(results)
+        indexes = finite.argmax(axis=0)
+        if self.non_negative:
+            with np.errstate(invalid="ignore"):
+                positive = finite & (results >= 0)
+            indexes = np.where(positive.any(axis=0), positive.argmax(axis=0), indexes)
+        values = results[indexes, np.arange(count)]
+        no_value = ~finite.any(axis=0)
+        values[no_value] = np.nan
+        indexes[no_value] = 0
+        return values, indexes
+
+
+# The rearrangements that have been compiled so far, keyed by (equation name, unknown).
+_TABLE = {}
+_TABLE_LOCK = threading.Lock()
+
+
+def get_rearrangement(name: str, unknown: str) -> Rearrangement:
+    """
+    Returns the equation called 'name' rearranged for 'unknown', working it out (or loading it from the cache file) the first time
+    it is asked for.
+    """
+    key = (name, unknown)
+    rearrangement = _TABLE.get(key)
+    if rearrangement is None:
+        rearrangement = Rearrangement(name, unknown)
+        with _TABLE_LOCK:
+            rearrangement = _TABLE.setdefault(key, rearrangement)
+    return rearrangement
@@ -1,8 +1,12 @@
+import math
 import pygame
 from typing import List
 import buttons
-import sympy
-from tests import UnkownUseCaseError
+import equationRegistry
+import rendering
+import inputDispatcher
+import solverJobs
+import suvat
 
 # A defalt colour scheme I developed by picking colours that I thought looked similar to the ones in the design stage of the
 # project. This is currently a prototype so I will need to consult my stakeholders about the current colour scheme.
@@ -15,35 +19,66 @@ DEFAULT_COLOUR_SCHEME = (
 	(62, 69, 201),
 	(18, 49, 227)
 )
-# Initialising the ‘sympy’ ‘symbol’ objects and grouping them together in a list.
-s, u, v, a, t = sympy.symbols('s u v a t')
-SUVAT_vars = [s, u, v, a, t]
-
-# Creating my five SUVAT equations using the ‘symbol’ objects that I instantiated from the ‘sympy’ module.
-SUVA = u**2 + 2*a*s
-SUVT = ((u+v)*t)/2
-SUAT = u*t + 0.5 * t**2
-SVAT = v*t - 0.5 * t**2
-UVAT = u + a*t
-
-# Putting the five SUVAT equations into a dictionary so that I can reference them as ‘no s’, ‘no u’, etc.
-SUVAT_EQUATIONS = {
-	"SUVA": sympy.Eq(v**2, SUVA),
-	"SUVT": sympy.Eq(s, SUVT),
-	"SUAT": sympy.Eq(s, SUAT),
-	"SVAT": sympy.Eq(s, SVAT),
-	"UVAT": sympy.Eq(v, UVAT)
-}
+# The SUVAT equations and their rearrangements are kept in the 'suvat' module, which does not need pygame.
+SUVAT_vars = suvat.SUVAT_vars
+SUVAT_EQUATIONS = suvat.SUVAT_EQUATIONS
+
+def format_solution(rearrangement: object, solution: float, index: int, show_plain_text: bool) -> tuple:
+	"""
+	Returns the (equation, rearranged equation, answer) texts for a solved rearrangement (see 'equationRegistry.Rearrangement').
+	"""
+	unkown_variable = rearrangement.unknown
+	if not show_plain_text:
+		equation = rearrangement.pretty_equation.replace("─", " ", 2)
+		if '\n' in equation:
+			equation = "   " + equation
+		formatted_rearranged_equation = f"{unkown_variable} = {rearrangement.pretty_solutions[index]}"
+	else:
+		equation = rearrangement.plain_equation
+		formatted_rearranged_equation = f"{unkown_variable} = {rearrangement.plain_solutions[index]}"
+
+	if solution is None:
+		answer = f"Answer: no real value of {unkown_variable}"
+	else:
+		answer = f"Answer: {unkown_variable} = {solution:.2f} (2 d.p)"
+	return equation, formatted_rearranged_equation, answer
+
+def solve_equation(name: str, unkown_variable: str, values: dict, show_plain_text: bool) -> tuple:
+	"""
+	Solves the equation called 'name' in 'equationRegistry' for 'unkown_variable' and returns the texts from 'format_solution'.
+	This is run on a worker thread, so it does not use pygame.
+	"""
+	rearrangement = equationRegistry.get_rearrangement(name, unkown_variable)
+	solution, index = rearrangement.evaluate(values)
+	return format_solution(rearrangement, solution, index, show_plain_text)
+
+def solve_suvat(missing_variable: str, unkown_variable: str, values: dict, show_plain_text: bool) -> tuple:
+	"""
+	Solves a SUVAT problem and returns the texts from 'format_solution'. This is run on a worker thread, so it does not use pygame.
+	"""
+	solution, rearrangement, index = suvat.solve(missing_variable, unkown_variable, values)
+	return format_solution(rearrangement, solution, index, show_plain_text)
+
+def read_number(text: str) -> float:
+	"""
+	Returns the number typed into a variable box, or None if the text is not a number (e.g. the box still shows its variable name).
+	"""
+	try:
+		value = float(text)
+	except ValueError:
+		return None
+	# 'float' also accepts "nan" and "inf", which cannot be solved with.
+	return value if math.isfinite(value) else None
 
 class EquationSolver:
 	"""
 	This is the base equation solver class for the 'Equation Solver' feature.
-	Due to time constraints this class was not fully implemented but still exists as it is required as a dependency for the
-	'GeneralSUVATSolver' class.
+	It solves one of the equations in 'equationRegistry' (e.g. 'c = fλ' for the 'Waves' screen) for whichever of its variables is
+	entered as '?', and it is also the base of the 'GeneralSUVATSolver' class.
 	"""
 	def __init__(self, screen, title, equation_variables, colour_scheme=DEFAULT_COLOUR_SCHEME, border_width=3, 
 				 title_width=300, title_height=100, title_font="Arial", title_size=40, variable_width=50, variable_height=50, 
-				 variable_font="Arial", variable_size=20) -> object:
+				 variable_font="Arial", variable_size=20, solve_timeout=solverJobs.DEFAULT_TIMEOUT, equation=None) -> object:
 		"""
 		screen: pygame screen object
 			- used as the pygame surface that all of the buttons will be drawn to.
@@ -84,9 +119,20 @@ class EquationSolver:
 			- the font style for the button variable's text on the menu page.
 		variable_size: int [20]
 			- the font size of the text in the variable buttons.
+		solve_timeout: float [solverJobs.DEFAULT_TIMEOUT]
+			- the longest time in seconds that solving is waited for before the answer says that it timed out.
+		equation: str [None]
+			- the name of the equation in 'equationRegistry' that is solved, whose variables must be 'equation_variables'.
 		"""
 		self.screen = screen
 		self.show_plain_text = False
+		# Solving is done on a worker thread (see 'solverJobs'), and while it runs the screen is 'animated' so that the main loop
+		# keeps checking for the answer on every frame.
+		self.solve_timeout = solve_timeout
+		self.equation = equation
+		self.equation_variables = equation_variables
+		self.job = None
+		self.animated = False
 
 		self.centre_x = screen.get_width() // 2
 		self.centre_y = screen.get_height() // 2
@@ -128,27 +174,107 @@ class EquationSolver:
 			
 		# Creating the button list attribute which contains all interactive and non-interactive buttons.
 		self.button_ls = self.menu_buttons + self.variable_buttons
+		# Only the buttons that the input can affect are updated, and only the buttons that have changed are drawn on each frame,
+		# see 'inputDispatcher.InputDispatcher' and 'rendering.RetainedLayer'.
+		self.dispatcher = inputDispatcher.InputDispatcher()
+		self.layer = rendering.RetainedLayer(screen)
+		self.dirty_rects = None
 
 	def solve(self):
 		"""
-		This method has not been implemented due to time constraints.
+		This method will find the unknown variable (the one entered as '?') and rearrange the equation for it (see
+		'equationRegistry'). It will then substitute in all of the known values and display the equation steps in the suitable
+		buttons, which is done on a worker thread so the steps are shown on a later frame (see 'poll_solve').
+		"""
+		# Updates the 'Sovle' button's state as it should no longer be 'clicked'.
+		self.menu_buttons[2].clicked = False
+		if self.equation is None:
+			self.show_input_error("there is no equation to solve")
+			return
+
+		unkown_variable = None
+		values = {}
+		for name, variable in zip(self.equation_variables, self.variable_buttons):
+			if variable.text == "?":
+				unkown_variable = name
+			else:
+				value = read_number(variable.text)
+				if value is None:
+					self.show_input_error(f"{name} must be a number or '?'")
+					return
+				values[name] = value
+		if unkown_variable is None:
+			self.show_input_error("enter '?' for the variable to solve for")
+			return
+
+		self.start_solve(solve_equation, self.equation, unkown_variable, values, self.show_plain_text)
+
+	def show_input_error(self: object, message: str) -> None:
+		"""
+		Shows why the values that were entered cannot be solved in the answer box, instead of solving them. Any solve that is still
+		running is cancelled, as its answer would no longer match what is on the screen.
+		"""
+		self.cancel_solve()
+		self.menu_buttons[5].text = f"Answer: {message}"
+
+	def start_solve(self: object, function, *args) -> None:
+		"""
+		Submits 'function(*args)' to the worker threads, replacing any solve that is still running. The function must return the
+		(equation, rearranged equation, answer) texts, which are shown when it finishes. Until then the answer shows that it is
+		being solved.
+		"""
+		self.cancel_solve()
+		self.job = solverJobs.POOL.submit(function, *args, timeout=self.solve_timeout)
+		self.animated = True
+		self.menu_buttons[5].text = "Answer: solving..."
+
+	def poll_solve(self: object) -> None:
+		"""
+		Checks whether the current solve has finished and, if it has, shows its result. If solving raised an exception then the
+		answer says that it could not be solved (and the exception is printed), so that the program carries on running. If it was
+		never run because every worker thread is stuck on an earlier solve (see 'solverJobs'), then the answer says that instead.
+		"""
+		if self.job is None:
+			return
+		state = self.job.poll()
+		if state in ("pending", "running"):
+			return
+		job, self.job = self.job, None
+		self.animated = False
+		if state == "done":
+			self.menu_buttons[3].text, self.menu_buttons[4].text, self.menu_buttons[5].text = job.result
+		elif state == "timed out":
+			self.menu_buttons[5].text = f"Answer: timed out after {job.timeout:g} s"
+		elif state == "no worker":
+			self.menu_buttons[5].text = "Answer: no solver is free, earlier solves are still running"
+		elif state == "failed":
+			print(f"Solving failed: {job.error!r}")
+			self.menu_buttons[5].text = f"Answer: could not be solved ({type(job.error).__name__})"
+
+	def cancel_solve(self: object) -> None:
+		"""
+		Cancels the current solve (e.g. when the user leaves the screen) so that its result is never shown.
 		"""
-		pass
+		if self.job is not None:
+			self.job.cancel()
+			self.job = None
+		self.animated = False
 
 	def update_menu(self: object, events: List[str]) -> None:
 		"""
-		This method will iterate over every button in the 'button_ls' attribute and will call each button's 'update' and 'draw' methods 
-		in turn.
+		This method will show the answer if solving has finished, call the 'update' method of each button in the 'button_ls'
+		attribute that the input can affect, then draw the buttons that have changed. The parts of the screen that were drawn to are
+		kept in 'dirty_rects' for the main loop.
 		"""
-		for button in self.button_ls:
-			button.update(events)
-			button.draw()
+		self.poll_solve()
+		self.dispatcher.dispatch(self.button_ls, events)
+		self.dirty_rects = self.layer.draw(self.button_ls)
 			
 
 class GeneralSUVATSolver(EquationSolver):
 	def __init__(self, screen, title, equation_variables, colour_scheme=DEFAULT_COLOUR_SCHEME, border_width=3, 
 				 title_width=300, title_height=100, title_font="Arial", title_size=40, variable_width=50, variable_height=50, 
-				 variable_font="Arial", variable_size=20) -> object:
+				 variable_font="Arial", variable_size=20, solve_timeout=solverJobs.DEFAULT_TIMEOUT) -> object:
 		"""
 		screen: pygame screen object
 			- used as the pygame surface that all of the buttons will be drawn to.
@@ -189,10 +315,17 @@ class GeneralSUVATSolver(EquationSolver):
 			- the font style for the button variable's text on the menu page.
 		variable_size: int [20]
 			- the font size of the text in the variable buttons.
+		solve_timeout: float [solverJobs.DEFAULT_TIMEOUT]
+			- the longest time in seconds that solving is waited for before the answer says that it timed out.
 		"""
-		super().__init__(self, screen, title, equation_variables, colour_scheme, border_width, title_width, title_height, 
-						 title_font, title_size, variable_width, variable_height, variable_font, variable_size)
+		super().__init__(screen, title, equation_variables, colour_scheme, border_width, title_width, title_height, 
+						 title_font, title_size, variable_width, variable_height, variable_font, variable_size, solve_timeout)
 
+		# The SUVAT variables are all shown in one column (the base class starts a new column after every 4 variables).
+		variable_bg_col, variable_border_col, variable_text_col = colour_scheme[3:6]
+		variable_selected_border_col = colour_scheme[1]
+		number_of_variables = len(equation_variables)
+		y_offset = number_of_variables * (variable_height // 2) + variable_height//4
 		self.variable_buttons = [buttons.TextInputBox(screen, [100, (self.centre_y + i * 80) - y_offset], variable_width, 
 												variable_height, variable_bg_col, variable_border_col, variable_selected_border_col,
 												border_width, variable_font, variable_size, equation_variables[i], variable_text_col)
@@ -204,52 +337,31 @@ class GeneralSUVATSolver(EquationSolver):
 		"""
 		This method will check which is the missing variable and choose an appropriate 'SUVAT' equation. It will then rearrange that 
 		equation for the unkown variable (which is different from the missing variable). Finally it will substitute in all of the known
-		values and then display the equation steps in the suitable buttons on the 'Generate SUVAT Sovler' menu screen.
-		"""
-		# Check which equation to use.
-		if self.variable_buttons[0].text == "X":
-			equation = SUVAT_EQUATIONS["UVAT"]
-		elif self.variable_buttons[1].text == "X":
-			equation = SUVAT_EQUATIONS["SVAT"]
-		elif self.variable_buttons[2].text == "X":
-			equation = SUVAT_EQUATIONS["SUAT"]
-		elif self.variable_buttons[3].text == "X":
-			equation = SUVAT_EQUATIONS["SUVT"]
-		elif self.variable_buttons[4].text == "X":
-			equation = SUVAT_EQUATIONS["SUVA"]
-		else:
-			raise UnkownUseCaseError("SUVAT equation")
-
-		# Finds the unkown variable.
-		unkown_variable = None
-		for i, variable in enumerate(self.variable_buttons):
-			if variable.text == "?":
-				unkown_variable = SUVAT_vars[i]
-
-		# Rearranges the equation.
-		rearranged_equation = sympy.solve(equation, unkown_variable)
-		if not self.show_plain_text:
-			self.menu_buttons[3].text = sympy.pretty(equation)
-			self.menu_buttons[3].text = self.menu_buttons[3].text.replace("─", " ", 2)
-			if '\n' in self.menu_buttons[3].text:
-				self.menu_buttons[3].text = "   " + self.menu_buttons[3].text 
-
-			formatted_rearranged_equation = f"{unkown_variable} = {sympy.pretty(rearranged_equation[0])}"
-		else:
-			self.menu_buttons[3].text = equation
-			formatted_rearranged_equation = f"{unkown_variable} = {rearranged_equation[0]}"
-
-
-		self.menu_buttons[4].text = formatted_rearranged_equation
-		
-		# Substitutes in the values.
-		sub_values = {}
-		for i in range(5):
-			if self.variable_buttons[i].text not in ["X", "?"]:
-				if type(float(self.variable_buttons[i].text)) == float:
-					sub_values[SUVAT_vars[i]] = float(self.variable_buttons[i].text)
-
-		solution = sympy.simplify(rearranged_equation[0]).evalf(subs = sub_values)
-		self.menu_buttons[5].text = f"Answer: {unkown_variable} = {solution:.2f} (2 d.p)"
+		values and then display the equation steps in the suitable buttons on the 'Generate SUVAT Sovler' menu screen. The solving is
+		done on a worker thread, so the steps are shown on a later frame (see 'poll_solve').
+		"""
 		# Updates the 'Sovle' button's state as it should no longer be 'clicked'.
 		self.menu_buttons[2].clicked = False
+		# Finds the missing variable (which chooses the equation) and the unkown variable.
+		missing_variable = None
+		unkown_variable = None
+		values = {}
+		for i, variable in enumerate(self.variable_buttons):
+			name = suvat.VARIABLE_NAMES[i]
+			if variable.text == "X":
+				missing_variable = name
+			elif variable.text == "?":
+				unkown_variable = name
+			else:
+				value = read_number(variable.text)
+				if value is None:
+					self.show_input_error(f"{self.equation_variables[i]} must be a number, '?' or 'X'")
+					return
+				values[name] = value
+		if missing_variable is None or unkown_variable is None:
+			self.show_input_error("enter 'X' for the missing variable and '?' for the unknown")
+			return
+
+		# The rearranged equation is looked up in the table of rearrangements (see the 'suvat' module), which may mean rearranging it
+		# with sympy, so this is done on a worker thread.
+		self.start_solve(solve_suvat, missing_variable, unkown_variable, values, self.show_plain_text)
@@ -0,0 +1,85 @@
+"""
+Delivers each frame's input to only the buttons that it can affect. Normally every button on a screen is updated on every frame,
+and every button finds the mouse and searches through all of the frame's events itself. Instead, the 'InputDispatcher' works out
+the frame's input once (see 'buttons.FrameInput'), finds the buttons under the mouse with a grid, and only updates those buttons and
+the ones that are still 'active' from the last frame (e.g. a button that needs to stop being highlighted, a selected text box that
+is being typed in, or an open drop down).
+"""
+import buttons
+
+
+def is_active(button: object) -> bool:
+    """
+    Returns True if the button has to be updated on the next frame even if the mouse is not over it.
+    """
+    return (button.bg_colour != button.initial_bg_colour
+            or getattr(button, "show_options", False)
+            or (hasattr(button, "selected_border_colour") and button.border_colour == button.selected_border_colour)
+            # A text box that has just been unselected with no text in it gets its default text back on its next update.
+            or (hasattr(button, "default_text") and button.text == ""))
+
+
+class InputDispatcher:
+    """
+    Keeps a grid of the buttons on one screen. Plain 'Button' and 'TextButton' objects never move or change size, so each one is put
+    into every grid cell that it covers. Every other kind of button (text boxes grow as they are typed in and sliders move) is
+    checked directly on each frame, but there are only ever a few of these on a screen.
+    """
+    def __init__(self: object, cell_size=64) -> object:
+        """
+        cell_size: int [64]
+            - the width and height of each grid cell in pixels.
+        """
+        self.cell_size = cell_size
+        self.button_ls = None
+        self.button_num = 0
+        self.grid = {}
+        self.moving = []
+        self.active = set()
+
+    def reset(self: object) -> None:
+        """
+        Makes the next call to 'dispatch' update every button, e.g. when the screen is shown again.
+        """
+        self.button_ls = None
+
+    def build(self: object, button_ls: list) -> None:
+        self.grid = {}
+        self.moving = []
+        for i, button in enumerate(button_ls):
+            if not button.interactive:
+                continue
+            if type(button) in (buttons.Button, buttons.TextButton):
+                rect = button.pygame_button_object
+                for cell_x in range(rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1):
+                    for cell_y in range(rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1):
+                        self.grid.setdefault((cell_x, cell_y), []).append(i)
+            else:
+                self.moving.append(i)
+        self.button_ls = button_ls
+        self.button_num = len(button_ls)
+
+    def buttons_at(self: object, button_ls: list, mouse_xy) -> set:
+        """
+        Returns the indexes of every interactive button that the point 'mouse_xy' is over.
+        """
+        cell = (mouse_xy[0] // self.cell_size, mouse_xy[1] // self.cell_size)
+        return {i for i in self.grid.get(cell, []) + self.moving if button_ls[i].pygame_button_object.collidepoint(mouse_xy)}
+
+    def dispatch(self: object, button_ls: list, events: list) -> list:
+        """
+        Updates the buttons that the frame's input can affect, in the same order as 'button_ls', and returns them. The first time
+        it is called for a list of buttons (or after 'reset') every interactive button is updated.
+        """
+        frame_input = buttons.FrameInput(events)
+        if button_ls is not self.button_ls or len(button_ls) != self.button_num:
+            self.build(button_ls)
+            targets = [i for i, button in enumerate(button_ls) if button.interactive]
+        else:
+            targets = sorted(self.active | self.buttons_at(button_ls, frame_input.mouse_xy))
+
+        updated = [button_ls[i] for i in targets]
+        for button in updated:
+            button.update(events, frame_input)
+        self.active = {i for i in targets if is_active(button_ls[i])}
+        return updated
@@ -0,0 +1,142 @@
+"""
+Numerical integrators for moving a body (or many bodies stored in NumPy arrays) forward in time given the force acting on it.
+Every integrator only uses +, -, * and / on the values it is given, so the same code works for single floats and whole arrays.
+"""
+import abc
+
+
+class Integrator(abc.ABC):
+    """
+    This is the interface that every integrator has. A new integrator is made by subclassing it, giving it a 'name' and a
+    'force_evaluations' count and writing its 'step' method, and it can only be created once 'step' has been written.
+    """
+    # The name that the integrator is chosen by (see 'INTEGRATORS').
+    name = "integrator"
+    # The number of times the 'force' function is called for each step, when the 'end_force' of the last step is passed back in.
+    force_evaluations = 0
+
+    @abc.abstractmethod
+    def step(self, x, y, momentum_x, momentum_y, mass, force, dt, bounce=None, start_force=None):
+        """
+        Moves a body (or many bodies, if the values are NumPy arrays) forward in time by one step and returns its new
+        (x, y, momentum_x, momentum_y, end_force). 'end_force' is the (x, y) force on the body at its new position if the
+        integrator had to work it out anyway, otherwise it is None.
+        x, y: float or np.ndarray
+            - the position of the body at the start of the step.
+        momentum_x, momentum_y: float or np.ndarray
+            - the momentum of the body at the start of the step.
+        mass: float or np.ndarray
+            - the mass of the body.
+        force: callable
+            - force(x, y) returns the (x, y) components of the force on the body if it were at (x, y).
+        dt: float or np.ndarray
+            - the time step, which can be different for each body when arrays are used.
+        bounce: callable [None]
+            - bounce(x, y, momentum_x, momentum_y) returns the momentum after any bounces off of the edges. It is called once in
+              each step, before the position is moved, so a bounce always takes effect within the same step.
+        start_force: Tuple[float, float] or Tuple[np.ndarray, np.ndarray] [None]
+            - the force on the body at (x, y) if it is already known, which is the 'end_force' of the last step as long as the body
+              has not been moved since. It is used instead of calling 'force' again.
+        """
+
+
+class EulerIntegrator(Integrator):
+    """
+    Explicit Euler: the position is moved using the old momentum and the momentum is changed using the force at the old position.
+    This is the simplest method, but the energy of an orbit grows on every step so orbits slowly spiral outwards.
+    """
+    name = "euler"
+    force_evaluations = 1
+
+    def step(self, x, y, momentum_x, momentum_y, mass, force, dt, bounce=None, start_force=None):
+        if bounce is not None:
+            momentum_x, momentum_y = bounce(x, y, momentum_x, momentum_y)
+        force_x, force_y = force(x, y) if start_force is None else start_force
+        return (x + momentum_x / mass * dt, y + momentum_y / mass * dt,
+                momentum_x + force_x * dt, momentum_y + force_y * dt, None)
+
+
+class SemiImplicitEulerIntegrator(Integrator):
+    """
+    Semi-implicit (symplectic) Euler: the momentum is changed first and the new momentum is used to move the position. This is what
+    'SolarBody.move' has always done. It costs the same as explicit Euler but the energy stays close to its starting value.
+    """
+    name = "semi-implicit euler"
+    force_evaluations = 1
+
+    def step(self, x, y, momentum_x, momentum_y, mass, force, dt, bounce=None, start_force=None):
+        force_x, force_y = force(x, y) if start_force is None else start_force
+        momentum_x = momentum_x + force_x * dt
+        momentum_y = momentum_y + force_y * dt
+        if bounce is not None:
+            momentum_x, momentum_y = bounce(x, y, momentum_x, momentum_y)
+        return x + momentum_x / mass * dt, y + momentum_y / mass * dt, momentum_x, momentum_y, None
+
+
+class LeapfrogIntegrator(Integrator):
+    """
+    Leapfrog / velocity Verlet (kick-drift-kick): half a step of momentum change, a full step of movement, then another half step of
+    momentum change using the force at the new position. It is second order and symplectic, so much larger time steps can be used
+    for the same accuracy. The force at the new position is returned as 'end_force', so when it is passed back in as the next
+    step's 'start_force' each step only needs one new force calculation.
+    """
+    name = "leapfrog"
+    force_evaluations = 1
+
+    def step(self, x, y, momentum_x, momentum_y, mass, force, dt, bounce=None, start_force=None):
+        # The bounce is done before the first half step of momentum change. Done after it, the reversed momentum would keep the
+        # reversed half step, which changes the energy by about force * speed * dt.
+        if bounce is not None:
+            momentum_x, momentum_y = bounce(x, y, momentum_x, momentum_y)
+        force_x, force_y = force(x, y) if start_force is None else start_force
+        momentum_x = momentum_x + force_x * (dt / 2)
+        momentum_y = momentum_y + force_y * (dt / 2)
+        x = x + momentum_x / mass * dt
+        y = y + momentum_y / mass * dt
+        force_x, force_y = force(x, y)
+        return x, y, momentum_x + force_x * (dt / 2), momentum_y + force_y * (dt / 2), (force_x, force_y)
+
+
+class RK4Integrator(Integrator):
+    """
+    The classic fourth order Runge-Kutta method. It is very accurate for each step, but needs four force calculations per step and
+    is not symplectic, so over very long runs its energy still slowly drifts.
+    """
+    name = "rk4"
+    force_evaluations = 4
+
+    def step(self, x, y, momentum_x, momentum_y, mass, force, dt, bounce=None, start_force=None):
+        if bounce is not None:
+            momentum_x, momentum_y = bounce(x, y, momentum_x, momentum_y)
+        k1_fx, k1_fy = force(x, y) if start_force is None else start_force
+        k1_vx, k1_vy = momentum_x / mass, momentum_y / mass
+
+        k2_fx, k2_fy = force(x + k1_vx * (dt / 2), y + k1_vy * (dt / 2))
+        k2_vx, k2_vy = (momentum_x + k1_fx * (dt / 2)) / mass, (momentum_y + k1_fy * (dt / 2)) / mass
+
+        k3_fx, k3_fy = force(x + k2_vx * (dt / 2), y + k2_vy * (dt / 2))
+        k3_vx, k3_vy = (momentum_x + k2_fx * (dt / 2)) / mass, (momentum_y + k2_fy * (dt / 2)) / mass
+
+        k4_fx, k4_fy = force(x + k3_vx * dt, y + k3_vy * dt)
+        k4_vx, k4_vy = (momentum_x + k3_fx * dt) / mass, (momentum_y + k3_fy * dt) / mass
+
+        return (x + (k1_vx + 2 * k2_vx + 2 * k3_vx + k4_vx) * (dt / 6),
+                y + (k1_vy + 2 * k2_vy + 2 * k3_vy + k4_vy) * (dt / 6),
+                momentum_x + (k1_fx + 2 * k2_fx + 2 * k3_fx + k4_fx) * (dt / 6),
+                momentum_y + (k1_fy + 2 * k2_fy + 2 * k3_fy + k4_fy) * (dt / 6), None)
+
+
+# The 'INTEGRATORS' dictionary is a way of choosing an integrator by name, e.g. from the command line.
+INTEGRATORS = {integrator.name: integrator for integrator in [EulerIntegrator(), SemiImplicitEulerIntegrator(),
+                                                               LeapfrogIntegrator(), RK4Integrator()]}
+
+
+def get_integrator(integrator):
+    """
+    Returns the integrator with the given name, or the integrator itself if an 'Integrator' object is passed in.
+    """
+    if isinstance(integrator, Integrator):
+        return integrator
+    if integrator not in INTEGRATORS:
+        raise ValueError(f"Unknown integrator '{integrator}', choose from {list(INTEGRATORS)}")
+    return INTEGRATORS[integrator]
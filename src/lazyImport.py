@@ -0,0 +1,27 @@
+"""
+Imports a module the first time that one of its attributes is used, instead of when the program starts, e.g.:
+    physics = lazyImport.lazy_import("physics")
+makes 'physics' a module object straight away, but 'physics.py' (and NumPy, which it imports) is only run when something like
+'physics.SolarSystem' is first looked up. This is used for the parts of the program that are slow to import and are not needed
+to draw the main menu (the simulations, and the equation solvers which import sympy).
+The module should first be used from the main thread, as Python 3.11's lazy loader is not safe to trigger from two threads at once.
+"""
+import importlib.util
+import sys
+
+
+def lazy_import(name: str) -> object:
+    """
+    Returns the module called 'name', which has not been run yet unless it had already been imported.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -1,10 +1,28 @@
 # Imports modules
 import pygame
 import menus
-import equationSolver
+import simulationLoop
+import profiler
 import tests
 
-def main():
+def main(frame_rate=60, physics_rate=60, max_steps_per_frame=5, idle_timeout=1000):
+    """
+    frame_rate: int [60]
+        - the most frames that will be drawn per second (0 for no limit).
+    physics_rate: int [60]
+        - the number of physics steps that the simulations run per second.
+    max_steps_per_frame: int [5]
+        - the most physics steps that will be run before each frame is drawn.
+    idle_timeout: int [1000]
+        - on screens that are not animated (see below), the longest time in milliseconds that the loop sleeps for at a time while
+          there is no input. If it wakes up without any events then nothing has changed, so nothing is updated or redrawn.
+
+    Screens with an 'animated' attribute that is True (the simulations) are drawn on every frame. Every other screen (the menus,
+    login screens and equation solvers) only changes when the user does something, so for these the loop sleeps until there is an
+    event and only then updates and redraws the screen.
+
+    Pressing F3 shows how long each part of a frame takes and F4 records the frame times to a CSV file (see 'profiler').
+    """
 
     # Useful constants
     WIDTH = 800
@@ -16,28 +34,73 @@ def main():
     # pygame initialisation
     pygame.init()
     screen = pygame.display.set_mode(SIZE)
-    clock = pygame.time.Clock()
+    loop = simulationLoop.FixedTimestepLoop(physics_rate, max_steps_per_frame, frame_rate)
+    PROFILER = profiler.PROFILER
+    overlay = profiler.ProfilerOverlay(screen)
 
-    menu = menus.Menu(screen, "A Level Physics Helper", ["Login", "Sign Up", "Continue As Guest", "Quit"])
+    menu = menus.get_screen("Main Menu", screen)
     # menu = equationSolver.EquationSolver(screen, "test", ["w", "x", "y", "z"])
     
+    # The new screen has to be drawn once even if it is not animated.
+    redraw = True
+
     # Main loop
     while True:
-
-        events = pygame.event.get()
+        if getattr(menu, "animated", False) or redraw:
+            # Waits so that the frame rate is capped and finds how long the last frame took.
+            frame_time = loop.tick()
+            PROFILER.begin_frame()
+            with PROFILER.scope("events"):
+                events = pygame.event.get()
+        else:
+            # Nothing on the screen can change until there is an event, so the program sleeps until then.
+            frame_time = 0.0
+            events = loop.wait_for_events(idle_timeout)
+            if not events:
+                continue
+            PROFILER.begin_frame()
+        redraw = False
 
         # Checks for the users closing the program using their OS's window manager.
         for event in events:
             if event.type == pygame.QUIT:
                 menus.handle_quit(screen, events)
+        if overlay.handle_events(events) and hasattr(menu, "layer"):
+            # The overlay has been hidden, so the menu under it has to be drawn again.
+            menu.layer.invalidate()
+
+        # Simulations have a 'step' method which is run at a fixed rate, and they are then drawn part way between their last
+        # two steps so that they still move smoothly when the frame rate and the physics rate are different.
+        if hasattr(menu, "step"):
+            with PROFILER.scope("physics"):
+                loop.advance(menu.step, frame_time)
+            menu.alpha = loop.alpha
 
         # Updates the menu, this function will either return the menu object passed or a new menu object.
-        menu = menus.update_menu_system(menu, events, screen)
+        previous_menu = menu
+        with PROFILER.scope("menu"):
+            menu = menus.update_menu_system(menu, events, screen)
+        if menu is not previous_menu:
+            # A simulation can ask for its own number of steps per second with a 'physics_rate' attribute.
+            loop.reset(getattr(menu, "physics_rate", None))
+            redraw = True
+        overlay_rect = overlay.draw()
 
-        # Updates the screen so that all items drawn can be seen by user.
-        pygame.display.update()
-        # Clears the screen by filling it with black so that the screen is ready to have new items drawn to it.
-        screen.fill(BLACK)
+        # Menus that only draw the buttons that have changed (see 'rendering.RetainedLayer') give the parts of the screen that
+        # changed, and only these are sent to the display. The screen is not cleared as the rest of it is still correct.
+        dirty_rects = getattr(previous_menu, "dirty_rects", None)
+        with PROFILER.scope("display"):
+            if dirty_rects is not None and menu is previous_menu:
+                pygame.display.update(dirty_rects + [overlay_rect] if overlay_rect else dirty_rects)
+                # A button's action (e.g. 'Solve') can change how the screen looks after it was drawn, so one more frame is
+                # drawn after any input.
+                redraw = redraw or bool(events)
+            else:
+                # Updates the screen so that all items drawn can be seen by user.
+                pygame.display.update()
+                # Clears the screen by filling it with black so that the screen is ready to have new items drawn to it.
+                screen.fill(BLACK)
+        PROFILER.end_frame()
 
 # Run the main function if this is the main file.
 if __name__ == "__main__":
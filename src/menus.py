@@ -1,13 +1,39 @@
+import os
 import pygame
 import time
 import buttons
-import physics
-import equationSolver
 import dataBase
+import lazyImport
+import rendering
+import inputDispatcher
 from typing import List
 from tests import ImplementationError, UnkownUseCaseError
 
-database = dataBase.DataBase()
+# The simulations and the equation solvers (which import sympy) are slow to import, so they are only imported when one of their
+# screens is first opened (see 'lazyImport').
+physics = lazyImport.lazy_import("physics")
+equationSolver = lazyImport.lazy_import("equationSolver")
+trajectory = lazyImport.lazy_import("trajectory")
+
+# The file that each simulation screen records to with its 'Record' button, keyed by screen name. The files are kept in the
+# user's data folder (see 'get_recording_path'), and each file only keeps the last recording, which is what its 'Replay' button
+# plays back.
+RECORDINGS = {"Space System": "space_system.traj", "PointP": "point_particles.traj"}
+# The most steps that a recording made from the program holds (5 minutes at 60 steps per second), after this it stops recording.
+# The file only grows as big as the recording actually is.
+RECORDING_MAX_STEPS = 18000
+
+# The database is only connected to when it is first needed (see 'get_database'), so a guest never opens it.
+_database = None
+
+def get_database() -> dataBase.DataBase:
+    """
+    Returns the database, connecting to it the first time it is needed.
+    """
+    global _database
+    if _database is None:
+        _database = dataBase.DataBase()
+    return _database
 
 # A defalt colour scheme I developed by picking colours that I thought looked similar to the ones in the design stage of the
 # project. This is currently a prototype so I will need to consult my stakeholders about the current colour scheme.
@@ -30,39 +56,43 @@ MENU_TITLES = {
     "Guest Menu": "Guest Mode",
     "Student Menu": "Student Mode",
     "Teacher Menu": "Teacher Mode",
+    "Logged In Menu": "Logged In User Mode",
+    "Logged Out Menu": "You have successfully been logged out",
     "Vis 1": "Visualisations Page 1",
     "Vis 2": "Visualisations Page 2",
     "Vis 3": "Visualisations Page 3",
     "Space Phys": "Space Physics",
     "Space System": "SolarBody",
+    "N-Body": "N-Body Simulation",
     "Rigid Bodies": "Rigid Body Particles",
     "PointP": "PointParticle",
     "EqSol 1": "Equation Solver Page 1",
+    "EqSol 2": "Equation Solver Page 2",
     "EqSol SUVAT": "General SUVAT Solver",
+    "EqSol Any Other": "'Any Other' Equations Solver",
+    "EqSol Waves": "Waves Test",
     # etc.
 }
 
-def handle_sign_up_clicked(current_menu, events, screen):
-    menu_title = current_menu.button_ls[0].text
-    if menu_title == MENU_TITLES["Main Menu"]:
-        current_menu = SignUpMenu(screen, "Create an Account", [["Full Name", False], ["Password", True], 
-                                  ["Password Again", True]], [["Class ID", "A", "B", "C", "D"], ["Year", "12", "13"]])
-    elif menu_title == MENU_TITLES["Sign Up Menu"]:
-        if dataBase.validate_sign_up(current_menu):
-            password_hash = dataBase.generate_password_hash(current_menu.button_ls[2].text)
-            names = current_menu.button_ls[1].text.split(" ")
-            surname = names.pop()
-            first_names = ""
-            for name in names:
-                first_names += f"{name} "
-            first_names = first_names.strip()
-            classID = current_menu.button_ls[4].text + current_menu.button_ls[5].text
-            ID = dataBase.generate_next_id(database, "students")
-            data = [ID, first_names, surname, classID, password_hash]
-            database.add_data("students", data)
-            current_menu = Menu(screen, "A Level Physics Helper", ["Login", "Sign Up", "Continue As Guest", "Quit"])
-    else:
-        raise UnkownUseCaseError("Sign Up")
+def handle_sign_up_submitted(current_menu, events, screen):
+    """
+    Adds a new student to the database from the 'Create an Account' menu if the details entered are valid, and then goes back to
+    the main menu.
+    """
+    if dataBase.validate_sign_up(current_menu):
+        password_hash = dataBase.generate_password_hash(current_menu.button_ls[2].text)
+        names = current_menu.button_ls[1].text.split(" ")
+        surname = names.pop()
+        first_names = ""
+        for name in names:
+            first_names += f"{name} "
+        first_names = first_names.strip()
+        classID = current_menu.button_ls[4].text + current_menu.button_ls[5].text
+        database = get_database()
+        ID = dataBase.generate_next_id(database, "students")
+        data = [ID, first_names, surname, classID, password_hash]
+        database.add_data("students", data)
+        current_menu = get_screen("Main Menu", screen)
 
     return current_menu
 
@@ -70,13 +100,8 @@ def handle_user_login(current_menu, screen, database):
     entered_userID = current_menu.button_ls[1].text
     entered_password_hash = dataBase.generate_password_hash(current_menu.button_ls[2].text)
 
-    rows = database.read_all_data_from_table("students")
-
-    userIDs = [row[0] for row in rows]
-    if entered_userID in userIDs:
-        id_index = userIDs.index(entered_userID)
-        user_record = rows[id_index]
-    else:
+    user_record = database.read_record("students", entered_userID)
+    if user_record is None:
         raise Exception("User with given user ID not in database")
 
     if user_record[4] == entered_password_hash:
@@ -84,72 +109,59 @@ def handle_user_login(current_menu, screen, database):
 
     return current_menu
 
-def handle_login_clicked(current_menu: object, events: List[str], screen: object):
+def handle_solve_clicked(current_menu, events, screen):
+    current_menu.solve()
+    return current_menu
+
+def handle_plain_text_clicked(current_menu, events, screen):
+    current_menu.show_plain_text = not current_menu.show_plain_text
+    print("Swapped")
+    return current_menu
+
+def get_recording_path(name):
     """
-    This subroutine will check which menu screen is the 'current_menu' and depending on its result it will apply the suitable
-    method of the 'Login' button. If the 'current_menu' isn't recognised as one of the predefined menus from the 'MENU_TITLES',
-    then this subroutine will raise an implmentation error. For any other case this subroutine will raise an unkown use case error.
+    Returns the path of the recording file of the screen called 'name', in the folder from 'trajectory.default_recording_folder'.
     """
-    menu_title = current_menu.button_ls[0].text
-    if menu_title == MENU_TITLES["Main Menu"]:
-        current_menu = LoginMenu(screen, "Login Menu", [["User ID", False], ["Password", True]]) 
-    elif menu_title == MENU_TITLES["Login Menu"]:
-        current_menu = handle_user_login(current_menu, screen, database)
-    else:
-        raise UnkownUseCaseError("Login")
-    
-    return current_menu
+    return os.path.join(trajectory.default_recording_folder(), RECORDINGS[name])
 
-def handle_go_back_clicked(current_menu, events, screen):
+def stop_recording(current_menu):
     """
-    This subroutine will check which menu screen is the 'current_menu' and depending on its result it will apply the suitable
-    method of the 'Go Back' button. If the 'current_menu' isn't recognised as one of the predefined menus from the 'MENU_TITLES',
-    then this subroutine will raise an implmentation error. For any other case this subroutine will raise an unkown use case error.
+    Stops and saves the recording of the simulation on 'current_menu', if it is being recorded.
     """
-    menu_title = current_menu.button_ls[0].text
-    if menu_title in [MENU_TITLES["Login Menu"], MENU_TITLES["Sign Up Menu"], MENU_TITLES["Guest Menu"]]:
-        current_menu = Menu(screen, "A Level Physics Helper", ["Login", "Sign Up", "Continue As Guest", "Quit"])
-    elif menu_title == MENU_TITLES["Vis 1"]:
-        current_menu = Menu(screen, "Guest Mode", ["Visualisations", "Equation Solver", "Go Back", "Quit"])
-    elif menu_title == MENU_TITLES["Vis 2"]:
-        current_menu = Menu(screen, "Visualisations Page 1", ["Cloth Physics", "Rigid Bodies", "Next Page", "Go Back"])
-    elif menu_title == MENU_TITLES["Vis 3"]:
-        current_menu = Menu(screen, "Visualisations Page 2", ["Phase Change", "Fire Visualisation", "Next Page", "Go Back"])
-    elif menu_title == MENU_TITLES["Space Phys"]:
-        current_menu = Menu(screen, "Visualisations Page 3", ["Space Physics", "Go Back"])
-    elif menu_title == MENU_TITLES["Space System"]:
-        current_menu = Menu(screen, "Space Physics", ["Solar System", "N-Body", "Binary Stars", "Go Back"])
-    elif menu_title == MENU_TITLES["Rigid Bodies"]:
-        current_menu = Menu(screen, "Visualisations Page 1", ["Cloth Physics", "Rigid Bodies", "Next Page", "Go Back"])
-    elif menu_title == MENU_TITLES["PointP"]:
-        current_menu = Menu(screen, "Rigid Body Particles", ["Point Particles",  "Polygons", "Go Back"])
-    elif menu_title == MENU_TITLES["EqSol 1"]:
-        current_menu = Menu(screen, "Guest Mode", ["Visualisations", "Equation Solver", "Go Back", "Quit"])
-    elif menu_title == MENU_TITLES["EqSol SUVAT"]:
-        current_menu = Menu(screen, "Equation Solver Page 1", ["General SUVAT",  "Waves", "Next Page", "Go Back"])
-    else:
-        raise UnkownUseCaseError("Go Back", menu_title)
-    
-    return current_menu
+    if getattr(current_menu, "recorder", None) is not None:
+        current_menu.recorder.close()
+        current_menu.recorder = None
 
-def handle_next_page_clicked(current_menu, events, screen):
+def handle_record_clicked(current_menu, events, screen):
     """
-    This subroutine will check which menu screen is the 'current_menu' and depending on its result it will apply the suitable
-    method of the 'Next Page' button. If the 'current_menu' isn't recognised as one of the predefined menus from the 'MENU_TITLES',
-    then this subroutine will raise an implmentation error. For any other case this subroutine will raise an unkown use case error.
+    Starts recording the simulation on the current screen to its file in 'RECORDINGS', or stops the recording if one is running.
+    The text of the button shows which of these clicking it will do.
     """
-    menu_title = current_menu.button_ls[0].text
-    if menu_title == MENU_TITLES["Vis 1"]:
-        current_menu = Menu(screen, "Visualisations Page 2", ["Phase Change", "Fire Visualisation", "Next Page", "Go Back"])
-    elif menu_title == MENU_TITLES["Vis 2"]:
-        current_menu = Menu(screen, "Visualisations Page 3", ["Space Physics", "Go Back"])
-    elif menu_title == MENU_TITLES["EqSol 1"]:
-        current_menu = Menu(screen, "Equation Solver Page 2", ["Mechanics",  "Materials", "Next Page", "Go Back"])
+    if current_menu.recorder is None:
+        path = get_recording_path(get_screen_name(current_menu))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            current_menu.recorder = trajectory.TrajectoryRecorder(path, current_menu, RECORDING_MAX_STEPS)
+        except OSError as error:
+            print(f"The recording could not be saved to {path} ({error})")
     else:
-        raise UnkownUseCaseError("Next Page", menu_title)
-
+        stop_recording(current_menu)
+    for button in current_menu.buttons:
+        if getattr(button, "text", None) in ("Record", "Stop Recording"):
+            button.text = "Record" if current_menu.recorder is None else "Stop Recording"
     return current_menu
 
+def handle_replay_clicked(current_menu, events, screen):
+    """
+    Stops any recording and shows the replay of the last recording of the simulation on the current screen. If it has never been
+    recorded then the simulation carries on.
+    """
+    stop_recording(current_menu)
+    name = get_screen_name(current_menu)
+    if not os.path.exists(get_recording_path(name)):
+        return current_menu
+    return get_screen(name + " Replay", screen)
+
 def handle_quit(screen, events):
     """
     This subroutine sets the current menu to the ‘goodbye’ menu and then it will manually clear, draw to, and update the screen. 
@@ -160,69 +172,170 @@ def handle_quit(screen, events):
     screen.fill((0,0,0))
     current_menu.update_menu(events)
     pygame.display.update()
-    database.close_connection()
+    if _database is not None:
+        _database.close_connection()
     quit()
-    
+
+
+# The 'SCREENS' dictionary has a function that builds each screen of the program, keyed by its name in 'MENU_TITLES'. A screen is
+# only built the first time it is shown and, unless it is in 'UNCACHED_SCREENS', the same object is shown again when it is revisited.
+SCREENS = {
+    "Main Menu": lambda screen: Menu(screen, MENU_TITLES["Main Menu"], ["Login", "Sign Up", "Continue As Guest", "Quit"]),
+    "Login Menu": lambda screen: LoginMenu(screen, MENU_TITLES["Login Menu"], [["User ID", False], ["Password", True]]),
+    "Sign Up Menu": lambda screen: SignUpMenu(screen, MENU_TITLES["Sign Up Menu"], [["Full Name", False], ["Password", True], 
+                                              ["Password Again", True]], [["Class ID", "A", "B", "C", "D"], ["Year", "12", "13"]]),
+    "Guest Menu": lambda screen: Menu(screen, MENU_TITLES["Guest Menu"], ["Visualisations", "Equation Solver", "Go Back", "Quit"]),
+    "Logged In Menu": lambda screen: Menu(screen, MENU_TITLES["Logged In Menu"], ["Visualisations", "Equation Solver", "Log Out", 
+                                                                                 "Quit"]),
+    "Logged Out Menu": lambda screen: Menu(screen, MENU_TITLES["Logged Out Menu"], ["Return to Main Menu", "Quit"], 
+                                           title_width=790, option_width=250),
+    "Vis 1": lambda screen: Menu(screen, MENU_TITLES["Vis 1"], ["Cloth Physics", "Rigid Bodies", "Next Page", "Go Back"]),
+    "Vis 2": lambda screen: Menu(screen, MENU_TITLES["Vis 2"], ["Phase Change", "Fire Visualisation", "Next Page", "Go Back"]),
+    "Vis 3": lambda screen: Menu(screen, MENU_TITLES["Vis 3"], ["Space Physics", "Go Back"]),
+    "Space Phys": lambda screen: Menu(screen, MENU_TITLES["Space Phys"], ["Solar System", "N-Body", "Binary Stars", "Go Back"]),
+    # Leapfrog with dt = 0.005 drifts less in energy than the original semi-implicit Euler with dt = 0.001 (see 'benchmarks.py 
+    # integrators'), and at 12 steps per second instead of 60 the planets move at the same speed for a fifth of the CPU time.
+    "Space System": lambda screen: physics.SolarSystem(screen, integrator="leapfrog", dt=0.005, physics_rate=12),
+    "N-Body": lambda screen: physics.NBodySystem(screen),
+    "Rigid Bodies": lambda screen: Menu(screen, MENU_TITLES["Rigid Bodies"], ["Point Particles",  "Polygons", "Go Back"]),
+    "PointP": lambda screen: physics.PointParticleSystem(screen, 150),
+    "Space System Replay": lambda screen: trajectory.TrajectoryReplay(screen, get_recording_path("Space System"),
+                                                                           back_button=True),
+    "PointP Replay": lambda screen: trajectory.TrajectoryReplay(screen, get_recording_path("PointP"), back_button=True),
+    "EqSol 1": lambda screen: Menu(screen, MENU_TITLES["EqSol 1"], ["General SUVAT", "Any Other", "Next Page", "Go Back"]),
+    "EqSol 2": lambda screen: Menu(screen, MENU_TITLES["EqSol 2"], ["Mechanics",  "Materials", "Waves", "Go Back"]),
+    "EqSol SUVAT": lambda screen: equationSolver.GeneralSUVATSolver(screen, MENU_TITLES["EqSol SUVAT"], ["S", "U", "V", "A", "T"], 
+                                                                    title_width=500),
+    "EqSol Any Other": lambda screen: equationSolver.EquationSolver(screen, MENU_TITLES["EqSol Any Other"], 10 * [""], 
+                                                                    title_width=500),
+    "EqSol Waves": lambda screen: equationSolver.EquationSolver(screen, MENU_TITLES["EqSol Waves"], ["c", "f", "λ"], 
+                                                                equation="Waves"),
+}
+
+# The simulations start again from the beginning each time, the replays show the latest recording, and the login, sign up and
+# equation solver screens must not keep what was typed into them (e.g. passwords), so these are built again every time they are shown.
+UNCACHED_SCREENS = {"Login Menu", "Sign Up Menu", "Space System", "N-Body", "PointP", "Space System Replay", "PointP Replay",
+                    "EqSol SUVAT", "EqSol Any Other", "EqSol Waves"}
+
+# The 'NAVIGATION' dictionary says what happens when a button is clicked. It is keyed by (screen name, button text), or by
+# (None, button text) for a button that does the same thing on every screen. The value is either the name of the screen to go to or
+# a function that takes (current_menu, events, screen) and returns the menu to show next.
+NAVIGATION = {
+    ("Main Menu", "Login"): "Login Menu",
+    ("Login Menu", "Login"): lambda current_menu, events, screen: handle_user_login(current_menu, screen, get_database()),
+    ("Main Menu", "Sign Up"): "Sign Up Menu",
+    ("Sign Up Menu", "Sign Up"): handle_sign_up_submitted,
+
+    ("Login Menu", "Go Back"): "Main Menu",
+    ("Sign Up Menu", "Go Back"): "Main Menu",
+    ("Guest Menu", "Go Back"): "Main Menu",
+    ("Vis 1", "Go Back"): "Guest Menu",
+    ("Vis 2", "Go Back"): "Vis 1",
+    ("Vis 3", "Go Back"): "Vis 2",
+    ("Space Phys", "Go Back"): "Vis 3",
+    ("Space System", "Go Back"): "Space Phys",
+    ("N-Body", "Go Back"): "Space Phys",
+    ("Rigid Bodies", "Go Back"): "Vis 1",
+    ("PointP", "Go Back"): "Rigid Bodies",
+    ("Space System Replay", "Go Back"): "Space System",
+    ("PointP Replay", "Go Back"): "PointP",
+    ("EqSol 1", "Go Back"): "Guest Menu",
+    ("EqSol 2", "Go Back"): "EqSol 1",
+    ("EqSol SUVAT", "Go Back"): "EqSol 1",
+    ("EqSol Any Other", "Go Back"): "EqSol 1",
+    ("EqSol Waves", "Go Back"): "EqSol 2",
+
+    ("Vis 1", "Next Page"): "Vis 2",
+    ("Vis 2", "Next Page"): "Vis 3",
+    ("EqSol 1", "Next Page"): "EqSol 2",
+
+    (None, "Continue As Guest"): "Guest Menu",
+    (None, "Access Main Page"): "Logged In Menu",
+    (None, "Log Out"): "Logged Out Menu",
+    (None, "Return to Main Menu"): "Main Menu",
+    (None, "Visualisations"): "Vis 1",
+    (None, "Equation Solver"): "EqSol 1",
+    (None, "General SUVAT"): "EqSol SUVAT",
+    (None, "Any Other"): "EqSol Any Other",
+    (None, "Waves"): "EqSol Waves",
+    (None, "Space Physics"): "Space Phys",
+    (None, "Solar System"): "Space System",
+    (None, "N-Body"): "N-Body",
+    (None, "Rigid Bodies"): "Rigid Bodies",
+    (None, "Point Particles"): "PointP",
+    (None, "Solve"): handle_solve_clicked,
+    (None, "View In Plain Text"): handle_plain_text_clicked,
+    (None, "Record"): handle_record_clicked,
+    (None, "Stop Recording"): handle_record_clicked,
+    (None, "Replay"): handle_replay_clicked,
+    (None, "Quit"): lambda current_menu, events, screen: handle_quit(screen, events),
+}
+
+# These buttons do something different on each screen, so clicking one on a screen that has no entry for it is an error.
+SCREEN_SPECIFIC_BUTTONS = {"Login", "Sign Up", "Go Back", "Next Page"}
+
+# Used to find the name of a menu that was not built by 'get_screen' from its title.
+TITLE_TO_SCREEN = {title: name for name, title in MENU_TITLES.items()}
+
+# The screens that have been built so far, keyed by name, as (pygame screen, menu object).
+_screen_cache = {}
+
+
+def get_screen(name: str, screen: object) -> object:
+    """
+    Returns the menu object for the screen called 'name', building it if it has not been shown before (or is not cached). A cached
+    menu is reset so that it looks the same as when it was first shown.
+    """
+    cached = _screen_cache.get(name)
+    if cached is not None and cached[0] is screen:
+        cached[1].reset_menu()
+        return cached[1]
+
+    menu = SCREENS[name](screen)
+    menu.screen_name = name
+    if name not in UNCACHED_SCREENS:
+        _screen_cache[name] = (screen, menu)
+    return menu
+
+def get_screen_name(menu: object) -> str:
+    name = getattr(menu, "screen_name", None)
+    if name is None:
+        name = TITLE_TO_SCREEN.get(menu.button_ls[0].text)
+    return name
+
 def update_menu_system(current_menu, events, screen):
     """
     This is the function that handles all of the menus in the menu system. It is the way that all of the menus are 'linked together'.
     It will return the current menu that needs to be rendered.
     """
     current_menu.update_menu(events)
+    previous_menu = current_menu
+    menu_name = get_screen_name(current_menu)
     for button in current_menu.button_ls:
-        if button.clicked and str(type(button))[16:-2] == "TextButton": # and object type is text button
-            if button.text == "Login":
-                current_menu = handle_login_clicked(current_menu, events, screen)
-            elif button.text == "Sign Up":
-                current_menu = handle_sign_up_clicked(current_menu, events, screen)
-            elif button.text == "Continue As Guest":
-                current_menu = Menu(screen, "Guest Mode", ["Visualisations", "Equation Solver", "Go Back", "Quit"])
-            elif button.text == "Access Main Page":
-                current_menu = Menu(screen, "Logged In User Mode", ["Visualisations", "Equation Solver", "Log Out", "Quit"])
-            elif button.text == "Log Out":
-                current_menu = Menu(screen, "You have successfully been logged out", ["Return to Main Menu", "Quit"], 
-                                    title_width=790, option_width=250)
-            elif button.text == "Return to Main Menu":
-                current_menu = Menu(screen, "A Level Physics Helper", ["Login", "Sign Up", "Continue As Guest", "Quit"])
-            elif button.text == "Visualisations":
-                current_menu = Menu(screen, "Visualisations Page 1", ["Cloth Physics", "Rigid Bodies", "Next Page", "Go Back"])
-            elif button.text == "Equation Solver":
-                current_menu = Menu(screen, "Equation Solver Page 1", ["General SUVAT", "Any Other", "Next Page", "Go Back"])
-            elif button.text == "General SUVAT":
-                current_menu = equationSolver.GeneralSUVATSolver(screen, "General SUVAT Solver", ["S", "U", "V", "A", "T"], title_width=500)
-            elif button.text == "Any Other":
-                current_menu = equationSolver.EquationSolver(screen, "'Any Other' Equations Solver", 10 * [""], title_width=500)
-            elif button.text == "Solve":
-                current_menu.solve()
-            elif button.text == "View In Plain Text":
-                current_menu.show_plain_text = not current_menu.show_plain_text
-                button.clicked = False
-                print("Swapped")
-            elif button.text == "Waves":
-                current_menu = equationSolver.EquationSolver(screen, "Waves Test", ["c", "f", "λ"])
-            elif button.text == "Go Back":
-                current_menu = handle_go_back_clicked(current_menu, events, screen)
-            elif button.text == "Next Page":
-                current_menu = handle_next_page_clicked(current_menu, events, screen)
-            elif button.text == "Quit":
-                current_menu = handle_quit(screen, events)
-            elif button.text == "Space Physics":
-                current_menu = Menu(screen, "Space Physics", ["Solar System", "N-Body", "Binary Stars", "Go Back"])
-            elif button.text == "Solar System":
-                current_menu = physics.SolarSystem(screen)
-            elif button.text == "Rigid Bodies":
-                current_menu = Menu(screen, "Rigid Body Particles", ["Point Particles",  "Polygons", "Go Back"])
-            elif button.text == "Point Particles":
-                current_menu = physics.PointParticleSystem(screen, 150)
-            elif button.text == "Phase Change":
-                pass
-                # current_menu = physics.PhaseChangeSystem(screen)
-        elif str(type(button))[16:-2] in ["HorizontalSliderButton", "VerticalSliderButton"]:
+        # Only plain 'TextButton' objects are menu options, not the other buttons that inherit from it (e.g. text input boxes).
+        if button.clicked and type(button) is buttons.TextButton:
+            button.clicked = False
+            action = NAVIGATION.get((menu_name, button.text)) or NAVIGATION.get((None, button.text))
+            if action is None:
+                if button.text in SCREEN_SPECIFIC_BUTTONS:
+                    raise UnkownUseCaseError(button.text, current_menu.button_ls[0].text)
+            elif isinstance(action, str):
+                current_menu = get_screen(action, screen)
+            else:
+                current_menu = action(current_menu, events, screen)
+        elif isinstance(button, buttons.BASE_SliderButton):
             # button_value = -1 * (button.neutral_position - button.centre_pos[0])
             # button_value =  -1 * ((button.neutral_position - button.centre_pos[0]) / (2/3 * button.limit))
             button_value = button.value
             print("limit", button.limit, "value", button_value)
 
+    # An equation that is still being solved when the user leaves its screen is cancelled, as its answer would never be seen.
+    if current_menu is not previous_menu and hasattr(previous_menu, "cancel_solve"):
+        previous_menu.cancel_solve()
+    # A recording is saved when the user leaves the simulation that is being recorded.
+    if current_menu is not previous_menu:
+        stop_recording(previous_menu)
+
     return current_menu
 
 class Menu:
@@ -288,14 +401,30 @@ class Menu:
                           for i in range(len(options))]
         # Creating the button list attribute which contains all interactive and non-interactive buttons.
         self.button_ls = title_button + option_buttons
+        # Only the buttons that the input can affect are updated, and only the buttons that have changed are drawn on each frame,
+        # see 'inputDispatcher.InputDispatcher' and 'rendering.RetainedLayer'.
+        self.dispatcher = inputDispatcher.InputDispatcher()
+        self.layer = rendering.RetainedLayer(screen)
+        self.dirty_rects = None
 
     def update_menu(self: object, events: List[str]) -> None:
         """
-        Updates all of the buttons in the button list by calling their respective 'update' and 'draw' methods.
+        Updates the buttons in the button list that the input can affect by calling their respective 'update' methods, and draws
+        the ones that have changed. The parts of the screen that were drawn to are kept in 'dirty_rects' for the main loop.
+        """
+        self.dispatcher.dispatch(self.button_ls, events)
+        self.dirty_rects = self.layer.draw(self.button_ls)
+
+    def reset_menu(self: object) -> None:
+        """
+        Is called when the menu is shown again. It clears the buttons' clicked and hover states and makes the whole menu be drawn
+        again, as the screen has been cleared since it was last shown.
         """
         for button in self.button_ls:
-            button.update(events)
-            button.draw()
+            button.clicked = False
+            button.bg_colour = button.initial_bg_colour
+        self.dispatcher.reset()
+        self.layer.refresh()
 
 
 class LoginMenu(Menu):
@@ -0,0 +1,160 @@
+"""
+Runs a grid of headless simulations in parallel and collects a summary of each run into one results table, e.g.:
+    python parameterSweep.py solar --steps 2000 --grid sun_mass=1e7,5e7,1e8 count=200,500 --seeds 0 1 2 --output sweep.csv
+    python parameterSweep.py particles --steps 1000 --grid count=150,500 elasticity=0.5,0.8,1.0 drag=0,0.0001 --seeds 0 1
+Every combination of the grid values and seeds is one run. The runs are shared out between worker processes (one per CPU core by
+default), and each run seeds the random number generator itself, so a run gives the same result no matter which worker runs it
+or what ran before it.
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import batchRun
+
+
+def summarise_solar(system, start_energy):
+    state = system.get_state()
+    radius = np.hypot(state["x"] - 400, state["y"] - 400)
+    energy = system.get_energy()
+    return {"mean_radius": float(np.mean(radius)), "escaped_fraction": float(np.mean(radius > 400)),
+            "median_energy_drift": float(np.median(np.abs((energy - start_energy) / start_energy)))}
+
+
+def summarise_nbody(system, start_energy):
+    state = system.get_state()
+    centre_x = np.average(state["x"], weights=state["mass"])
+    centre_y = np.average(state["y"], weights=state["mass"])
+    kinetic = 0.5 * state["mass"] * (state["velocity_x"] ** 2 + state["velocity_y"] ** 2)
+    return {"mean_radius": float(np.mean(np.hypot(state["x"] - centre_x, state["y"] - centre_y))),
+            "kinetic_energy": float(np.sum(kinetic))}
+
+
+def summarise_particles(system, start_energy):
+    state = system.get_state()
+    speed = np.hypot(state["velocity_x"], state["velocity_y"])
+    return {"mean_speed": float(np.mean(speed)), "kinetic_energy": float(np.sum(0.5 * speed ** 2)),
+            "mean_y": float(np.mean(state["y"])), "collisions": system.collision_count}
+
+
+# The 'SUMMARIES' dictionary maps each system in 'batchRun.SYSTEMS' to the function that turns its final state into the summary
+# statistics for the results table. The second argument is the energy of each body at the start of the run (solar system only).
+SUMMARIES = {
+    "solar": summarise_solar,
+    "nbody": summarise_nbody,
+    "particles": summarise_particles,
+}
+
+
+def expand_grid(grid: dict, seeds=(0,)) -> list:
+    """
+    Returns a list with one dictionary of parameters for every combination of the values in 'grid' and every seed. A value in
+    'grid' that is not a list is used for every run.
+    """
+    names = list(grid)
+    values = [grid[name] if isinstance(grid[name], (list, tuple)) else [grid[name]] for name in names]
+    return [dict(zip(names, combination), seed=seed) for combination in itertools.product(*values) for seed in seeds]
+
+
+def run_configuration(system_name: str, steps: int, parameters: dict) -> dict:
+    """
+    Runs one simulation and returns its row of the results table. 'parameters' can contain 'count' and 'seed' (the same as
+    'batchRun.run_batch') and any keyword arguments of the simulation, e.g. 'sun_mass', 'elasticity' or 'drag'. This is the
+    function that is run in the worker processes, so it only uses its arguments and the modules it imports.
+    """
+    options = dict(parameters)
+    count = options.pop("count", 500)
+    seed = options.pop("seed", 0)
+
+    random.seed(seed)
+    system = batchRun.SYSTEMS[system_name](count, **options)
+    start_energy = system.get_energy() if hasattr(system, "get_energy") else None
+
+    start = time.perf_counter()
+    for step in range(steps):
+        system.step()
+    run_time = time.perf_counter() - start
+
+    row = {"system": system_name, "count": count, "seed": seed, **options, "steps": steps, "run_seconds": run_time}
+    row.update(SUMMARIES[system_name](system, start_energy))
+    return row
+
+
+def run_sweep(system_name: str, configurations: list, steps: int, workers=None) -> list:
+    """
+    Runs every configuration (see 'expand_grid') across a pool of 'workers' processes and returns the rows of the results table
+    in the same order as 'configurations'. If 'workers' is None then one process is used per CPU core, and if it is 1 the runs
+    are done one after another in this process, which is useful for debugging.
+    """
+    if system_name not in batchRun.SYSTEMS:
+        raise ValueError(f"Unknown system '{system_name}', choose from {list(batchRun.SYSTEMS)}")
+    if workers == 1:
+        return [run_configuration(system_name, steps, parameters) for parameters in configurations]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = [executor.submit(run_configuration, system_name, steps, parameters) for parameters in configurations]
+        return [future.result() for future in futures]
+
+
+def write_table(rows: list, path: str) -> None:
+    """
+    Writes the results table to a CSV file. The columns are every key that appears in any row, in the order they first appear.
+    """
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def parse_value(text: str):
+    """
+    Turns a value from the command line into an int, float or bool if it looks like one, otherwise it is left as a string.
+    """
+    if text in ("True", "False"):
+        return text == "True"
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_grid(items: list) -> dict:
+    """
+    Turns a list of 'name=value1,value2,...' strings into a grid dictionary for 'expand_grid'.
+    """
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if not values:
+            raise argparse.ArgumentTypeError(f"'{item}' should be of the form name=value1,value2,...")
+        grid[name.replace("-", "_")] = [parse_value(value) for value in values.split(",")]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a grid of simulations in parallel and summarise the results.")
+    parser.add_argument("system", choices=list(batchRun.SYSTEMS))
+    parser.add_argument("--grid", nargs="*", default=[], help="parameters to sweep, e.g. sun_mass=1e7,5e7 count=200,500")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--workers", type=int, help="number of worker processes, by default one per CPU core")
+    parser.add_argument("--output", default="sweep.csv", help="CSV file for the results table")
+    args = parser.parse_args()
+
+    configurations = expand_grid(parse_grid(args.grid), args.seeds)
+    start = time.perf_counter()
+    rows = run_sweep(args.system, configurations, args.steps, args.workers)
+    write_table(rows, args.output)
+    print(f"{len(rows)} runs of {args.steps} steps in {time.perf_counter() - start:.2f} s "
+          f"({args.workers or os.cpu_count()} workers), results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
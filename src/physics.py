@@ -1,38 +1,84 @@
 import math
 import pygame
+import numpy as np
 import buttons
+import integrators
+import profiler
+import rendering
 from random import randint, random, uniform
 from typing import List
 
+# The size of the area that the simulations take place in when they are run without a screen.
+DEFAULT_BOUNDS = (800, 650)
+
+def get_bounds(screen, bounds=None):
+	"""
+	Returns the (width, height) of the area that a simulation takes place in. This is 'bounds' if it is given, otherwise it is the
+	size of the screen, or 'DEFAULT_BOUNDS' if there is no screen (when the simulation is run headless).
+	"""
+	if bounds is not None:
+		return tuple(bounds)
+	if screen is not None:
+		return screen.get_size()
+	return DEFAULT_BOUNDS
+
+def recording_buttons(screen):
+	"""
+	Returns the 'Record' and 'Replay' buttons that are shown next to the 'Go Back' button of the simulations that can be recorded
+	(see 'menus.handle_record_clicked' and 'trajectory').
+	"""
+	return [buttons.TextButton(screen, [screen.get_width() - 100 - 160 * (i + 1), 50], 150, 80, (87, 201, 242), (18, 49, 227), 3,
+							   "Arial", 20, text, (0, 0, 0)) for i, text in enumerate(["Record", "Replay"])]
+
+
 class SolarBody:
 	"""
 	This is the class which describes the behaviour and functionality of the 'SolarBody' physics object.
 	"""
-	def __init__(self, screen, x, y):
+	def __init__(self, screen, x, y, bounds=None, integrator="semi-implicit euler", dt=0.001):
 		"""
 		screen: pygame screen object
 			- used as the pygame surface that all parts of the button is drawn to.
+			- can be None if the solar body is never drawn.
 		x: int
 			- this is the 'x' location of the SolarBody object.
 			- pygame will use this in order to know how many pixels to draw the solar body from the left side of the screen.
 		y: int
 			- this is the 'y' location of the SolarBody object.
 			- pygame will use this in order to know how many pixels to draw the solar body from the top of the screen.
+		bounds: Tuple[int, int] [None]
+			- the (width, height) of the area the solar body moves in, by default this is the size of the screen.
+		integrator: str or integrators.Integrator ["semi-implicit euler"]
+			- the method used to move the solar body forward in time, one of the names in 'integrators.INTEGRATORS'.
+			- the default is the method that 'move' has always used.
+		dt: float [0.001]
+			- the time step used for each call to 'move'.
+			- the higher order integrators ("leapfrog" and "rk4") stay accurate with much larger time steps.
 		"""
 		self.screen = screen
+		self.width, self.height = get_bounds(screen, bounds)
 		self.g = 0.2
 		self.mass = uniform(1, 10)
 		self.size = int(self.mass / 2)
 		self.x = x
 		self.y = y
+		# The position before the last call to 'move', this is used to draw the body part way between two steps.
+		self.previous_x = x
+		self.previous_y = y
 		self.momentum_x = uniform(200, 600)
 		self.momentum_y = uniform(200, 600)
-		self.dt = 0.001
+		self.dt = dt
+		self.integrator = integrators.get_integrator(integrator)
+		# The force on the body at its current position if the integrator worked it out at the end of the last step (see
+		# 'integrators.Integrator.step'), and the (sun position, sun mass) it was worked out for. It must be set to None if the body
+		# is moved by anything other than 'move'.
+		self.force = None
+		self.force_source = None
 		self.colour = (randint(0, 255), randint(0, 255), randint(0, 255))
 		self.clicked = False
 		self.text = "SolarBody"
 
-	def move(self, x_y_central_mass):
+	def move(self, x_y_central_mass, central_mass=5e7):
 		"""
 		Given that the force between two solar bodies is proportional to the product of their masses divided by the distance between
 		them squared. F = GMm/r^2
@@ -52,31 +98,283 @@ class SolarBody:
 		trigonometry to find this. 
 		tan(theta) = opposite / adjacent = change in y / change in x -> theta = arctan(y2-y1/x2-x1)
 		Now I can say the x component of velocity = velocity * cos(theta) and the y component of velocity = velocity * sin(theta).
+		The 'central_mass' parameter is the mass of the sun, the default value is 5e7.
+		Moving the body forward by 'dt' is done by 'self.integrator', which is given the 'gravity' method to find the force at any
+		position. See 'integrators.py' for how each method works.
+		If the body has gone more than 400 pixels past the edge of the screen, it is bounced back by the integrator (see 'bounce').
 		"""
-		x2 = x_y_central_mass[0]
-		y2 = x_y_central_mass[1]
-		hyp = (self.x - x2) ** 2 + (self.y - y2) ** 2
-		theta = math.atan2(y2 - self.y, x2 - self.x)
-		force = (self.g * self.mass * 5e7) / hyp
-		force_x = force * math.cos(theta)
-		force_y = force * math.sin(theta)
-		self.momentum_x += force_x * self.dt
-		self.momentum_y += force_y * self.dt
+		self.previous_x = self.x
+		self.previous_y = self.y
+		source = (tuple(x_y_central_mass), central_mass)
+		if source != self.force_source:
+			self.force, self.force_source = None, source
 
-		if self.x > self.screen.get_width() + 400 or self.x < -400:
-			self.momentum_x *= -1
-		if self.y > self.screen.get_height() + 400 or self.y < -400:
-			self.momentum_y *= -1
+		force = lambda x, y: self.gravity(x, y, x_y_central_mass, central_mass)
+		self.x, self.y, self.momentum_x, self.momentum_y, self.force = self.integrator.step(
+			self.x, self.y, self.momentum_x, self.momentum_y, self.mass, force, self.dt, self.bounce, self.force)
 
-		self.x += self.momentum_x / self.mass * self.dt
-		self.y += self.momentum_y / self.mass * self.dt
+	def bounce(self, x, y, momentum_x, momentum_y):
+		"""
+		Returns the momentum with each component reversed if the body at (x, y) has gone more than 400 pixels past that edge of the
+		screen. The integrator calls this after the momentum has been changed by the force and before the position is moved, which
+		is where 'move' has always checked for bounces.
+		"""
+		if x > self.width + 400 or x < -400:
+			momentum_x = -momentum_x
+		if y > self.height + 400 or y < -400:
+			momentum_y = -momentum_y
+		return momentum_x, momentum_y
+
+	def gravity(self, x, y, x_y_central_mass, central_mass=5e7):
+		"""
+		Returns the x and y components of the force the central mass would put on this body if the body were at (x, y).
+		"""
+		x2 = x_y_central_mass[0]
+		y2 = x_y_central_mass[1]
+		hyp = (x - x2) ** 2 + (y - y2) ** 2
+		theta = math.atan2(y2 - y, x2 - x)
+		force = (self.g * self.mass * central_mass) / hyp
+		return force * math.cos(theta), force * math.sin(theta)
 
-	def draw(self):
+	def draw(self, alpha=1.0):
 		"""
 		This method will draw a circle with centre of the x and y. It casts both of these floats to integers as pygame cannot draw
 		'half of a pixel'.
+		'alpha' is how far between the previous position (0) and the current position (1) the body should be drawn.
+		"""
+		x = self.previous_x + alpha * (self.x - self.previous_x)
+		y = self.previous_y + alpha * (self.y - self.previous_y)
+		pygame.draw.circle(self.screen, self.colour, (int(x), int(y)), self.size)
+
+
+class SolarBodyArrays:
+	"""
+	This class holds the state of many 'SolarBody' objects as a structure of arrays. Instead of one Python object per planet, the
+	positions, momenta, masses, sizes and colours are each stored in one contiguous NumPy array so that the whole solar system can
+	be moved with a single batched calculation.
+	"""
+	def __init__(self, screen, x, y, mass, momentum_x, momentum_y, colour, g=0.2, dt=0.001, bounds=None,
+				 integrator="semi-implicit euler", adaptive=False, max_level=8, eta=0.02):
+		"""
+		screen: pygame screen object
+			- used as the pygame surface that all of the solar bodies are drawn to.
+			- can be None if the solar bodies are never drawn.
+		x: List[float]
+			- the 'x' location of every solar body.
+		y: List[float]
+			- the 'y' location of every solar body.
+		mass: List[float]
+			- the mass of every solar body.
+		momentum_x: List[float]
+			- the 'x' component of every solar body's momentum.
+		momentum_y: List[float]
+			- the 'y' component of every solar body's momentum.
+		colour: List[Tuple[int, int, int]]
+			- the (red, green, blue) colour of every solar body.
+		g: float [0.2]
+			- the gravitational constant used by the simulation, this is the same as 'SolarBody.g'.
+		dt: float [0.001]
+			- the time step used for each call to 'move', this is the same as 'SolarBody.dt'.
+		bounds: Tuple[int, int] [None]
+			- the (width, height) of the area the solar bodies move in, by default this is the size of the screen.
+		integrator: str or integrators.Integrator ["semi-implicit euler"]
+			- the method used to move the solar bodies forward in time, this is the same as 'SolarBody.integrator'.
+		adaptive: bool [False]
+			- if True, then each body is moved with its own time step of dt / 2^level, where the level is chosen from how strongly
+			  the body is being pulled by the sun (see 'move_adaptive').
+			- if False, then every body is moved with the same time step 'dt'.
+		max_level: int [8]
+			- the smallest time step that an adaptive body can take is dt / 2^max_level.
+		eta: float [0.02]
+			- the accuracy of the adaptive time steps, each body's time step is about eta times the time it takes to fall into the
+			  sun from where it is. Smaller values are more accurate but need more steps.
+		"""
+		self.screen = screen
+		self.g = g
+		self.dt = dt
+		self.integrator = integrators.get_integrator(integrator)
+		self.adaptive = adaptive
+		self.max_level = max_level
+		self.eta = eta
+		# The total number of times the force on a body has been calculated, this is used to compare the cost of different settings.
+		self.force_evaluations = 0
+		# The force on every body at its current position, if the integrator worked it out at the end of the last step, and the 
+		# (sun position, sun mass) it was worked out for. This is the same as 'SolarBody.force'.
+		self.force = None
+		self.force_source = None
+		self.x = np.asarray(x, dtype=np.float64)
+		self.y = np.asarray(y, dtype=np.float64)
+		self.previous_x = self.x.copy()
+		self.previous_y = self.y.copy()
+		self.mass = np.asarray(mass, dtype=np.float64)
+		self.size = (self.mass / 2).astype(np.int64)
+		self.momentum_x = np.asarray(momentum_x, dtype=np.float64)
+		self.momentum_y = np.asarray(momentum_y, dtype=np.float64)
+		self.colour = np.asarray(colour, dtype=np.uint8).reshape(-1, 3)
+		# The screen size is looked up once here instead of twice per body on every step.
+		self.width, self.height = get_bounds(screen, bounds)
+		# The bodies that are big enough to be drawn and their circle sprites, these are looked up on the first call to 'draw'.
+		self.drawn = None
+		self.sprites = None
+		self.clicked = False
+		self.text = "SolarBody"
+
+	@classmethod
+	def from_bodies(cls, screen, bodies, bounds=None, **options):
+		"""
+		Packs a list of 'SolarBody' objects into a single 'SolarBodyArrays' object with exactly the same state. Any extra keyword
+		arguments (e.g. 'adaptive') are passed on to '__init__'.
 		"""
-		pygame.draw.circle(self.screen, self.colour, (int(self.x), int(self.y)), self.size)
+		return cls(screen, [body.x for body in bodies], [body.y for body in bodies], [body.mass for body in bodies],
+				   [body.momentum_x for body in bodies], [body.momentum_y for body in bodies], [body.colour for body in bodies],
+				   bodies[0].g if bodies else 0.2, bodies[0].dt if bodies else 0.001, bounds,
+				   bodies[0].integrator if bodies else "semi-implicit euler", **options)
+
+	def __len__(self):
+		return len(self.x)
+
+	def move(self, x_y_central_mass, central_mass=5e7):
+		"""
+		This method does the same calculation as 'SolarBody.move' (see that method for the physics behind it), but for every body
+		at once using NumPy array operations. If 'self.adaptive' is True then 'move_adaptive' is used instead.
+		"""
+		np.copyto(self.previous_x, self.x)
+		np.copyto(self.previous_y, self.y)
+		source = (tuple(x_y_central_mass), central_mass)
+		if source != self.force_source:
+			self.force, self.force_source = None, source
+		if self.adaptive:
+			self.move_adaptive(x_y_central_mass, central_mass)
+			return
+
+		force = lambda x, y: self.gravity(x, y, x_y_central_mass, central_mass)
+		self.x, self.y, self.momentum_x, self.momentum_y, self.force = self.integrator.step(
+			self.x, self.y, self.momentum_x, self.momentum_y, self.mass, force, self.dt, self.bounce, self.force)
+
+	def move_adaptive(self, x_y_central_mass, central_mass=5e7):
+		"""
+		Moves every body forward by 'dt' using hierarchical block time steps. The force near the sun is GMm/r^2, so it becomes huge
+		as r gets small, and a body that passes close to the sun needs a much smaller time step than one that stays far away. 
+		Instead of making every body use the worst case time step, each body has a 'level' and steps by dt / 2^level.
+		'dt' is split into 2^max_level 'ticks', and a step on level k is 2^(max_level - k) ticks long. Before each of its steps, a 
+		body picks a level from its distance to the sun (see 'time_step_levels'). It can move to a smaller time step at any time, 
+		but it can only move to a larger one when the ticks it has done so far are a whole number of the larger steps, so that 
+		every body's steps end exactly at the end of 'dt'.
+		The planets are only pulled by the sun and not by each other, so no body ever has to wait for another to line up with it. 
+		On each pass of the loop, every body that has not finished 'dt' takes one of its own steps, all at once with NumPy, and the
+		bodies that have finished are taken out of the arrays. Bodies far from the sun are finished after one pass, and the later
+		passes only work on the few bodies that are still close to the sun.
+		The step size changes from one step to the next, which spoils the energy conservation of semi-implicit Euler, so this 
+		should be used with the "leapfrog" or "rk4" integrators.
+		"""
+		ticks = 2 ** self.max_level
+		distances = self.level_distances(central_mass)
+		bodies = np.arange(len(self), dtype=float)
+		done_ticks = np.zeros(len(self), dtype=np.int64)
+		x, y, momentum_x, momentum_y, mass = self.x, self.y, self.momentum_x, self.momentum_y, self.mass
+		start_force = self.force
+		force = lambda x, y: self.gravity(x, y, x_y_central_mass, central_mass, mass)
+		finished_states = []
+		while len(bodies):
+			step_ticks = ticks >> self.time_step_levels(x, y, x_y_central_mass, central_mass, distances)
+			# 'done_ticks & -done_ticks' is the largest power of two that 'done_ticks' is a multiple of, which is the longest step
+			# that the body can take without leaving its block ('done_ticks' is less than 'ticks', so or-ing in 'ticks' only matters
+			# for a body that has not moved yet, which can take any step).
+			block_ticks = done_ticks | ticks
+			step_ticks = np.minimum(step_ticks, block_ticks & -block_ticks)
+			x, y, momentum_x, momentum_y, start_force = self.integrator.step(x, y, momentum_x, momentum_y, mass, force,
+																					 step_ticks * (self.dt / ticks), self.bounce, start_force)
+			done_ticks = done_ticks + step_ticks
+
+			finished = done_ticks == ticks
+			if not np.count_nonzero(finished):
+				continue
+			# The bodies that are still moving are put in one 2D array (with the index of each body as a float, which is exact), so
+			# that taking out the finished ones is a single indexing operation. The finished ones are only copied back into the body
+			# arrays once every body has finished.
+			state = np.array((x, y, momentum_x, momentum_y, mass, bodies) + (() if start_force is None else start_force))
+			finished_states.append(state[:, finished])
+			left = ~finished
+			state, done_ticks = state[:, left], done_ticks[left]
+			x, y, momentum_x, momentum_y, mass, bodies = state[:6]
+			start_force = None if start_force is None else (state[6], state[7])
+
+		if not finished_states:
+			return
+		state = np.concatenate(finished_states, axis=1)
+		finished_bodies = state[5].astype(np.int64)
+		self.x[finished_bodies], self.y[finished_bodies] = state[0], state[1]
+		self.momentum_x[finished_bodies], self.momentum_y[finished_bodies] = state[2], state[3]
+		self.force = None
+		if len(state) > 6:
+			self.force = (np.empty(len(self)), np.empty(len(self)))
+			self.force[0][finished_bodies], self.force[1][finished_bodies] = state[6], state[7]
+
+	def level_distances(self, central_mass=5e7):
+		"""
+		Returns the squared distances from the sun at which the time step level goes up, from the closest to the furthest. A body
+		whose squared distance is less than n of these is on level n (see 'time_step_levels').
+		"""
+		# The level is at least k when dt / 2^(k - 1) is longer than the wanted time step eta * (r^2)^(3/4) / sqrt(GM).
+		steps = self.dt / 2.0 ** np.arange(self.max_level - 1, -1, -1)
+		return (steps * math.sqrt(self.g * central_mass) / self.eta) ** (4 / 3)
+
+	def time_step_levels(self, x, y, x_y_central_mass, central_mass=5e7, distances=None):
+		"""
+		Returns the time step level of each body at (x, y). The acceleration towards the sun is a = GM/r^2, and sqrt(r/a) is about
+		how long the body would take to fall into the sun, which is the time over which its motion changes a lot. The time step
+		that is wanted is 'eta' times this, and the level is the smallest power of two that splits 'dt' into steps at least that
+		small (limited to 'max_level'). Instead of taking a logarithm for every body, this counts how many of the distances from 
+		'level_distances' (which can be passed in if they have already been worked out) the body is closer than.
+		"""
+		if distances is None:
+			distances = self.level_distances(central_mass)
+		dx = x - x_y_central_mass[0]
+		dy = y - x_y_central_mass[1]
+		return self.max_level - distances.searchsorted(dx * dx + dy * dy, side="right")
+
+	def bounce(self, x, y, momentum_x, momentum_y):
+		"""
+		Does the same as 'SolarBody.bounce' for every body at once, returning new momentum arrays.
+		"""
+		out_of_bounds_x = (x > self.width + 400) | (x < -400)
+		out_of_bounds_y = (y > self.height + 400) | (y < -400)
+		# 'np.count_nonzero' is used instead of '.any()' as it is quicker for the short arrays that 'move_adaptive' uses.
+		if np.count_nonzero(out_of_bounds_x):
+			momentum_x = np.where(out_of_bounds_x, -momentum_x, momentum_x)
+		if np.count_nonzero(out_of_bounds_y):
+			momentum_y = np.where(out_of_bounds_y, -momentum_y, momentum_y)
+		return momentum_x, momentum_y
+
+	def gravity(self, x, y, x_y_central_mass, central_mass=5e7, mass=None):
+		"""
+		Returns the x and y components of the force the central mass would put on each body if the bodies were at (x, y). If only 
+		some of the bodies are being moved then 'mass' is their masses. Each call adds the number of bodies to 'force_evaluations'.
+		"""
+		mass = self.mass if mass is None else mass
+		self.force_evaluations += len(x)
+		dx = x_y_central_mass[0] - x
+		dy = x_y_central_mass[1] - y
+		hyp = dx * dx + dy * dy
+		# This is the same as F = GMm/r^2 resolved with cos(theta) = dx/r and sin(theta) = dy/r, without the trigonometry.
+		force = (self.g * central_mass) * mass / (hyp * np.sqrt(hyp))
+		return force * dx, force * dy
+
+	def draw(self, alpha=1.0):
+		"""
+		Draws every solar body as a circle, 'alpha' of the way from its previous position to its current position. The colours and
+		sizes of the bodies never change, so their sprites are looked up once and then every body is blitted in one batch (see
+		'rendering.py'). Bodies with a radius of 0 are skipped, as 'pygame.draw.circle' does not draw them either.
+		"""
+		if self.sprites is None:
+			self.drawn = np.flatnonzero(self.size >= 1)
+			self.sprites = rendering.SPRITES.get_many(self.colour[self.drawn].tolist(), self.size[self.drawn].tolist())
+		drawn = self.drawn
+		draw_x = self.previous_x[drawn] + alpha * (self.x[drawn] - self.previous_x[drawn])
+		draw_y = self.previous_y[drawn] + alpha * (self.y[drawn] - self.previous_y[drawn])
+		size = self.size[drawn]
+		rendering.draw_sprites(self.screen, self.sprites, (draw_x.astype(np.int64) - size).tolist(),
+							   (draw_y.astype(np.int64) - size).tolist())
 
 
 class SolarSystem:
@@ -84,56 +382,462 @@ class SolarSystem:
 	This is the class which describes the behaviour and functionality of the 'SolarSystem' which is a collection of 'SolarBody' physics
 	objects.
 	"""
-	def __init__(self: object, screen: object, sun_mass=5e7):
+	def __init__(self: object, screen: object, sun_mass=5e7, body_num=500, vectorised=True, bounds=None,
+				 integrator="semi-implicit euler", dt=0.001, adaptive=False, max_level=8, eta=0.02, physics_rate=None):
 		"""
 		screen: pygame screen object
 			- used as the pygame surface that all parts of the button is drawn to.
+			- if None, then the solar system is headless: it has no buttons and can only be stepped, not drawn.
 		sun_mass: int [5e7]
 			- this is the mass of the sun (the central mass).
 			- this value will effect how strong of a graviational field there is between the SolarBody objects and this central mass.
+		body_num: int [500]
+			- the number of SolarBody objects orbiting the sun.
+		vectorised: bool [True]
+			- if True, then the solar bodies are stored in a single 'SolarBodyArrays' object and moved together with NumPy.
+			- if False, then every solar body is its own 'SolarBody' object and is moved one at a time (the original behaviour).
+			- both give the same results, so this flag can be used to compare the two.
+		bounds: Tuple[int, int] [None]
+			- the (width, height) of the area the planets move in, by default this is the size of the screen.
+		integrator: str ["semi-implicit euler"]
+			- the method used to move the planets forward in time, one of the names in 'integrators.INTEGRATORS'.
+		dt: float [0.001]
+			- the time step of each call to 'step'.
+			- with "leapfrog" or "rk4" a time step 10 to 50 times larger gives about the same accuracy (see 'benchmarks.py integrators').
+		adaptive: bool [False]
+			- if True, then each planet takes its own power of two fraction of 'dt' depending on how close it is to the sun (see
+			  'SolarBodyArrays.move_adaptive'). This needs 'vectorised' to be True.
+			- each pass of the adaptive loop costs about as much as a global step of a few thousand planets, so it is only quicker
+			  than global steps of dt / 2^max_level for large systems (see 'benchmarks.py timesteps'). The 'Space System' screen's
+			  500 planets use global leapfrog steps, and 'batchRun.py --adaptive' turns this on for headless runs.
+		max_level: int [8]
+			- the smallest adaptive time step is dt / 2^max_level.
+		eta: float [0.02]
+			- the accuracy of the adaptive time steps, smaller is more accurate.
+		physics_rate: int [None]
+			- the number of times per second that the main loop should call 'step', if it is None then the main loop's usual rate
+			  is used. The planets move by 'dt' every step, so a larger 'dt' needs fewer steps per second for the same speed.
 		"""
+		if adaptive and not vectorised:
+			raise ValueError("Adaptive time steps are only available when 'vectorised' is True")
 		self.button_ls = []
 		self.screen = screen
-		self.sun_pos = [screen.get_width() // 2, screen.get_height() // 2]
+		# How far between the last two steps the planets are drawn, this is set by the main loop.
+		self.alpha = 1.0
+		# The planets move on every frame, so the main loop has to keep redrawing this screen.
+		self.animated = True
+		self.bounds = get_bounds(screen, bounds)
+		self.sun_pos = [self.bounds[0] // 2, self.bounds[1] // 2]
 		self.sun_mass = sun_mass
+		self.vectorised = vectorised
+		self.physics_rate = physics_rate
+		# The 'TrajectoryRecorder' that every step is written to while the simulation is being recorded.
+		self.recorder = None
 
 		self.planet_physics_objs = []
-		for i in range(500):
+		for i in range(body_num):
 			ang = uniform(0, 1) * 2 * math.pi
 			hyp = math.sqrt(uniform(0, 1)) * 400
 			adj = math.cos(ang) * hyp
 			opp = math.sin(ang) * hyp
 			x = 400 + adj
 			y = 400 + opp
-			p = SolarBody(screen, x, y)
+			p = SolarBody(screen, x, y, self.bounds, integrator, dt)
 			self.planet_physics_objs.append(p)
 
-		self.buttons = [buttons.TextButton(screen, [screen.get_width() - 100, 50], 150, 80, (87, 201, 242), (18, 49, 227), 
-									 3, "Arial", 20, "Go Back", (0, 0, 0))]
+		if self.vectorised:
+			# The objects are only used to generate the starting state, after this all of the bodies live in the arrays.
+			self.planet_physics_objs = SolarBodyArrays.from_bodies(screen, self.planet_physics_objs, self.bounds, adaptive=adaptive,
+																   max_level=max_level, eta=eta)
+
+		self.buttons = []
+		if screen is not None:
+			self.buttons = [buttons.TextButton(screen, [screen.get_width() - 100, 50], 150, 80, (87, 201, 242), (18, 49, 227), 
+										 3, "Arial", 20, "Go Back", (0, 0, 0))] + recording_buttons(screen)
 		
-		self.button_ls = self.planet_physics_objs + self.buttons
+		if self.vectorised:
+			# The 'SolarBodyArrays' object stands in for all of the planets so the menu system only has one object to check.
+			self.button_ls = [self.planet_physics_objs] + self.buttons
+		else:
+			self.button_ls = self.planet_physics_objs + self.buttons
 		self.title = "SolarBody"
 
+	def get_state(self):
+		"""
+		Returns a dictionary of arrays with the position, momentum and mass of every planet.
+		"""
+		bodies = self.planet_physics_objs
+		if self.vectorised:
+			return {"x": bodies.x.copy(), "y": bodies.y.copy(), "momentum_x": bodies.momentum_x.copy(), 
+					"momentum_y": bodies.momentum_y.copy(), "mass": bodies.mass.copy()}
+		return {"x": np.array([body.x for body in bodies]), "y": np.array([body.y for body in bodies]),
+				"momentum_x": np.array([body.momentum_x for body in bodies]), 
+				"momentum_y": np.array([body.momentum_y for body in bodies]), "mass": np.array([body.mass for body in bodies])}
+
+	def get_appearance(self):
+		"""
+		Returns an array of the radius of every planet and an array of their (red, green, blue) colours.
+		"""
+		bodies = self.planet_physics_objs
+		if self.vectorised:
+			return bodies.size.copy(), bodies.colour.copy()
+		return np.array([body.size for body in bodies]), np.array([body.colour for body in bodies], dtype=np.uint8)
+
+	def get_energy(self):
+		"""
+		Returns an array of the total energy of every planet: its kinetic energy p^2/2m plus its gravitational potential energy
+		-GMm/r around the sun. Without the bounces at the edges, the exact solution keeps each of these constant, so how much they
+		change over a run shows how accurate the integrator is.
+		"""
+		state = self.get_state()
+		g = self.planet_physics_objs.g if self.vectorised else self.planet_physics_objs[0].g
+		r = np.sqrt((state["x"] - 400) ** 2 + (state["y"] - 400) ** 2)
+		kinetic = (state["momentum_x"] ** 2 + state["momentum_y"] ** 2) / (2 * state["mass"])
+		return kinetic - g * state["mass"] * self.sun_mass / r
+
+	def step(self):
+		"""
+		This method moves all of the SolarBody objects forward by one time step.
+		"""
+		with profiler.PROFILER.scope("move"):
+			if self.vectorised:
+				self.planet_physics_objs.move((400, 400), self.sun_mass)
+			else:
+				for planet in self.planet_physics_objs:
+					planet.move((400, 400), self.sun_mass)
+		if self.recorder is not None and not self.recorder.is_full():
+			self.recorder.record(self)
+
 	def update_menu(self, events):
 		"""
-		This method will first draw the central mass (the sun) and then it will update and draw all of the SolarBody objects in turn.
+		This method will first draw the central mass (the sun) and then it will draw all of the SolarBody objects. The bodies are 
+		moved by 'step', which the main loop calls at a fixed rate.
 		"""
 		pygame.draw.circle(self.screen, (255, 0, 0), (400, 400), 20)
 
-		for planet in self.planet_physics_objs:
-			planet.move((400, 400))
-			planet.draw()
+		with profiler.PROFILER.scope("draw"):
+			if self.vectorised:
+				self.planet_physics_objs.draw(self.alpha)
+			else:
+				# The planets are still drawn in one batch, using the same interpolation as 'SolarBody.draw'.
+				alpha = self.alpha
+				rendering.draw_circles(self.screen, [int(planet.previous_x + alpha * (planet.x - planet.previous_x)) for planet in
+													 self.planet_physics_objs],
+									   [int(planet.previous_y + alpha * (planet.y - planet.previous_y)) for planet in
+										self.planet_physics_objs],
+									   [planet.colour for planet in self.planet_physics_objs],
+									   [planet.size for planet in self.planet_physics_objs])
 		
 		for button in self.buttons:
 			button.update(events)
 			button.draw()
 
 
+def _spread_bits(values):
+	"""
+	Spreads the lower 16 bits of each integer so that there is a zero bit between every original bit. Interleaving the spread 'x' and
+	'y' grid coordinates gives each body its Morton code (its position along a Z-order curve through the quadtree).
+	"""
+	values = values & 0x0000FFFF
+	values = (values | (values << 8)) & 0x00FF00FF
+	values = (values | (values << 4)) & 0x0F0F0F0F
+	values = (values | (values << 2)) & 0x33333333
+	values = (values | (values << 1)) & 0x55555555
+	return values
+
+
+class BarnesHutTree:
+	"""
+	This is a quadtree of point masses that is used to approximate the gravitational pull of far away groups of bodies by the pull of
+	a single body at their centre of mass (the Barnes-Hut algorithm). Rather than linking together node objects, the tree is stored
+	as one set of NumPy arrays per level. The bodies are sorted by their Morton code so that every cell's bodies are next to each
+	other, which means the mass and centre of mass of every cell on a level can be found in one go.
+	"""
+	def __init__(self, x, y, mass, max_depth=16):
+		"""
+		x: np.ndarray
+			- the 'x' location of every body.
+		y: np.ndarray
+			- the 'y' location of every body.
+		mass: np.ndarray
+			- the mass of every body.
+		max_depth: int [16]
+			- the number of times the root cell can be split into quarters (at most 16).
+			- bodies that are closer together than the smallest cell are treated as a single cell.
+		"""
+		self.body_num = len(x)
+		self.max_depth = max_depth
+		self.min_x = float(x.min())
+		self.min_y = float(y.min())
+		self.size = max(float(x.max()) - self.min_x, float(y.max()) - self.min_y) * (1 + 1e-9) or 1.0
+
+		grid_num = 1 << max_depth
+		grid_x = np.minimum(((x - self.min_x) * (grid_num / self.size)).astype(np.int64), grid_num - 1)
+		grid_y = np.minimum(((y - self.min_y) * (grid_num / self.size)).astype(np.int64), grid_num - 1)
+		codes = _spread_bits(grid_x) | (_spread_bits(grid_y) << 1)
+
+		self.order = np.argsort(codes, kind="stable")
+		self.codes = codes[self.order]
+		self.x = x[self.order]
+		self.y = y[self.order]
+		self.mass = mass[self.order]
+
+		# For every level: the Morton prefix of each cell, where its bodies start, how many bodies it holds, its total mass and
+		# its centre of mass.
+		self.keys, self.starts, self.counts, self.cell_mass, self.com_x, self.com_y = [], [], [], [], [], []
+		for level in range(max_depth + 1):
+			level_keys = self.codes >> (2 * (max_depth - level))
+			starts = np.flatnonzero(np.concatenate(([True], level_keys[1:] != level_keys[:-1])))
+			cell_mass = np.add.reduceat(self.mass, starts)
+			safe_mass = np.where(cell_mass > 0, cell_mass, 1.0)
+			self.keys.append(level_keys[starts])
+			self.starts.append(starts)
+			self.counts.append(np.diff(np.append(starts, self.body_num)))
+			self.cell_mass.append(cell_mass)
+			self.com_x.append(np.add.reduceat(self.mass * self.x, starts) / safe_mass)
+			self.com_y.append(np.add.reduceat(self.mass * self.y, starts) / safe_mass)
+
+		# 'first_child[level][i]' to 'first_child[level][i + 1]' is the range of cells on the next level inside cell 'i'.
+		self.first_child = [np.searchsorted(self.starts[level + 1], np.append(self.starts[level], self.body_num))
+							for level in range(max_depth)]
+
+	def accelerations(self, g, theta=0.5, softening=1.0):
+		"""
+		Returns the 'x' and 'y' acceleration of every body (in the order they were given) due to every other body.
+		The tree is walked one level at a time for all bodies together: each (body, cell) pair is either accepted, in which case the
+		cell's centre of mass is used, or opened, in which case it is replaced by pairs for each of the cell's children.
+		A cell is accepted when 'cell size / distance < theta', it is always opened if it contains the body itself.
+		"""
+		acc_x = np.zeros(self.body_num)
+		acc_y = np.zeros(self.body_num)
+		bodies = np.arange(self.body_num)
+		cells = np.zeros(self.body_num, dtype=np.int64)
+		softening_sq = softening * softening
+
+		for level in range(self.max_depth + 1):
+			if len(bodies) == 0:
+				break
+			cell_size = self.size / (1 << level)
+			dx = self.com_x[level][cells] - self.x[bodies]
+			dy = self.com_y[level][cells] - self.y[bodies]
+			dist_sq = dx * dx + dy * dy
+			contains_body = (self.codes[bodies] >> (2 * (self.max_depth - level))) == self.keys[level][cells]
+			is_leaf = self.counts[level][cells] == 1 if level < self.max_depth else np.ones(len(cells), dtype=bool)
+			opened = ~is_leaf & (contains_body | (cell_size * cell_size >= theta * theta * dist_sq))
+			accepted = ~opened
+
+			# A leaf that contains the body only pulls with the mass of the other bodies in it.
+			cell_mass = self.cell_mass[level][cells]
+			own_leaf = accepted & contains_body
+			if own_leaf.any():
+				own_bodies = bodies[own_leaf]
+				other_mass = cell_mass[own_leaf] - self.mass[own_bodies]
+				safe_mass = np.where(other_mass > 0, other_mass, 1.0)
+				dx[own_leaf] = np.where(other_mass > 0, (cell_mass[own_leaf] * self.com_x[level][cells[own_leaf]] 
+														 - self.mass[own_bodies] * self.x[own_bodies]) / safe_mass 
+														 - self.x[own_bodies], 0.0)
+				dy[own_leaf] = np.where(other_mass > 0, (cell_mass[own_leaf] * self.com_y[level][cells[own_leaf]] 
+														 - self.mass[own_bodies] * self.y[own_bodies]) / safe_mass 
+														 - self.y[own_bodies], 0.0)
+				cell_mass[own_leaf] = np.maximum(other_mass, 0.0)
+				dist_sq[own_leaf] = dx[own_leaf] ** 2 + dy[own_leaf] ** 2
+
+			strength = g * cell_mass[accepted] / (dist_sq[accepted] + softening_sq) ** 1.5
+			acc_x += np.bincount(bodies[accepted], strength * dx[accepted], self.body_num)
+			acc_y += np.bincount(bodies[accepted], strength * dy[accepted], self.body_num)
+
+			if level == self.max_depth:
+				break
+			# Replaces every opened (body, cell) pair with one pair for each child of the cell.
+			opened_bodies = bodies[opened]
+			first_child = self.first_child[level][cells[opened]]
+			child_num = self.first_child[level][cells[opened] + 1] - first_child
+			bodies = np.repeat(opened_bodies, child_num)
+			child_offsets = np.arange(len(bodies)) - np.repeat(np.cumsum(child_num) - child_num, child_num)
+			cells = np.repeat(first_child, child_num) + child_offsets
+
+		unsorted_acc_x = np.empty(self.body_num)
+		unsorted_acc_y = np.empty(self.body_num)
+		unsorted_acc_x[self.order] = acc_x
+		unsorted_acc_y[self.order] = acc_y
+		return unsorted_acc_x, unsorted_acc_y
+
+
+def barnes_hut_accelerations(x, y, mass, g, theta=0.5, softening=1.0):
+	"""
+	Builds a 'BarnesHutTree' for the bodies and returns their accelerations. This is O(n log n).
+	"""
+	return BarnesHutTree(x, y, mass).accelerations(g, theta, softening)
+
+
+def direct_sum_accelerations(x, y, mass, g, softening=1.0, chunk_size=1024):
+	"""
+	Returns the accelerations of every body by adding up the pull of every other body directly. This is O(n^2) and is used as the
+	reference that the Barnes-Hut approximation is checked against. The bodies are processed 'chunk_size' rows at a time to limit
+	the amount of memory used.
+	"""
+	acc_x = np.empty(len(x))
+	acc_y = np.empty(len(x))
+	softening_sq = softening * softening
+	for start in range(0, len(x), chunk_size):
+		end = min(start + chunk_size, len(x))
+		dx = x[np.newaxis, :] - x[start:end, np.newaxis]
+		dy = y[np.newaxis, :] - y[start:end, np.newaxis]
+		inv_dist_cubed = (dx * dx + dy * dy + softening_sq) ** -1.5
+		# A body does not pull on itself.
+		inv_dist_cubed[np.arange(end - start), np.arange(start, end)] = 0.0
+		strength = g * mass[np.newaxis, :] * inv_dist_cubed
+		acc_x[start:end] = (strength * dx).sum(axis=1)
+		acc_y[start:end] = (strength * dy).sum(axis=1)
+	return acc_x, acc_y
+
+
+class NBodySystem:
+	"""
+	This is the class which describes the behaviour and functionality of the 'N-Body' simulation. Unlike the 'SolarSystem', where every
+	body is only pulled towards a fixed sun, every body here pulls on every other body. The accelerations are found with either the
+	Barnes-Hut approximation or a direct sum, and the bodies are moved with the leapfrog (kick-drift-kick) method.
+	"""
+	def __init__(self, screen, body_num=2000, method="barnes-hut", theta=0.5, g=1.0, softening=2.0, dt=0.05, bounds=None):
+		"""
+		screen: pygame screen object
+			- used as the pygame surface that all of the bodies and buttons are drawn to.
+			- if None, then the simulation is headless: it has no buttons and can only be stepped, not drawn.
+		body_num: int [2000]
+			- the number of bodies in the simulation.
+		method: str ["barnes-hut"]
+			- "barnes-hut" uses the O(n log n) quadtree approximation.
+			- "direct" adds up the pull between every pair of bodies, this is exact but O(n^2).
+		theta: float [0.5]
+			- the opening angle for the Barnes-Hut approximation, the same default as 'barnes_hut_accelerations'.
+			- smaller values are more accurate but slower, 0 gives the same result as the direct sum.
+			- for the starting disc of 2000 bodies, at 0.5 the median error in a body's acceleration against the direct sum is
+			  about 0.5% (mean 0.7%, 99th percentile 3-4%, worst 20-30%). At 0.7 it is about 1.4% (mean 2.1%, 99th percentile
+			  14-16%, worst 40-60%) for roughly half of the time.
+		g: float [1.0]
+			- the gravitational constant used by the simulation.
+		softening: float [2.0]
+			- a small distance added to every separation so that close passes do not cause huge accelerations.
+		dt: float [0.05]
+			- the time step used for each step of the simulation.
+		bounds: Tuple[int, int] [None]
+			- the (width, height) of the area the disc of bodies starts in, by default this is the size of the screen.
+		"""
+		if method not in ["barnes-hut", "direct"]:
+			raise ValueError(f"Unknown N-Body method '{method}'")
+		self.screen = screen
+		self.method = method
+		self.theta = theta
+		self.g = g
+		self.softening = softening
+		self.dt = dt
+
+		# The bodies start in a rotating disc around a heavy central body. Each body is given roughly the speed it would need to
+		# orbit the mass that is closer to the centre than it is.
+		width, height = get_bounds(screen, bounds)
+		centre_x = width / 2
+		centre_y = height / 2 + 30
+		centre_mass = 2000.0
+		radius = np.sqrt(np.array([uniform(0, 1) for i in range(body_num - 1)])) * 250 + 10
+		angle = np.array([uniform(0, 2 * math.pi) for i in range(body_num - 1)])
+		self.mass = np.concatenate(([centre_mass], [uniform(0.5, 1.5) for i in range(body_num - 1)]))
+		self.x = np.concatenate(([centre_x], centre_x + radius * np.cos(angle)))
+		self.y = np.concatenate(([centre_y], centre_y + radius * np.sin(angle)))
+		enclosed_mass = centre_mass + np.searchsorted(np.sort(radius), radius) * self.mass[1:].mean()
+		orbit_speed = np.sqrt(g * enclosed_mass / radius)
+		self.previous_x = self.x.copy()
+		self.previous_y = self.y.copy()
+		self.alpha = 1.0
+		self.animated = True
+		self.velocity_x = np.concatenate(([0.0], -orbit_speed * np.sin(angle)))
+		self.velocity_y = np.concatenate(([0.0], orbit_speed * np.cos(angle)))
+		self.size = np.where(self.mass > 100, 6, 1)
+		# The circle sprite of every body, these are looked up on the first call to 'draw'.
+		self.sprites = None
+		self.acc_x, self.acc_y = self.accelerations()
+
+		self.buttons = []
+		self.button_ls = []
+		if screen is not None:
+			self.buttons = [buttons.TextButton(screen, [screen.get_width() - 100, 50], 150, 80, (87, 201, 242), (18, 49, 227), 
+											   3, "Arial", 20, "Go Back", (0, 0, 0))]
+			title = buttons.TextButton(screen, [screen.get_width() // 2, 50], 300, 80, (87, 201, 242), (18, 49, 227), 3, "Arial", 
+									   30, "N-Body Simulation", (0, 0, 0), False)
+			self.button_ls = [title] + self.buttons
+
+	def accelerations(self):
+		"""
+		Returns the 'x' and 'y' acceleration of every body using the chosen 'method'.
+		"""
+		if self.method == "barnes-hut":
+			return barnes_hut_accelerations(self.x, self.y, self.mass, self.g, self.theta, self.softening)
+		return direct_sum_accelerations(self.x, self.y, self.mass, self.g, self.softening)
+
+	def move(self):
+		"""
+		Moves every body forward by one time step using the leapfrog method: half a kick with the old accelerations, a full drift, 
+		then half a kick with the new accelerations. This only needs one new set of accelerations per step.
+		"""
+		np.copyto(self.previous_x, self.x)
+		np.copyto(self.previous_y, self.y)
+		self.velocity_x += 0.5 * self.dt * self.acc_x
+		self.velocity_y += 0.5 * self.dt * self.acc_y
+		self.x += self.dt * self.velocity_x
+		self.y += self.dt * self.velocity_y
+		self.acc_x, self.acc_y = self.accelerations()
+		self.velocity_x += 0.5 * self.dt * self.acc_x
+		self.velocity_y += 0.5 * self.dt * self.acc_y
+
+	def get_state(self):
+		"""
+		Returns a dictionary of arrays with the position, velocity and mass of every body.
+		"""
+		return {"x": self.x.copy(), "y": self.y.copy(), "velocity_x": self.velocity_x.copy(), 
+				"velocity_y": self.velocity_y.copy(), "mass": self.mass.copy()}
+
+	def get_appearance(self):
+		"""
+		Returns an array of the radius of every body and an array of their (red, green, blue) colours.
+		"""
+		return self.size.copy(), np.full((len(self.size), 3), 255, dtype=np.uint8)
+
+	def step(self):
+		"""
+		Moves the simulation forward by one time step.
+		"""
+		self.move()
+
+	def draw(self, alpha=1.0):
+		"""
+		Draws every body as a small white circle, 'alpha' of the way from its previous position to its current position.
+		"""
+		draw_x = (self.previous_x + alpha * (self.x - self.previous_x)).astype(np.int64)
+		draw_y = (self.previous_y + alpha * (self.y - self.previous_y)).astype(np.int64)
+		if self.sprites is None:
+			self.sprites = rendering.SPRITES.get_many([(255, 255, 255)] * len(self.size), self.size.tolist())
+		rendering.draw_sprites(self.screen, self.sprites, (draw_x - self.size).tolist(), (draw_y - self.size).tolist())
+
+	def update_menu(self, events):
+		"""
+		This method will draw all of the bodies and then update and draw the buttons. The bodies are moved by 'step', which the
+		main loop calls at a fixed rate.
+		"""
+		with profiler.PROFILER.scope("draw"):
+			self.draw(self.alpha)
+
+		for button in self.button_ls:
+			button.update(events)
+			button.draw()
+
+
 class PointParticle:
-	def __init__(self, screen, pos, size, x_offset, y_offset):
+	def __init__(self, screen, pos, size, x_offset, y_offset, bounds=None):
 		self.screen = screen
+		self.width, self.height = get_bounds(screen, bounds)
 		self.x = pos[0]
 		self.y = pos[1]
+		self.previous_x = self.x
+		self.previous_y = self.y
 		self.size = size
 		self.x_offset = x_offset
 		self.y_offset = y_offset
@@ -146,8 +850,10 @@ class PointParticle:
 		self.clicked = False
 		self.text = "PointParticle"
 	
-	def draw(self):
-		pygame.draw.circle(self.screen, self.colour, (int(self.x), int(self.y)), self.size)
+	def draw(self, alpha=1.0):
+		x = self.previous_x + alpha * (self.x - self.previous_x)
+		y = self.previous_y + alpha * (self.y - self.previous_y)
+		pygame.draw.circle(self.screen, self.colour, (int(x), int(y)), self.size)
 
 	def add_vectors(self, vector1, vector2):
 		x = math.sin(vector1[0]) * vector1[1] + math.sin(vector2[0]) * vector2[1]
@@ -158,14 +864,16 @@ class PointParticle:
 		return angle, mag
 
 	def move(self):
+		self.previous_x = self.x
+		self.previous_y = self.y
 		self.angle, self.speed = self.add_vectors((self.angle, self.speed), self.GRAVITY)
 		self.speed *= (1 - self.DRAG)
 		self.x += (math.sin(self.angle) * self.speed)
 		self.y += (math.cos(self.angle) * self.speed)
 
 	def bounce(self):
-		if self.x > self.screen.get_size()[0] - self.x_offset - self.size:
-			self.x = 2*(self.screen.get_size()[0]-self.size) - self.x - 2*self.x_offset
+		if self.x > self.width - self.x_offset - self.size:
+			self.x = 2*(self.width-self.size) - self.x - 2*self.x_offset
 			self.angle = -self.angle
 			self.speed *= self.ELASTICITY
 		elif self.x < self.size + self.x_offset:
@@ -173,8 +881,8 @@ class PointParticle:
 			self.angle = -self.angle
 			self.speed *= self.ELASTICITY
 
-		if self.y > self.screen.get_size()[1] - self.size - 2*self.x_offset:
-			self.y = 2*(self.screen.get_size()[1] - self.size) - self.y -2*self.x_offset - self.size
+		if self.y > self.height - self.size - 2*self.x_offset:
+			self.y = 2*(self.height - self.size) - self.y -2*self.x_offset - self.size
 			self.angle = math.pi - self.angle
 			self.speed *= self.ELASTICITY
 
@@ -188,33 +896,423 @@ class PointParticle:
 		self.bounce()
 
 
+class PointParticleArrays:
+	"""
+	This class holds the state of many point particles as a structure of NumPy arrays, in the same way that 'SolarBodyArrays' does
+	for solar bodies. The velocity is stored as its x and y components instead of the angle and speed that 'PointParticle' uses:
+	a 'PointParticle' with angle a and speed s moves by (sin(a) * s, cos(a) * s) on each step, so gravity, drag, movement and the
+	wall bounces become simple additions and multiplications that are done for every particle at once.
+	"""
+	def __init__(self, screen, x, y, velocity_x, velocity_y, size, x_offset, y_offset, bounds=None, elasticity=0.8, drag=0.0001,
+				 gravity=(0, 0.05)):
+		"""
+		screen: pygame screen object
+			- used as the pygame surface that all of the particles are drawn to.
+			- can be None if the particles are never drawn.
+		x: List[float]
+			- the 'x' location of every particle.
+		y: List[float]
+			- the 'y' location of every particle.
+		velocity_x: List[float]
+			- how far every particle moves to the right on each step.
+		velocity_y: List[float]
+			- how far every particle moves down on each step.
+		size: List[int]
+			- the radius of every particle.
+		x_offset: int
+			- the gap between the box and the left and right edges of the screen, the same as 'PointParticle.x_offset'.
+		y_offset: int
+			- the gap between the box and the top of the screen, the same as 'PointParticle.y_offset'.
+		bounds: Tuple[int, int] [None]
+			- the (width, height) of the area the particles move in, by default this is the size of the screen.
+		elasticity: float [0.8]
+			- the fraction of a particle's speed that is kept when it bounces off of a wall or another particle.
+		drag: float [0.0001]
+			- the fraction of a particle's speed that is lost on every step.
+		gravity: Tuple[float, float] [(0, 0.05)]
+			- the change in velocity on every step due to gravity.
+		"""
+		self.screen = screen
+		self.width, self.height = get_bounds(screen, bounds)
+		self.x = np.asarray(x, dtype=np.float64)
+		self.y = np.asarray(y, dtype=np.float64)
+		self.previous_x = self.x.copy()
+		self.previous_y = self.y.copy()
+		self.velocity_x = np.asarray(velocity_x, dtype=np.float64)
+		self.velocity_y = np.asarray(velocity_y, dtype=np.float64)
+		self.size = np.asarray(size, dtype=np.int64)
+		self.colour = np.full((len(self.x), 3), (255, 255, 0), dtype=np.uint8)
+		self.x_offset = x_offset
+		self.y_offset = y_offset
+		self.elasticity = elasticity
+		self.drag = drag
+		self.gravity = gravity
+		# The circle sprite of every particle, this is set up on the first call to 'draw' and kept up to date by 'set_colour'.
+		self.sprites = None
+		self.clicked = False
+		self.text = "PointParticle"
+
+	@classmethod
+	def from_particles(cls, screen, particles, bounds=None):
+		"""
+		Packs a list of 'PointParticle' objects into a single 'PointParticleArrays' object that moves in exactly the same way.
+		"""
+		return cls(screen, [particle.x for particle in particles], [particle.y for particle in particles],
+				   [math.sin(particle.angle) * particle.speed for particle in particles],
+				   [math.cos(particle.angle) * particle.speed for particle in particles], [particle.size for particle in particles],
+				   particles[0].x_offset if particles else 0, particles[0].y_offset if particles else 0, bounds,
+				   particles[0].ELASTICITY if particles else 0.8, particles[0].DRAG if particles else 0.0001,
+				   particles[0].GRAVITY if particles else (0, 0.05))
+
+	def __len__(self):
+		return len(self.x)
+
+	def move(self):
+		"""
+		Does the same as 'PointParticle.move' for every particle. 'PointParticle.GRAVITY' is an (angle, speed) vector with an angle of
+		0, so adding it to the velocity only changes the 'y' component.
+		"""
+		np.copyto(self.previous_x, self.x)
+		np.copyto(self.previous_y, self.y)
+		gravity_angle, gravity_speed = self.gravity
+		self.velocity_x += math.sin(gravity_angle) * gravity_speed
+		self.velocity_y += math.cos(gravity_angle) * gravity_speed
+		self.velocity_x *= 1 - self.drag
+		self.velocity_y *= 1 - self.drag
+		self.x += self.velocity_x
+		self.y += self.velocity_y
+
+	def bounce(self):
+		"""
+		Does the same as 'PointParticle.bounce' for every particle. Turning the angle a into -a reverses the 'x' component of the
+		velocity and turning it into pi - a reverses the 'y' component.
+		"""
+		size = self.size
+		right = self.x > self.width - self.x_offset - size
+		left = ~right & (self.x < size + self.x_offset)
+		self.x = np.where(right, 2 * (self.width - size) - self.x - 2 * self.x_offset, self.x)
+		self.x = np.where(left, 2 * size - self.x + 2 * self.x_offset, self.x)
+		hit_x = right | left
+		self.velocity_x[hit_x] *= -self.elasticity
+		self.velocity_y[hit_x] *= self.elasticity
+
+		bottom = self.y > self.height - size - 2 * self.x_offset
+		top = ~bottom & (self.y < size + 2 * self.y_offset)
+		self.y = np.where(bottom, 2 * (self.height - size) - self.y - 2 * self.x_offset - size, self.y)
+		self.y = np.where(top, 2 * size - self.y - 2 * self.y_offset, self.y)
+		hit_y = bottom | top
+		self.velocity_x[hit_y] *= self.elasticity
+		self.velocity_y[hit_y] *= -self.elasticity
+
+	def find_pairs(self, keys=None):
+		"""
+		Returns two arrays (i, j) of every pair of particles that are overlapping, with i < j, sorted by i and then j.
+		Two particles can only overlap if their centres are closer than 'cutoff' (the largest diameter), so the box is split into
+		rows 'cutoff' high and a particle can only overlap particles in its own row or the row below it. The particles are
+		sorted by row and then by 'x' (by giving each one a single key: row * span + x, where 'span' is wider than the box), and
+		'np.searchsorted' finds the range of particles in the same row and in the row below whose 'x' is within 'cutoff' of
+		each particle. These ranges are expanded into a list of candidate pairs, and only the candidates that really overlap are
+		kept. This is all done with array operations, with no Python loop over the particles. The keys from 'row_keys' can be
+		passed in as 'keys' if they have already been worked out.
+		"""
+		if len(self) < 2:
+			return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+		cutoff, span, key, order, sorted_key = self.row_keys() if keys is None else keys
+		position = np.arange(len(self))
+
+		# The partners of each particle are the sorted positions [start, stop) in its own row after it, and in the row below.
+		starts = np.concatenate((position + 1, np.searchsorted(sorted_key, sorted_key + span - cutoff, "right")))
+		stops = np.concatenate((np.searchsorted(sorted_key, sorted_key + cutoff, "left"),
+								np.searchsorted(sorted_key, sorted_key + span + cutoff, "left")))
+		counts = np.maximum(stops - starts, 0)
+		first = np.repeat(np.concatenate((position, position)), counts)
+		second = np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+		i, j = order[first], order[second]
+
+		return self.overlapping_pairs(i, j)
+
+	def find_pairs_of(self, particles, keys=None, moved=0):
+		"""
+		Returns two arrays (i, j) of every pair of overlapping particles that has at least one of 'particles' in it, with i < j,
+		sorted by i and then j. This is the same search as 'find_pairs', but only the ranges of the given particles are expanded, so
+		each one looks on both sides of itself in its own row and in the rows above and below it.
+		The keys from 'row_keys' can be passed in as 'keys' so that they are not sorted again. If the particles have moved since the
+		keys were worked out, 'moved' is the furthest that any of them could have moved, and the search reaches that much further
+		on each side (in rows as well) so that the keys are still close enough to find every pair.
+		"""
+		if len(self) < 2 or len(particles) == 0:
+			return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+		cutoff, span, key, order, sorted_key = self.row_keys() if keys is None else keys
+		reach = cutoff + 2 * moved
+		rows = math.ceil(reach / cutoff)
+		centres = (key[particles] + span * np.arange(-rows, rows + 1)[:, np.newaxis]).ravel()
+		starts = np.searchsorted(sorted_key, centres - reach, "left")
+		counts = np.searchsorted(sorted_key, centres + reach, "right") - starts
+		i = np.repeat(np.tile(particles, 2 * rows + 1), counts)
+		j = order[np.repeat(starts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)]
+		# A pair of two of the given particles is found from both of them, so the copies are removed.
+		first, second = self.overlapping_pairs(i[i != j], j[i != j])
+		unique = np.ones(len(first), dtype=bool)
+		unique[1:] = (first[1:] != first[:-1]) | (second[1:] != second[:-1])
+		return first[unique], second[unique]
+
+	def row_keys(self):
+		"""
+		Returns the values that 'find_pairs' and 'find_pairs_of' search with: the cutoff distance, the span of a row, each particle's
+		key, the order that sorts the keys and the sorted keys.
+		"""
+		# The extra pixel stops rounding in the keys from ever hiding a pair, the exact check at the end removes any extras.
+		cutoff = 2 * float(self.size.max()) + 1
+		x = self.x - self.x.min() + cutoff
+		span = float(x.max()) + 2 * cutoff
+		key = np.floor(self.y / cutoff) * span + x
+		order = np.argsort(key, kind="stable")
+		return cutoff, span, key, order, key[order]
+
+	def overlapping_pairs(self, i, j):
+		"""
+		Returns the candidate pairs (i[k], j[k]) that really overlap as two arrays with i < j, sorted by i and then j.
+		"""
+		overlapping = (self.x[i] - self.x[j]) ** 2 + (self.y[i] - self.y[j]) ** 2 < (self.size[i] + self.size[j]) ** 2
+		first, second = np.minimum(i, j)[overlapping], np.maximum(i, j)[overlapping]
+		order = np.lexsort((second, first))
+		return first[order], second[order]
+
+	def collide(self, i, j):
+		"""
+		Does the same as 'PointParticleSystem.check_collide' for every pair of particles (i[k], j[k]) at once, and returns the number
+		of pairs that collided. No particle can be in more than one of the pairs. The original collision gives particle i the new
+		angle 2t - a (where t is the angle between the particles and a is its old angle) and the speed of particle j times the 
+		elasticity, and the other way around for particle j. In terms of (x, y) velocities, turning an angle a into 2t - a is a 
+		reflection in the line (sin(t), cos(t)). Both particles are then pushed apart by one pixel.
+		"""
+		dx = self.x[i] - self.x[j]
+		dy = self.y[i] - self.y[j]
+		colliding = np.hypot(dx, dy) < self.size[i] + self.size[j]
+		i, j, dx, dy = i[colliding], j[colliding], dx[colliding], dy[colliding]
+
+		tangent = np.arctan2(dy, dx)
+		line_x, line_y = np.sin(tangent), np.cos(tangent)
+		speed1 = np.hypot(self.velocity_x[i], self.velocity_y[i])
+		speed2 = np.hypot(self.velocity_x[j], self.velocity_y[j])
+		for particle, speed, new_speed in ((i, speed1, speed2), (j, speed2, speed1)):
+			# A particle that is not moving has no direction, so it is treated as if it were moving straight down (an angle of 0).
+			moving = speed > 0
+			safe_speed = np.where(moving, speed, 1)
+			direction_x = np.where(moving, self.velocity_x[particle] / safe_speed, 0)
+			direction_y = np.where(moving, self.velocity_y[particle] / safe_speed, 1)
+			along = direction_x * line_x + direction_y * line_y
+			self.velocity_x[particle] = (2 * along * line_x - direction_x) * new_speed * self.elasticity
+			self.velocity_y[particle] = (2 * along * line_y - direction_y) * new_speed * self.elasticity
+
+		self.x[i] += np.cos(tangent)
+		self.y[i] += np.sin(tangent)
+		self.x[j] -= np.cos(tangent)
+		self.y[j] -= np.sin(tangent)
+		return len(i)
+
+	def collide_all(self):
+		"""
+		Finds every overlapping pair of particles and collides them in order of the first and then the second particle's index.
+		Pairs that share a particle have to be done in order, so the pairs are collided in rounds: each round collides (all at once)
+		every pair where neither particle is in an earlier pair that has not been collided yet. A collision pushes the particles 
+		apart, so each pair is checked again when it is collided, and the push can move a particle into one that it was not touching
+		before. So after each round the particles that were pushed are searched again (see 'find_pairs_of') and any new pairs join
+		the ones that are still to be collided. No pair is collided more than once in a step. Returns the number of collisions.
+		This is not the same as the pairwise loop in 'PointParticleSystem', which moves each particle and then checks it against the
+		later particles before they have moved, and never goes back to a pair that it has passed (e.g. a new pair made by a push).
+		"""
+		keys = self.row_keys()
+		first, second = self.find_pairs(keys)
+		# Each pair that has been found in this step as the single number first * len(self) + second, which keeps them in order.
+		found = first * len(self) + second
+		collisions = 0
+		# Each round pushes a particle by at most one pixel, so this is the furthest a particle can have moved since 'keys'.
+		moved = 0
+		while len(first):
+			# The index of the first pair that each particle appears in.
+			particles, first_index = np.unique(np.stack((first, second), axis=1).ravel(), return_index=True)
+			first_pair = first_index // 2
+			pair = np.arange(len(first))
+			ready = ((first_pair[np.searchsorted(particles, first)] == pair) & 
+					 (first_pair[np.searchsorted(particles, second)] == pair))
+			round_collisions = self.collide(first[ready], second[ready])
+			pushed = np.concatenate((first[ready], second[ready]))
+			first, second = first[~ready], second[~ready]
+			if not round_collisions:
+				continue
+			collisions += round_collisions
+			moved += 1
+
+			new_first, new_second = self.find_pairs_of(pushed, keys, moved)
+			codes = new_first * len(self) + new_second
+			new = found[np.minimum(np.searchsorted(found, codes), len(found) - 1)] != codes
+			if np.count_nonzero(new):
+				found = np.sort(np.concatenate((found, codes[new])))
+				first, second = np.concatenate((first, new_first[new])), np.concatenate((second, new_second[new]))
+				order = np.lexsort((second, first))
+				first, second = first[order], second[order]
+		return collisions
+
+	def set_colour(self, i, colour):
+		self.colour[i] = colour
+		if self.sprites is not None:
+			self.sprites[i] = rendering.SPRITES.get(colour, int(self.size[i]))
+
+	def draw(self, alpha=1.0):
+		"""
+		Draws every particle 'alpha' of the way from its previous position to its current position in one batch of blits.
+		"""
+		if self.sprites is None:
+			self.sprites = rendering.SPRITES.get_many(self.colour.tolist(), self.size.tolist())
+		draw_x = (self.previous_x + alpha * (self.x - self.previous_x)).astype(np.int64)
+		draw_y = (self.previous_y + alpha * (self.y - self.previous_y)).astype(np.int64)
+		rendering.draw_sprites(self.screen, self.sprites, (draw_x - self.size).tolist(), (draw_y - self.size).tolist())
+
+
+class SpatialHash:
+	"""
+	This is a uniform grid that is used as a 'broad phase' for collision checks. Every item is stored in the grid cell that its 
+	position falls into, so only the items in the neighbouring cells need to be checked instead of every other item. The cells are
+	kept in a dictionary so the grid does not need to know the size of the area in advance.
+	"""
+	def __init__(self, cell_size):
+		"""
+		cell_size: float
+			- the width and height of each grid cell.
+			- this should be at least the largest distance at which two items can collide, so that colliding items are always in
+			  the same cell or in neighbouring cells.
+		"""
+		self.cell_size = cell_size
+		self.cells = {}
+		self.item_cells = {}
+
+	def cell_of(self, x, y):
+		return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+	def clear(self):
+		self.cells.clear()
+		self.item_cells.clear()
+
+	def insert(self, item, x, y):
+		cell = self.cell_of(x, y)
+		self.item_cells[item] = cell
+		self.cells.setdefault(cell, set()).add(item)
+
+	def move(self, item, x, y):
+		"""
+		Moves an item that is already in the grid to the cell for its new position.
+		"""
+		cell = self.cell_of(x, y)
+		old_cell = self.item_cells[item]
+		if cell != old_cell:
+			self.cells[old_cell].discard(item)
+			self.item_cells[item] = cell
+			self.cells.setdefault(cell, set()).add(item)
+
+	def query(self, x, y):
+		"""
+		Returns a list of all of the items in the cell containing (x, y) and in the 8 cells around it.
+		"""
+		cell_x, cell_y = self.cell_of(x, y)
+		items = []
+		for i in range(cell_x - 1, cell_x + 2):
+			for j in range(cell_y - 1, cell_y + 2):
+				cell = self.cells.get((i, j))
+				if cell:
+					items.extend(cell)
+		return items
+
+
 class PointParticleSystem:
-	def __init__(self, screen, particle_num=10, particle_size=10):
+	def __init__(self, screen, particle_num=10, particle_size=10, broad_phase=True, bounds=None, elasticity=0.8, drag=0.0001,
+				 vectorised=False):
+		"""
+		screen: pygame screen object
+			- used as the pygame surface that all of the particles and buttons are drawn to.
+			- if None, then the particles are headless: there are no buttons and they can only be stepped, not drawn.
+		particle_num: int [10]
+			- the number of particles in the box.
+		particle_size: int [10]
+			- the radius of every particle.
+		broad_phase: bool [True]
+			- only used if 'vectorised' is False.
+			- if True, then a 'SpatialHash' is used so that each particle is only checked against the particles near it.
+			- if False, then every particle is checked against every other particle (the original behaviour).
+			- both give exactly the same collisions, so this flag can be used to compare the two.
+		bounds: Tuple[int, int] [None]
+			- the (width, height) of the box the particles are in, by default this is the size of the screen.
+		elasticity: float [0.8]
+			- the fraction of a particle's speed that is kept when it bounces off of a wall or another particle.
+		drag: float [0.0001]
+			- the fraction of a particle's speed that is lost on every step.
+		vectorised: bool [False]
+			- if False, then every particle is its own 'PointParticle' object and is moved one at a time (the original behaviour).
+			- if True, then the particles are stored in a single 'PointParticleArrays' object and moved together with NumPy, which
+			  is much faster for thousands of particles (see 'benchmarks.py particles').
+			- the moves and bounces are the same, but the vectorised particles all move before any collisions are checked, where
+			  the original checks each particle for collisions straight after it moves (see 'PointParticleArrays.collide_all'). So
+			  the two give the same results until the first collision and then drift apart, and only the original is used on the
+			  'Point Particles' screen.
+		"""
 		self.screen = screen
+		self.vectorised = vectorised
+		width, height = get_bounds(screen, bounds)
 		self.particle_objs = []
+		# The total number of collisions between particles so far.
+		self.collision_count = 0
+		self.broad_phase = broad_phase
+		self.alpha = 1.0
+		self.animated = True
+		# Two particles can only collide if their centres are closer than two radii, so this is the smallest safe cell size.
+		self.spatial_hash = SpatialHash(2 * particle_size)
 		self.x_offset = 6
 		self.y_offset = 60
 
 		for n in range(particle_num):
-			x = randint(particle_size + self.x_offset, screen.get_width() - particle_size - self.x_offset)
-			y = randint(particle_size + 2*self.y_offset + 2*self.x_offset, screen.get_height() - particle_size - 2*self.x_offset)
+			x = randint(particle_size + self.x_offset, width - particle_size - self.x_offset)
+			y = randint(particle_size + 2*self.y_offset + 2*self.x_offset, height - particle_size - 2*self.x_offset)
 
-			particle = PointParticle(screen, (x, y), particle_size, self.x_offset + 2, self.y_offset + 2)
+			particle = PointParticle(screen, (x, y), particle_size, self.x_offset + 2, self.y_offset + 2, (width, height))
 			particle.speed = random()
 			particle.angle = uniform(0, math.pi*4)
+			particle.ELASTICITY = elasticity
+			particle.DRAG = drag
 		
 			self.particle_objs.append(particle) 
 
+		if self.vectorised:
+			# As with the solar system, the objects are only used to generate the starting state.
+			self.particle_objs = PointParticleArrays.from_particles(screen, self.particle_objs, (width, height))
+
 		self.selected_particle = None
-		self.buttons = [buttons.TextButton(screen, [screen.get_width() - 100, 50], 150, 80, 
-										  (87, 201, 242), (18, 49, 227), 3, "Arial", 20, 
-										  "Go Back", (0, 0, 0)),
-						buttons.Button(screen, [screen.get_width() // 2, screen.get_height() // 2 + 50], 
-										screen.get_width() - 2*self.x_offset, screen.get_height() - 2*self.y_offset, 
-										(50, 50, 50), (250, 250, 250), 4, False)]
-		self.button_ls = self.particle_objs + self.buttons
+		# The 'TrajectoryRecorder' that every step is written to while the simulation is being recorded.
+		self.recorder = None
+		self.buttons = []
+		if screen is not None:
+			self.buttons = [buttons.TextButton(screen, [screen.get_width() - 100, 50], 150, 80, 
+											  (87, 201, 242), (18, 49, 227), 3, "Arial", 20, 
+											  "Go Back", (0, 0, 0)),
+							buttons.Button(screen, [screen.get_width() // 2, screen.get_height() // 2 + 50], 
+											screen.get_width() - 2*self.x_offset, screen.get_height() - 2*self.y_offset, 
+											(50, 50, 50), (250, 250, 250), 4, False)] + recording_buttons(screen)
+		if self.vectorised:
+			self.button_ls = [self.particle_objs] + self.buttons
+		else:
+			self.button_ls = self.particle_objs + self.buttons
 
 	def find_particle(self, mouse_x, mouse_y):
+		"""
+		Selects the particle under the mouse. If particles overlap then the last one is selected. For vectorised particles the 
+		selected particle is stored as its index.
+		"""
+		if self.vectorised:
+			particles = self.particle_objs
+			under_mouse = np.flatnonzero(np.hypot(particles.x - mouse_x, particles.y - mouse_y) <= particles.size)
+			if len(under_mouse):
+				self.selected_particle = int(under_mouse[-1])
+			return
+
 		for particle in self.particle_objs:
 			if math.hypot(particle.x - mouse_x, particle.y - mouse_y) <= particle.size:
 				self.selected_particle = particle
@@ -241,6 +1339,29 @@ class PointParticleSystem:
 			particle1.y -= math.cos(angle)
 			particle2.x -= math.sin(angle)
 			particle2.y += math.cos(angle)
+			self.collision_count += 1
+			return True
+		return False
+
+	def check_collide_neighbours(self, i):
+		"""
+		Checks particle 'i' against every later particle in the neighbouring grid cells, in the same order as the pairwise loop in
+		'update_menu' would. A collision nudges both particles, so the neighbours are looked up again from the new position after
+		each one. This means the collisions are exactly the same as checking every later particle.
+		"""
+		particle = self.particle_objs[i]
+		last_checked = i
+		while True:
+			neighbours = sorted(j for j in self.spatial_hash.query(particle.x, particle.y) if j > last_checked)
+			for j in neighbours:
+				particle2 = self.particle_objs[j]
+				if self.check_collide(particle, particle2):
+					self.spatial_hash.move(i, particle.x, particle.y)
+					self.spatial_hash.move(j, particle2.x, particle2.y)
+					last_checked = j
+					break
+			else:
+				return
 	
 	def update_buttons(self, events):
 		for button in self.buttons:
@@ -257,6 +1378,12 @@ class PointParticleSystem:
 			elif event.type == pygame.MOUSEBUTTONUP:
 				self.selected_particle = None
 
+		if self.vectorised:
+			self.update_selected_arrays()
+			with profiler.PROFILER.scope("draw"):
+				self.particle_objs.draw(self.alpha)
+			return
+
 		for particle in self.particle_objs:
 			if particle.colour == (0, 255, 0):
 				particle.colour = (255, 255, 0)
@@ -269,12 +1396,94 @@ class PointParticleSystem:
 			self.selected_particle.angle = math.atan2(dy, dx) + (math.pi/2)
 			self.selected_particle.speed = math.hypot(dx, dy) * 0.005
 
+		alpha = self.alpha
+		with profiler.PROFILER.scope("draw"):
+			rendering.draw_circles(self.screen,
+								   [int(particle.previous_x + alpha * (particle.x - particle.previous_x)) for particle in self.particle_objs],
+								   [int(particle.previous_y + alpha * (particle.y - particle.previous_y)) for particle in self.particle_objs],
+								   [particle.colour for particle in self.particle_objs], [particle.size for particle in self.particle_objs])
+
+	def update_selected_arrays(self):
+		"""
+		The same as the selected particle part of 'update_menu' for vectorised particles. The selected particle is shown in green
+		and its velocity is set from the mouse, (sin(a) * s, cos(a) * s) with the original angle a and speed s works out to 
+		(dx * 0.005, -dy * 0.005).
+		"""
+		particles = self.particle_objs
+		for i in np.flatnonzero((particles.colour == (0, 255, 0)).all(axis=1)):
+			if i != self.selected_particle:
+				particles.set_colour(i, (255, 255, 0))
+
+		if self.selected_particle is not None:
+			i = self.selected_particle
+			particles.set_colour(i, (0, 255, 0))
+			mouse_x, mouse_y = pygame.mouse.get_pos()
+			particles.velocity_x[i] = (mouse_x - particles.x[i]) * 0.005
+			particles.velocity_y[i] = -(mouse_y - particles.y[i]) * 0.005
+
+	def get_state(self):
+		"""
+		Returns a dictionary of arrays with the position and velocity of every particle.
+		"""
+		if self.vectorised:
+			particles = self.particle_objs
+			return {"x": particles.x.copy(), "y": particles.y.copy(), "velocity_x": particles.velocity_x.copy(),
+					"velocity_y": particles.velocity_y.copy()}
+		return {"x": np.array([particle.x for particle in self.particle_objs]), 
+				"y": np.array([particle.y for particle in self.particle_objs]),
+				"velocity_x": np.array([math.sin(particle.angle) * particle.speed for particle in self.particle_objs]), 
+				"velocity_y": np.array([math.cos(particle.angle) * particle.speed for particle in self.particle_objs])}
+
+	def get_appearance(self):
+		"""
+		Returns an array of the radius of every particle and an array of their (red, green, blue) colours.
+		"""
+		if self.vectorised:
+			return self.particle_objs.size.copy(), self.particle_objs.colour.copy()
+		return (np.array([particle.size for particle in self.particle_objs]), 
+				np.array([particle.colour for particle in self.particle_objs], dtype=np.uint8))
+
+	def step(self):
+		"""
+		Moves every particle forward by one time step, bounces them off of the walls and then checks them for collisions.
+		"""
+		if self.vectorised:
+			with profiler.PROFILER.scope("move"):
+				self.particle_objs.move()
+				self.particle_objs.bounce()
+			with profiler.PROFILER.scope("collisions"):
+				self.collision_count += self.particle_objs.collide_all()
+			self.record_step()
+			return
+
+		# Each particle is moved and then collided before the next one is moved, so the two phases are timed once per particle
+		# with the same two scopes (a scope can be entered again once it has been left, and the times are added together).
+		move_scope = profiler.PROFILER.scope("move")
+		collisions_scope = profiler.PROFILER.scope("collisions")
+		if self.broad_phase:
+			with collisions_scope:
+				self.spatial_hash.clear()
+				for i, particle in enumerate(self.particle_objs):
+					self.spatial_hash.insert(i, particle.x, particle.y)
+
 		for i, particle in enumerate(self.particle_objs):
-			particle.move()
-			particle.bounce()
+			with move_scope:
+				particle.move()
+				particle.bounce()
 
-			for particle2 in self.particle_objs[i + 1:]:
-				self.check_collide(particle, particle2)
-				
-			particle.draw()
+			with collisions_scope:
+				if self.broad_phase:
+					self.spatial_hash.move(i, particle.x, particle.y)
+					self.check_collide_neighbours(i)
+				else:
+					for particle2 in self.particle_objs[i + 1:]:
+						self.check_collide(particle, particle2)
+		self.record_step()
+
+	def record_step(self):
+		"""
+		Writes the step that has just been taken to the trajectory file, if the simulation is being recorded and the file is not full.
+		"""
+		if self.recorder is not None and not self.recorder.is_full():
+			self.recorder.record(self)
 
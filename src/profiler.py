@@ -0,0 +1,219 @@
+"""
+A low overhead frame profiler. The time spent in each named part ('phase') of a frame is measured with a timing scope, e.g.:
+    with profiler.PROFILER.scope("collisions"):
+        self.collision_count += self.particle_objs.collide_all()
+and the main loop marks where each frame starts and ends. The times for the last few hundred frames are kept in a ring buffer, so
+the mean, 95th percentile and maximum time of every phase can be shown on the screen (press F3), and the time of every phase on
+every frame can be recorded and saved to a CSV file (press F4 to start recording and again to save it).
+While the profiler is disabled a scope does nothing apart from a single attribute check.
+"""
+import csv
+import time
+import numpy as np
+import pygame
+import buttons
+
+
+class _Scope:
+    """
+    Adds the time between entering and leaving the 'with' block to the phase's time for the current frame. A phase can be timed
+    more than once in a frame (e.g. once per physics step) and the times are added together. Scopes can be nested, so the time of an
+    inner scope is also part of the time of the scope around it.
+    """
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self: object, profiler: object, name: str) -> object:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self: object) -> object:
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self: object, *exc_info) -> None:
+        phases = self.profiler.current_frame
+        phases[self.name] = phases.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class _NullScope:
+    """
+    The scope that is used while the profiler is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self: object) -> object:
+        return self
+
+    def __exit__(self: object, *exc_info) -> None:
+        pass
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class FrameProfiler:
+    """
+    Keeps the time of every phase for the last 'history' frames. Times are stored in seconds and shown in milliseconds.
+    """
+    def __init__(self: object, history=300, max_recorded_frames=100000) -> object:
+        """
+        history: int [300]
+            - the number of frames that the statistics are worked out over.
+        max_recorded_frames: int [100000]
+            - the most frames that are kept while recording, after this recording stops on its own.
+        """
+        self.history = history
+        self.max_recorded_frames = max_recorded_frames
+        self.enabled = False
+        self.recording = False
+        self.frame_count = 0
+        self.frame_start = None
+        self.current_frame = {}
+        # The ring buffer of times for each phase. A phase that was not timed in a frame has a time of 0 for that frame.
+        self.times = {}
+        self.records = []
+
+    def scope(self: object, name: str) -> object:
+        """
+        Returns a context manager that times the phase called 'name'.
+        """
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def begin_frame(self: object) -> None:
+        if self.enabled:
+            self.current_frame = {}
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self: object) -> None:
+        """
+        Adds the current frame's times to the ring buffers (and to the recording), including the total time of the whole frame.
+        """
+        if not self.enabled or self.frame_start is None:
+            return
+        phases = self.current_frame
+        phases["frame"] = time.perf_counter() - self.frame_start
+        self.frame_start = None
+
+        slot = self.frame_count % self.history
+        for name in phases.keys() - self.times.keys():
+            self.times[name] = np.zeros(self.history)
+        for name, times in self.times.items():
+            times[slot] = phases.get(name, 0.0)
+        self.frame_count += 1
+
+        if self.recording:
+            self.records.append((self.frame_count, phases))
+            if len(self.records) >= self.max_recorded_frames:
+                self.recording = False
+
+    def reset(self: object) -> None:
+        """
+        Forgets the times of every frame so far (but not the recording).
+        """
+        self.frame_count = 0
+        self.times = {}
+
+    def stats(self: object) -> dict:
+        """
+        Returns a dictionary mapping each phase to its (mean, 95th percentile, maximum) time in seconds over the frames in the ring
+        buffer.
+        """
+        frames = min(self.frame_count, self.history)
+        if frames == 0:
+            return {}
+        return {name: (float(np.mean(times[:frames])), float(np.percentile(times[:frames], 95)), float(np.max(times[:frames])))
+                for name, times in self.times.items()}
+
+    def start_recording(self: object) -> None:
+        self.enabled = True
+        self.recording = True
+        self.records = []
+
+    def stop_recording(self: object) -> None:
+        self.recording = False
+
+    def write_csv(self: object, path: str) -> None:
+        """
+        Writes the recorded frames to a CSV file with one row per frame and one column per phase, in milliseconds.
+        """
+        names = ["frame"] + sorted({name for _, phases in self.records for name in phases} - {"frame"})
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame_number"] + [f"{name}_ms" for name in names])
+            for frame_number, phases in self.records:
+                writer.writerow([frame_number] + [round(phases.get(name, 0.0) * 1000, 4) for name in names])
+
+
+# One profiler is shared by the whole program, so any module can time a phase without it being passed around.
+PROFILER = FrameProfiler()
+
+
+class ProfilerOverlay:
+    """
+    Draws a table of the profiler's statistics in the top left corner of the screen. F3 shows and hides the overlay (the profiler
+    is only enabled while it is shown or recording), and F4 starts recording and then saves the recording to a CSV file.
+    """
+    def __init__(self: object, screen: object, profiler=PROFILER, font="Consolas", text_size=14, csv_path="frame_times.csv") -> object:
+        """
+        screen: pygame screen object
+            - used as the pygame surface that the overlay is drawn to.
+        profiler: FrameProfiler [PROFILER]
+            - the profiler whose statistics are shown.
+        csv_path: str ["frame_times.csv"]
+            - the file that recordings are saved to.
+        """
+        self.screen = screen
+        self.profiler = profiler
+        self.sys_font = buttons.get_font(font, text_size)
+        self.csv_path = csv_path
+        self.visible = False
+        self.rect = None
+
+    def handle_events(self: object, events) -> bool:
+        """
+        Checks for the F3 and F4 keys, returns True if the overlay has been hidden, as the screen under it then needs to be redrawn.
+        """
+        hidden = False
+        for event in events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_F3:
+                self.visible = not self.visible
+                hidden = not self.visible
+                if self.visible:
+                    self.profiler.reset()
+            elif event.key == pygame.K_F4:
+                if self.profiler.recording:
+                    self.profiler.stop_recording()
+                    self.profiler.write_csv(self.csv_path)
+                    print(f"Frame times written to {self.csv_path}")
+                else:
+                    self.profiler.start_recording()
+        self.profiler.enabled = self.visible or self.profiler.recording
+        return hidden
+
+    def draw(self: object) -> object:
+        """
+        Draws the overlay if it is shown and returns the rectangle that it was drawn to (or None).
+        """
+        if not self.visible:
+            self.rect = None
+            return None
+        stats = self.profiler.stats()
+        lines = [f"{'phase':<14}{'mean':>7}{'p95':>7}{'max':>7} ms" + ("  REC" if self.profiler.recording else "")]
+        # The whole frame comes first, then the other phases from slowest to fastest.
+        for name in sorted(stats, key=lambda name: (name != "frame", -stats[name][0])):
+            mean, p95, maximum = (value * 1000 for value in stats[name])
+            lines.append(f"{name[:13]:<14}{mean:>7.2f}{p95:>7.2f}{maximum:>7.2f}")
+
+        rendered = [self.sys_font.render(line, True, (255, 255, 255)) for line in lines]
+        line_height = self.sys_font.get_linesize()
+        rect = pygame.Rect(0, 0, max(text.get_width() for text in rendered) + 10, line_height * len(rendered) + 10)
+        # The overlay never shrinks while it is shown, so no old text is left around it on screens that are not cleared.
+        self.rect = rect.union(self.rect) if self.rect else rect
+        self.screen.fill((0, 0, 0), self.rect)
+        for i, text in enumerate(rendered):
+            self.screen.blit(text, (5, 5 + i * line_height))
+        return self.rect
@@ -0,0 +1,209 @@
+"""
+Shared drawing helpers for the simulations. Drawing a circle with 'pygame.draw.circle' has to work out the shape of the circle
+every time, so drawing thousands of bodies one circle at a time takes up most of a frame. Instead, each (colour, radius) circle is
+drawn once onto a small sprite, and every body is then copied onto the screen with a single 'Surface.blits' call.
+"""
+import pygame
+
+
+class SpriteCache:
+    """
+    This class keeps one pre-drawn circle sprite for every (colour, radius) that has been asked for. Each sprite is 2 * radius
+    pixels wide with the circle drawn at its centre, so blitting it at (x - radius, y - radius) gives exactly the same pixels as
+    'pygame.draw.circle(surface, colour, (x, y), radius)'.
+    """
+    def __init__(self: object) -> object:
+        self.sprites = {}
+
+    def get(self: object, colour, radius: int) -> object:
+        """
+        Returns the sprite for a circle of the given colour and radius, drawing it the first time it is asked for. A circle with
+        a radius less than 1 is not drawn by pygame, so None is returned for it.
+        """
+        key = (tuple(colour), radius)
+        sprite = self.sprites.get(key)
+        if sprite is None and key not in self.sprites:
+            if radius >= 1:
+                sprite = pygame.Surface((2 * radius, 2 * radius))
+                # The parts of the sprite outside the circle are filled with a colour that is different to the circle, and this
+                # colour is made transparent.
+                background = tuple(255 - value for value in key[0])
+                sprite.fill(background)
+                pygame.draw.circle(sprite, key[0], (radius, radius), radius)
+                sprite.set_colorkey(background, pygame.RLEACCEL)
+                if pygame.display.get_surface() is not None:
+                    sprite = sprite.convert()
+            self.sprites[key] = sprite
+        return sprite
+
+    def get_many(self: object, colours, radii) -> list:
+        """
+        Returns a list of the sprite for every (colour, radius) pair. This can be worked out once for bodies that do not change
+        their appearance and then reused on every frame.
+        """
+        return [self.get(colour, radius) for colour, radius in zip(colours, radii)]
+
+    def clear(self: object) -> None:
+        self.sprites.clear()
+
+
+# One cache is shared by every simulation, so a circle that appears on several screens is only drawn once.
+SPRITES = SpriteCache()
+
+
+def draw_sprites(surface: object, sprites: list, left: list, top: list) -> None:
+    """
+    Blits every sprite onto 'surface' with its top left corner at ('left', 'top') using a single 'Surface.blits' call. For a circle
+    sprite from 'SpriteCache' this is (x - radius, y - radius). 'left' and 'top' should be lists of ints (e.g. from NumPy's
+    'tolist') and none of the sprites can be None.
+    """
+    surface.blits(list(zip(sprites, zip(left, top))), False)
+
+
+def draw_circles(surface: object, x: list, y: list, colours: list, radii: list, cache=SPRITES) -> None:
+    """
+    Draws a circle centred on every (x, y) position using the sprite cache. This looks up the sprite for every circle, so for
+    bodies whose colours and radii do not change from frame to frame it is faster to use 'get_many' once and then 'draw_sprites'.
+    """
+    blits = []
+    for x, y, colour, radius in zip(x, y, colours, radii):
+        sprite = cache.get(colour, radius)
+        if sprite is not None:
+            blits.append((sprite, (x - radius, y - radius)))
+    surface.blits(blits, False)
+
+
+def widget_rect(widget) -> pygame.Rect:
+    """
+    Returns the area of the screen that a widget draws to: its button rectangle, its text (which can be wider than the button) and,
+    for an open 'DropDownSelectButton', all of its options.
+    """
+    rect = widget.pygame_button_object.copy()
+    if hasattr(widget, "text_layout"):
+        for text_surface, text_rect in widget.text_layout():
+            rect.union_ip(text_rect)
+    if getattr(widget, "show_options", False):
+        for option in widget.option_objects:
+            rect.union_ip(widget_rect(option))
+    if hasattr(widget, "bar_rect_object"):
+        rect.union_ip(widget.bar_rect_object)
+    return rect
+
+
+def draw_state(widget) -> tuple:
+    """
+    Returns everything that affects how a widget looks. If this is the same as on the last frame then the widget does not need to
+    be drawn again.
+    """
+    text = widget.displayed_text() if hasattr(widget, "displayed_text") else None
+    state = (tuple(widget_rect(widget)), widget.bg_colour, widget.border_colour, text, getattr(widget, "text_colour", None))
+    if getattr(widget, "show_options", False):
+        state += tuple(draw_state(option) for option in widget.option_objects)
+    return state
+
+
+def draw_widget(widget) -> None:
+    """
+    Draws a widget, including the options of an open 'DropDownSelectButton' (which it normally draws in its 'update' method).
+    """
+    widget.draw()
+    if getattr(widget, "show_options", False):
+        for option in widget.option_objects:
+            option.draw()
+
+
+class RetainedLayer:
+    """
+    Draws a menu screen in 'retained mode'. Normally every widget is drawn on every frame and the whole window is sent to the
+    display. Instead, the background and the non-interactive widgets (titles and labels) are drawn once onto a cached 'static'
+    surface. On each frame only the widgets whose 'draw_state' has changed (e.g. a button being hovered over, or text being
+    typed) are drawn again, and only the parts of the screen that changed (the 'dirty rects') need to be sent to the display.
+    """
+    def __init__(self: object, screen: object, background=(0, 0, 0)) -> object:
+        """
+        screen: pygame screen object
+            - the surface that the widgets draw to.
+        background: Tuple[int, int, int] [(0, 0, 0)]
+            - the colour behind the widgets, the same as the colour the main loop clears the screen to.
+        """
+        self.screen = screen
+        self.background = background
+        self.static = None
+        self.redraw_all = False
+        self.widget_ids = None
+        self.states = {}
+        self.rects = {}
+
+    def invalidate(self: object) -> None:
+        """
+        Makes the next call to 'update' draw everything again, including the static layer.
+        """
+        self.static = None
+
+    def refresh(self: object) -> None:
+        """
+        Makes the next call to 'update' draw the whole screen again (e.g. after the screen has been cleared) using the static
+        layer that has already been drawn.
+        """
+        self.redraw_all = True
+
+    def compose_static(self: object, widgets: list) -> None:
+        """
+        Draws the background and every non-interactive widget to the screen and keeps a copy of it as the static layer.
+        """
+        self.screen.fill(self.background)
+        for widget in widgets:
+            if not widget.interactive:
+                draw_widget(widget)
+        self.static = self.screen.copy()
+
+    def update(self: object, widgets: list, events: list) -> list:
+        """
+        Updates every widget with the events and then draws them (see 'draw').
+        """
+        for widget in widgets:
+            widget.update(events)
+        return self.draw(widgets)
+
+    def draw(self: object, widgets: list) -> list:
+        """
+        Draws the widgets that have changed since the last frame and returns the list of rectangles of the screen that have been
+        drawn to, which can be passed to 'pygame.display.update'.
+        """
+        states = {id(widget): draw_state(widget) for widget in widgets}
+        rects = {id(widget): widget_rect(widget) for widget in widgets}
+
+        widget_ids = [id(widget) for widget in widgets]
+        static_changed = any(not widget.interactive and states[id(widget)] != self.states.get(id(widget)) for widget in widgets)
+        if self.static is None or widget_ids != self.widget_ids or static_changed or self.redraw_all:
+            if self.static is None or widget_ids != self.widget_ids or static_changed:
+                self.compose_static(widgets)
+            else:
+                self.screen.blit(self.static, (0, 0))
+            self.redraw_all = False
+            for widget in widgets:
+                if widget.interactive:
+                    draw_widget(widget)
+            dirty = [self.screen.get_rect()]
+        else:
+            dirty = []
+            for widget in widgets:
+                key = id(widget)
+                # An open drop down draws its options in its 'update' method, on top of anything drawn before it, so its area
+                # is always drawn again to keep the widgets in the right order.
+                if states[key] != self.states[key] or getattr(widget, "show_options", False):
+                    dirty += [self.rects[key], rects[key]]
+            dirty = [rect for i, rect in enumerate(dirty) if rect not in dirty[:i]]
+
+            for rect in dirty:
+                self.screen.set_clip(rect)
+                self.screen.blit(self.static, rect, rect)
+                for widget in widgets:
+                    if widget.interactive and rects[id(widget)].colliderect(rect):
+                        draw_widget(widget)
+            self.screen.set_clip(None)
+
+        self.widget_ids = widget_ids
+        self.states = states
+        self.rects = rects
+        return dirty
@@ -0,0 +1,83 @@
+import pygame
+
+class FixedTimestepLoop:
+    """
+    This class keeps the simulations running at a fixed number of steps per second, no matter how fast the computer can draw frames.
+    The time taken by each frame is added to an 'accumulator' and as many whole physics steps as fit into it are run. Whatever is
+    left over is used to find how far between the last two steps the simulation should be drawn (the 'alpha'). The frame rate is
+    capped so that the program does not use a whole CPU core drawing frames that the screen cannot show.
+    """
+    def __init__(self: object, physics_rate=60, max_steps_per_frame=5, frame_rate=60) -> object:
+        """
+        physics_rate: int [60]
+            - the number of physics steps that are run for every second of real time.
+            - higher values are more accurate but cost more CPU time.
+        max_steps_per_frame: int [5]
+            - the most physics steps that will be run in a single frame.
+            - if a computer cannot keep up, then the simulation slows down instead of trying to catch up forever.
+        frame_rate: int [60]
+            - the most frames that will be drawn per second.
+            - 0 means that the frame rate is not capped.
+        """
+        self.step_time = 1 / physics_rate
+        self.default_step_time = self.step_time
+        self.max_steps_per_frame = max_steps_per_frame
+        self.frame_rate = frame_rate
+        self.clock = pygame.time.Clock()
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        # True after 'wait_for_events', so that the time spent waiting is not counted as a slow frame by the next 'tick'.
+        self.idle = False
+
+    def tick(self: object) -> float:
+        """
+        Waits until it is time for the next frame and returns the time since the last frame in seconds. If the loop has just been
+        waiting for events then 0 is returned instead, so that a simulation does not try to catch up on the time it was idle.
+        """
+        frame_time = self.clock.tick(self.frame_rate) / 1000
+        if self.idle:
+            self.idle = False
+            return 0.0
+        return frame_time
+
+    def wait_for_events(self: object, timeout=1000) -> list:
+        """
+        Used instead of 'tick' and 'pygame.event.get' for screens with nothing moving on them. The program sleeps until there is at
+        least one event (or until 'timeout' milliseconds have passed) and then returns every event in the queue. This means the
+        program uses almost no CPU time while the user is not doing anything. An empty list is returned after a timeout.
+        """
+        self.idle = True
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def reset(self: object, physics_rate=None) -> None:
+        """
+        Throws away any time that has built up, e.g. when a new simulation is opened.
+        physics_rate: int [None]
+            - the number of physics steps per second for the new simulation, if it is None then the 'physics_rate' that the loop
+              was created with is used.
+        """
+        self.step_time = self.default_step_time if physics_rate is None else 1 / physics_rate
+        self.accumulator = 0.0
+        self.alpha = 1.0
+
+    def advance(self: object, step, frame_time: float) -> int:
+        """
+        Adds the frame time to the accumulator and calls 'step' once for every whole physics step that has built up. Returns the
+        number of steps that were run.
+        """
+        self.accumulator += frame_time
+        steps = 0
+        while self.accumulator >= self.step_time and steps < self.max_steps_per_frame:
+            step()
+            self.accumulator -= self.step_time
+            steps += 1
+
+        if steps == self.max_steps_per_frame and self.accumulator >= self.step_time:
+            # The computer could not keep up, so the left over time is dropped instead of being carried into the next frame.
+            self.accumulator %= self.step_time
+
+        self.alpha = self.accumulator / self.step_time
+        return steps
@@ -0,0 +1,134 @@
+"""
+Runs slow calculations (e.g. sympy rearranging an equation) on background worker threads so that the main loop keeps drawing frames
+while they run. A calculation is submitted as a 'SolveJob' and the screen that submitted it checks the job once per frame with
+'poll', e.g.:
+    self.job = solverJobs.POOL.submit(suvat.solve, "s", "v", values, timeout=10)
+    ...
+    if self.job.poll() == "done":
+        value, rearrangement, index = self.job.result
+Python threads cannot be stopped from outside, so a job that is cancelled or times out while it is running carries on in the
+background until it finishes, but its result is thrown away. Its worker thread cannot run anything else until then, so when every
+worker is stuck like this a new job is not queued (where it would only time out as well) and its state is "no worker" straight
+away. The worker threads are daemon threads, so they never stop the program from closing.
+"""
+import queue
+import threading
+import time
+
+# The longest time in seconds that a job is waited for before it is given up on.
+DEFAULT_TIMEOUT = 10.0
+
+
+class SolveJob:
+    """
+    One function call that is run on a worker thread. 'state' is one of:
+        "pending"   - waiting for a worker thread.
+        "running"   - being run by a worker thread.
+        "done"      - finished, the return value is in 'result'.
+        "failed"    - raised an exception, which is in 'error'.
+        "cancelled" - cancelled with 'cancel' before it finished.
+        "timed out" - did not finish within 'timeout' seconds (found by 'poll').
+        "no worker" - never run, as every worker thread was still running a job that had been cancelled or had timed out.
+    """
+    def __init__(self: object, function, args: tuple, timeout=DEFAULT_TIMEOUT) -> object:
+        """
+        function: callable
+            - the function to run, which should not use pygame or change anything that the main loop uses.
+        args: tuple
+            - the arguments to call 'function' with.
+        timeout: float [DEFAULT_TIMEOUT]
+            - the number of seconds after the job is submitted that it times out (None for no timeout).
+        """
+        self.function = function
+        self.args = args
+        self.timeout = timeout
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.state = "pending"
+        self.result = None
+        self.error = None
+        self.lock = threading.Lock()
+
+    def run(self: object) -> None:
+        """
+        Runs the function on the current (worker) thread, unless the job has already been cancelled or has timed out.
+        """
+        with self.lock:
+            if self.state != "pending":
+                return
+            self.state = "running"
+        try:
+            result, error = self.function(*self.args), None
+        except Exception as exception:
+            result, error = None, exception
+        with self.lock:
+            # The job may have been cancelled or timed out while it was running, in which case the result is not wanted.
+            if self.state == "running":
+                self.result = result
+                self.error = error
+                self.state = "done" if error is None else "failed"
+
+    def poll(self: object) -> str:
+        """
+        Returns the job's state, first marking it as timed out if it has not finished by its deadline.
+        """
+        with self.lock:
+            if self.state in ("pending", "running") and self.deadline is not None and time.monotonic() > self.deadline:
+                self.state = "timed out"
+            return self.state
+
+    def cancel(self: object) -> None:
+        with self.lock:
+            if self.state in ("pending", "running"):
+                self.state = "cancelled"
+
+
+class SolverPool:
+    """
+    A small pool of daemon worker threads that run 'SolveJob' objects in the order they are submitted. The threads are only started
+    when the first job is submitted.
+    """
+    def __init__(self: object, workers=2) -> object:
+        """
+        workers: int [2]
+            - the number of worker threads, which is the most jobs that can run at the same time.
+        """
+        self.workers = workers
+        self.jobs = queue.SimpleQueue()
+        self.threads = []
+        # The job that each worker thread is running, or None if it is waiting for a job.
+        self.running = [None] * workers
+
+    def submit(self: object, function, *args, timeout=DEFAULT_TIMEOUT) -> SolveJob:
+        """
+        Returns a new 'SolveJob' for 'function(*args)' that will be run by one of the worker threads. If every worker thread is
+        stuck (see 'stuck_workers') then the job is not run and its state is "no worker".
+        """
+        if not self.threads:
+            for i in range(self.workers):
+                thread = threading.Thread(target=self.work, args=(i,), name=f"solver-{i}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+        job = SolveJob(function, args, timeout)
+        if self.stuck_workers() >= self.workers:
+            job.state = "no worker"
+        else:
+            self.jobs.put(job)
+        return job
+
+    def stuck_workers(self: object) -> int:
+        """
+        Returns the number of worker threads that are still running a job that has been cancelled or has timed out. These threads
+        cannot run another job until that job finishes, which may be never.
+        """
+        return sum(job is not None and job.poll() in ("cancelled", "timed out") for job in self.running)
+
+    def work(self: object, index: int) -> None:
+        while True:
+            job = self.jobs.get()
+            self.running[index] = job
+            job.run()
+            self.running[index] = None
+
+
+# One pool is shared by every equation solver screen.
+POOL = SolverPool()
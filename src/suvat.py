@@ -0,0 +1,106 @@
+"""
+The five SUVAT equations and a table of every way of rearranging them. There are only 5 equations with 4 unknowns each, so each
+rearrangement is worked out with sympy once (the first time it is needed, and then kept in the cache file, see 'equationRegistry'),
+compiled into a plain Python function with 'sympy.lambdify' and kept along with its pretty-printed form. Solving is then a table
+lookup and a float calculation (done again with complex numbers if it has no real value, e.g. a negative square root).
+Whole worksheets of problems can be solved at once with 'solve_many', which groups the problems by rearrangement and works out
+each group with NumPy arrays (see 'batchSuvat.py' for solving a CSV file of problems from the command line).
+"""
+import numpy as np
+import sympy
+import equationRegistry
+
+# Initialising the ‘sympy’ ‘symbol’ objects and grouping them together in a list.
+s, u, v, a, t = sympy.symbols('s u v a t')
+SUVAT_vars = [s, u, v, a, t]
+VARIABLE_NAMES = [str(variable) for variable in SUVAT_vars]
+
+# Creating my five SUVAT equations using the ‘symbol’ objects that I instantiated from the ‘sympy’ module.
+SUVA = u**2 + 2*a*s
+SUVT = ((u+v)*t)/2
+SUAT = u*t + 0.5 * a * t**2
+SVAT = v*t - 0.5 * a * t**2
+UVAT = u + a*t
+
+# Putting the five SUVAT equations into a dictionary so that I can reference them as ‘no s’, ‘no u’, etc.
+SUVAT_EQUATIONS = {
+    "SUVA": sympy.Eq(v**2, SUVA),
+    "SUVT": sympy.Eq(s, SUVT),
+    "SUAT": sympy.Eq(s, SUAT),
+    "SVAT": sympy.Eq(s, SVAT),
+    "UVAT": sympy.Eq(v, UVAT)
+}
+
+# The equation to use when each variable is missing (i.e. not known and not wanted), e.g. with no 's' the equation is 'v = u + at'.
+EQUATION_FOR_MISSING = {"s": "UVAT", "u": "SVAT", "v": "SUAT", "a": "SUVT", "t": "SUVA"}
+
+
+# Each equation is registered under its name, with the variables that are in it in SUVAT order. Time is never negative, so the
+# time that is not negative is chosen when there are two possible times.
+for missing, name in EQUATION_FOR_MISSING.items():
+    equationRegistry.register(name, SUVAT_EQUATIONS[name], [variable for variable in VARIABLE_NAMES if variable != missing], ("t",))
+
+
+def get_rearrangement(missing: str, unknown: str) -> equationRegistry.Rearrangement:
+    """
+    Returns the rearrangement of the equation without 'missing' for 'unknown', working it out (or loading it from the cache file,
+    see 'equationRegistry') the first time it is asked for.
+    """
+    if missing not in EQUATION_FOR_MISSING or unknown not in EQUATION_FOR_MISSING or missing == unknown:
+        raise ValueError(f"Cannot rearrange for '{unknown}' with '{missing}' missing")
+    return equationRegistry.get_rearrangement(EQUATION_FOR_MISSING[missing], unknown)
+
+
+def build_table() -> dict:
+    """
+    Works out every one of the 20 rearrangements now instead of when they are first needed, and returns them keyed by (missing,
+    unknown).
+    """
+    return {(missing, unknown): get_rearrangement(missing, unknown)
+            for missing in VARIABLE_NAMES for unknown in VARIABLE_NAMES if missing != unknown}
+
+
+def solve(missing: str, unknown: str, values: dict) -> tuple:
+    """
+    Returns (value, rearrangement, index of the solution used) for 'unknown' given the three known 'values'.
+    """
+    rearrangement = get_rearrangement(missing, unknown)
+    value, index = rearrangement.evaluate(values)
+    return value, rearrangement, index
+
+
+def solve_many(missing, unknown, values) -> tuple:
+    """
+    Solves n problems at once.
+    missing: str or sequence of str
+        - the variable that is missing from each problem, or one variable for every problem.
+    unknown: str or sequence of str
+        - the variable that is wanted for each problem, or one variable for every problem.
+    values: array like
+        - an array of shape (n, 5) with the values of s, u, v, a and t for each problem. The values in the missing and unknown
+        columns are ignored (they can be NaN).
+    Returns (answers, indexes of the solutions used) as two arrays of length n, with NaN as the answer to a problem that has no
+    real answer. The problems are grouped by their (missing, unknown) pair, so there is one NumPy calculation for each of the (at
+    most 20) groups rather than one calculation per problem.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2 or values.shape[1] != len(VARIABLE_NAMES):
+        raise ValueError(f"'values' should have shape (n, {len(VARIABLE_NAMES)}), not {values.shape}")
+    count = len(values)
+    # Each problem's (missing, unknown) pair is turned into a single number so that the problems can be grouped with NumPy.
+    pattern = np.zeros(count, dtype=int)
+    for names, scale in ((missing, len(VARIABLE_NAMES)), (unknown, 1)):
+        unique_names, inverse = np.unique(np.broadcast_to(np.asarray(names, dtype=str), (count,)), return_inverse=True)
+        for name in unique_names:
+            if name not in VARIABLE_NAMES:
+                raise ValueError(f"'{name}' is not one of the SUVAT variables {VARIABLE_NAMES}")
+        pattern += scale * np.array([VARIABLE_NAMES.index(name) for name in unique_names], dtype=int)[inverse]
+
+    answers = np.full(count, np.nan)
+    indexes = np.zeros(count, dtype=int)
+    for code in np.unique(pattern):
+        rows = np.flatnonzero(pattern == code)
+        rearrangement = get_rearrangement(VARIABLE_NAMES[code // len(VARIABLE_NAMES)], VARIABLE_NAMES[code % len(VARIABLE_NAMES)])
+        columns = [VARIABLE_NAMES.index(name) for name in rearrangement.known]
+        answers[rows], indexes[rows] = rearrangement.evaluate_many(values[np.ix_(rows, columns)])
+    return answers, indexes
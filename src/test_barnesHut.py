@@ -0,0 +1,41 @@
+"""
+Checks the Barnes-Hut tree in 'physics' against the direct sum over every pair of bodies.
+"""
+import random
+import numpy as np
+import physics
+
+
+def make_bodies(count, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(0, 800, count), rng.uniform(0, 650, count), rng.uniform(1, 10, count)
+
+
+def test_theta_zero_matches_direct_sum():
+    # With theta = 0 no cell is ever accepted, so every body is summed over one at a time like the direct sum.
+    x, y, mass = make_bodies(500, 1)
+    tree_x, tree_y = physics.barnes_hut_accelerations(x, y, mass, 1.0, theta=0.0, softening=2.0)
+    direct_x, direct_y = physics.direct_sum_accelerations(x, y, mass, 1.0, softening=2.0, chunk_size=64)
+    np.testing.assert_allclose(tree_x, direct_x, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(tree_y, direct_y, rtol=1e-9, atol=1e-12)
+
+
+def test_default_theta_is_close_to_direct_sum():
+    x, y, mass = make_bodies(2000, 2)
+    tree_x, tree_y = physics.barnes_hut_accelerations(x, y, mass, 1.0, softening=2.0)
+    direct_x, direct_y = physics.direct_sum_accelerations(x, y, mass, 1.0, softening=2.0)
+    error = np.hypot(tree_x - direct_x, tree_y - direct_y) / np.hypot(direct_x, direct_y)
+    assert np.median(error) < 0.01
+
+
+def test_nbody_system_methods_agree():
+    random.seed(3)
+    tree = physics.NBodySystem(None, body_num=300, theta=0.0)
+    random.seed(3)
+    direct = physics.NBodySystem(None, body_num=300, method="direct")
+    for _ in range(20):
+        tree.step()
+        direct.step()
+    tree_state, direct_state = tree.get_state(), direct.get_state()
+    for key in tree_state:
+        np.testing.assert_allclose(tree_state[key], direct_state[key], rtol=1e-7, atol=1e-7)
@@ -0,0 +1,53 @@
+"""
+Checks the upgrade of old 'students' tables in 'dataBase' and the queries that use the StudentID index.
+"""
+import sqlite3
+import pytest
+import dataBase
+
+OLD_RECORDS = [("S001", "Ada", "Lovelace", "A12", "one"), ("S002", "Alan", "Turing", "B13", "two"),
+               ("S001", "Copy", "Of Ada", "C12", "three"), ("S003", "Grace", "Hopper", "D13", "four")]
+
+
+@pytest.fixture
+def old_database(tmp_path, monkeypatch):
+    """
+    A 'database.db' made by an older version of the program, with an untyped 'students' table, in a temporary working folder.
+    """
+    monkeypatch.chdir(tmp_path)
+    connection = sqlite3.connect("database.db")
+    connection.execute("CREATE TABLE students (StudentID, firstName, surName, classID, passwordHash)")
+    connection.executemany("INSERT INTO students VALUES(?, ?, ?, ?, ?)", OLD_RECORDS)
+    connection.commit()
+    connection.close()
+
+
+def test_migration_keeps_order_and_first_duplicate(old_database):
+    database = dataBase.DataBase()
+    assert database.students_table_is_typed()
+    assert database.read_all_data_from_table("students") == [OLD_RECORDS[0], OLD_RECORDS[1], OLD_RECORDS[3]]
+    database.close_connection()
+
+    # Opening the upgraded database again leaves it as it is.
+    database = dataBase.DataBase()
+    assert database.read_all_data_from_table("students") == [OLD_RECORDS[0], OLD_RECORDS[1], OLD_RECORDS[3]]
+
+
+def test_next_id_after_migration(old_database):
+    database = dataBase.DataBase()
+    # The next ID follows the last student added, as it did before the upgrade.
+    assert dataBase.generate_next_id(database, "students") == "S004"
+    assert database.add_data("students", ["S004", "Tim", "Berners-Lee", "A13", "five"])
+    assert dataBase.generate_next_id(database, "students") == "S005"
+    assert not database.add_data("students", ["S001", "Someone", "Else", "A12", "six"])
+    assert database.read_record("students", "S001") == OLD_RECORDS[0]
+    assert database.read_record("students", "S999") is None
+
+
+def test_new_database(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    database = dataBase.DataBase()
+    assert dataBase.generate_next_id(database, "students") == "S001"
+    database.add_data("students", ["S001", "Ada", "Lovelace", "A12", "one"])
+    database.remove_data("students", "S001")
+    assert database.read_all_data_from_table("students") == []
@@ -0,0 +1,74 @@
+"""
+Checks the rearrangements cache file in 'equationRegistry' and the 'parse_srepr' reader that it uses.
+"""
+import json
+import pytest
+import sympy
+import equationRegistry
+import suvat
+
+
+def fail_to_solve(*args, **kwargs):
+    raise AssertionError("the rearrangement should have come from the cache file")
+
+
+def test_cache_file_round_trip(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache" / "rearrangements.json")
+    entry, solutions = equationRegistry.RearrangementCache(path).rearrange("SUAT", "t")
+    assert len(solutions) == 2
+
+    monkeypatch.setattr(equationRegistry.sympy, "solve", fail_to_solve)
+    cached_entry, cached_solutions = equationRegistry.RearrangementCache(path).rearrange("SUAT", "t")
+    assert cached_entry == entry
+    assert cached_solutions == solutions
+
+
+def test_changed_or_broken_entries_are_worked_out_again(tmp_path):
+    path = str(tmp_path / "rearrangements.json")
+    equationRegistry.RearrangementCache(path).rearrange("Waves", "f")
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    data["entries"]["Waves|f"]["simplified"] = ["__import__('os').getcwd()"]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+
+    entry, solutions = equationRegistry.RearrangementCache(path).rearrange("Waves", "f")
+    assert solutions == [sympy.Symbol("c") / sympy.Symbol("λ")]
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file)["entries"]["Waves|f"] == entry
+
+
+def test_cache_from_another_version_is_thrown_away(tmp_path):
+    path = tmp_path / "rearrangements.json"
+    path.write_text(json.dumps({"version": equationRegistry.CACHE_VERSION + 1, "sympy": sympy.__version__,
+                                "entries": {"Waves|f": {}}}), encoding="utf-8")
+    cache = equationRegistry.RearrangementCache(str(path))
+    cache.load()
+    assert cache.entries == {}
+
+
+@pytest.mark.parametrize("expression", [
+    suvat.SUVAT_EQUATIONS["SUAT"].rhs,
+    (-sympy.Symbol("u") + sympy.sqrt(sympy.Symbol("u") ** 2 + 2 * sympy.Symbol("a") * sympy.Symbol("s"))) / sympy.Symbol("a"),
+    sympy.Rational(-3, 7) * sympy.pi + sympy.I * sympy.Float("0.1", 30),
+    sympy.Abs(sympy.sin(sympy.Symbol("λ"))) + sympy.log(sympy.E),
+])
+def test_parse_srepr_round_trip(expression):
+    assert equationRegistry.parse_srepr(sympy.srepr(expression)) == expression
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os').system('echo hello')",
+    "Symbol('x').__class__",
+    "Function('f')(Symbol('x'))",
+    "Add(Symbol('x'), 'os.getcwd()')",
+    "Symbol(Symbol('x'))",
+    "Float('1.0', precision='x')",
+    "Symbol('x', real=True)",
+    "lambda: 1",
+    "Integer(1",
+    "1",
+])
+def test_parse_srepr_rejects_other_code(text):
+    with pytest.raises(ValueError):
+        equationRegistry.parse_srepr(text)
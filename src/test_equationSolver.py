@@ -0,0 +1,90 @@
+"""
+Tests for the equation solver screens. Each test clicks 'Solve' through the menu system, as the user would.
+"""
+import threading
+import time
+import menus
+import solverJobs
+
+
+def click_solve(solver, screen):
+    """
+    Clicks the solver's 'Solve' button and returns the menu that the menu system shows next.
+    """
+    solver.menu_buttons[2].clicked = True
+    return menus.update_menu_system(solver, [], screen)
+
+
+def wait_for_answer(solver, timeout=30.0):
+    """
+    Polls the solver until its answer is no longer "solving..." and returns the answer text.
+    """
+    deadline = time.monotonic() + timeout
+    while solver.job is not None and time.monotonic() < deadline:
+        solver.poll_solve()
+        time.sleep(0.01)
+    return solver.menu_buttons[5].text
+
+
+def test_waves_default_fields_show_an_error(screen):
+    solver = menus.get_screen("EqSol Waves", screen)
+    assert click_solve(solver, screen) is solver
+    assert solver.menu_buttons[5].text == "Answer: c must be a number or '?'"
+    assert solver.job is None
+
+
+def test_waves_without_an_unknown_shows_an_error(screen):
+    solver = menus.get_screen("EqSol Waves", screen)
+    for box, text in zip(solver.variable_buttons, ["3", "2", "1.5"]):
+        box.text = text
+    click_solve(solver, screen)
+    assert solver.menu_buttons[5].text == "Answer: enter '?' for the variable to solve for"
+
+
+def test_waves_solves_for_the_unknown(screen):
+    solver = menus.get_screen("EqSol Waves", screen)
+    for box, text in zip(solver.variable_buttons, ["?", "50", "2"]):
+        box.text = text
+    click_solve(solver, screen)
+    assert wait_for_answer(solver) == "Answer: c = 100.00 (2 d.p)"
+
+
+def test_suvat_default_fields_show_an_error(screen):
+    solver = menus.get_screen("EqSol SUVAT", screen)
+    assert click_solve(solver, screen) is solver
+    assert solver.menu_buttons[5].text == "Answer: S must be a number, '?' or 'X'"
+    assert solver.job is None
+
+
+def test_suvat_without_a_missing_variable_shows_an_error(screen):
+    solver = menus.get_screen("EqSol SUVAT", screen)
+    for box, text in zip(solver.variable_buttons, ["?", "0", "10", "2", "5"]):
+        box.text = text
+    click_solve(solver, screen)
+    assert solver.menu_buttons[5].text == "Answer: enter 'X' for the missing variable and '?' for the unknown"
+
+
+def test_suvat_solves_for_the_unknown(screen):
+    solver = menus.get_screen("EqSol SUVAT", screen)
+    # s = ut + at^2 / 2 with u = 0, a = 2 and t = 5.
+    for box, text in zip(solver.variable_buttons, ["?", "0", "X", "2", "5"]):
+        box.text = text
+    click_solve(solver, screen)
+    assert wait_for_answer(solver) == "Answer: s = 25.00 (2 d.p)"
+
+
+def test_no_free_worker_is_shown_in_the_answer(screen, monkeypatch):
+    pool = solverJobs.SolverPool(1)
+    started, release = threading.Event(), threading.Event()
+    stuck = pool.submit(lambda: started.set() or release.wait(), timeout=0.1)
+    assert started.wait(5)
+    while stuck.poll() != "timed out":
+        time.sleep(0.01)
+    monkeypatch.setattr(solverJobs, "POOL", pool)
+
+    solver = menus.get_screen("EqSol Waves", screen)
+    for box, text in zip(solver.variable_buttons, ["?", "50", "2"]):
+        box.text = text
+    click_solve(solver, screen)
+    assert wait_for_answer(solver, timeout=1.0) == "Answer: no solver is free, earlier solves are still running"
+    release.set()
@@ -0,0 +1,35 @@
+"""
+Checks the main loop in 'main' on a screen that is not animated.
+"""
+import pygame
+import pytest
+import main
+import menus
+import simulationLoop
+
+
+class StopLoop(Exception):
+    pass
+
+
+def test_idle_timeout_without_events_does_not_redraw(screen, monkeypatch):
+    waits = []
+    updates = []
+    flips = []
+
+    def wait_for_events(loop, timeout=1000):
+        # The number of updates and redraws when the loop starts to wait.
+        waits.append((len(updates), len(flips)))
+        if len(waits) > 3:
+            raise StopLoop
+        return []
+
+    update_menu_system = menus.update_menu_system
+    monkeypatch.setattr(simulationLoop.FixedTimestepLoop, "wait_for_events", wait_for_events)
+    monkeypatch.setattr(menus, "update_menu_system", lambda *args: updates.append(args) or update_menu_system(*args))
+    monkeypatch.setattr(pygame.display, "update", lambda *args: flips.append(args))
+    with pytest.raises(StopLoop):
+        main.main()
+    # The main menu is drawn when it is opened, and then the three timeouts without any events change nothing.
+    assert waits[0][0] > 0 and waits[0][1] > 0
+    assert waits == [waits[0]] * 4
@@ -0,0 +1,75 @@
+"""
+Checks that the two ways of running 'physics.PointParticleSystem' give the same results.
+"""
+import random
+import numpy as np
+import pytest
+import menus
+import physics
+import profiler
+
+
+def make_system(seed, vectorised, **options):
+    random.seed(seed)
+    return physics.PointParticleSystem(None, vectorised=vectorised, **options)
+
+
+def run(system, steps):
+    for _ in range(steps):
+        system.step()
+    return system.get_state()
+
+
+def test_vectorised_matches_objects_without_collisions():
+    # 3 small particles in a big box do not meet in 500 steps, so only the moves, drag and bounces off of the walls are compared.
+    options = {"particle_num": 3, "particle_size": 2, "bounds": (4000, 4000)}
+    objects = make_system(7, False, **options)
+    arrays = make_system(7, True, **options)
+    object_state, array_state = run(objects, 500), run(arrays, 500)
+    assert objects.collision_count == arrays.collision_count == 0
+    for key in object_state:
+        np.testing.assert_allclose(array_state[key], object_state[key], rtol=1e-9, atol=1e-9)
+
+
+def test_vectorised_matches_objects_until_first_collision():
+    # With this seed the first collision is after 45 steps. After it the order that the two paths collide in is different.
+    options = {"particle_num": 15, "bounds": (400, 400)}
+    objects = make_system(4, False, **options)
+    arrays = make_system(4, True, **options)
+    for steps in range(200):
+        object_state, array_state = run(objects, 1), run(arrays, 1)
+        if objects.collision_count or arrays.collision_count:
+            break
+        for key in object_state:
+            np.testing.assert_allclose(array_state[key], object_state[key], rtol=1e-9, atol=1e-9)
+    assert steps > 10
+    assert objects.collision_count or arrays.collision_count
+
+
+def test_point_particles_screen_uses_objects_and_spatial_hash(screen):
+    system = menus.get_screen("PointP", screen)
+    assert not system.vectorised
+    assert system.broad_phase
+
+
+def test_spatial_hash_matches_pairwise():
+    # The spatial hash only skips pairs that are too far apart to touch, so the collisions are the same as checking every pair.
+    options = {"particle_num": 80, "bounds": (300, 300)}
+    hashed = make_system(2, False, broad_phase=True, **options)
+    pairwise = make_system(2, False, broad_phase=False, **options)
+    hashed_state, pairwise_state = run(hashed, 300), run(pairwise, 300)
+    assert hashed.collision_count == pairwise.collision_count > 0
+    for key in hashed_state:
+        np.testing.assert_array_equal(hashed_state[key], pairwise_state[key])
+
+
+@pytest.mark.parametrize("vectorised, broad_phase", [(True, False), (False, True), (False, False)])
+def test_steps_are_profiled(monkeypatch, vectorised, broad_phase):
+    frame_profiler = profiler.FrameProfiler()
+    frame_profiler.enabled = True
+    monkeypatch.setattr(profiler, "PROFILER", frame_profiler)
+    system = make_system(1, vectorised, particle_num=50, bounds=(300, 300), broad_phase=broad_phase)
+    frame_profiler.begin_frame()
+    system.step()
+    frame_profiler.end_frame()
+    assert {"move", "collisions"} <= frame_profiler.stats().keys()
@@ -0,0 +1,24 @@
+"""
+Checks that the vectorised 'physics.SolarSystem' gives the same results as the original one-object-per-planet code.
+"""
+import random
+import numpy as np
+import pytest
+import integrators
+import physics
+
+
+def make_system(vectorised, integrator):
+    random.seed(5)
+    return physics.SolarSystem(None, body_num=50, vectorised=vectorised, bounds=(800, 800), integrator=integrator)
+
+
+@pytest.mark.parametrize("integrator", list(integrators.INTEGRATORS))
+def test_vectorised_matches_objects(integrator):
+    objects, arrays = make_system(False, integrator), make_system(True, integrator)
+    for _ in range(300):
+        objects.step()
+        arrays.step()
+    object_state, array_state = objects.get_state(), arrays.get_state()
+    for key in object_state:
+        np.testing.assert_allclose(array_state[key], object_state[key], rtol=1e-7, atol=1e-6)
@@ -0,0 +1,81 @@
+"""
+Checks the worker threads in 'solverJobs', including what happens when a job never finishes.
+"""
+import threading
+import time
+import solverJobs
+
+
+def wait_for(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.poll() in ("pending", "running") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.poll()
+
+
+def submit_stuck_job(pool, release):
+    """
+    Submits a job that runs until 'release' is set and waits until it has started and timed out.
+    """
+    started = threading.Event()
+    job = pool.submit(lambda: started.set() or release.wait(), timeout=0.1)
+    assert started.wait(5)
+    assert wait_for(job) == "timed out"
+    return job
+
+
+def stuck_pool(workers):
+    """
+    Returns a pool whose every worker is running a job that has timed out, and the event that lets those jobs finish.
+    """
+    pool = solverJobs.SolverPool(workers)
+    release = threading.Event()
+    for _ in range(workers):
+        submit_stuck_job(pool, release)
+    return pool, release
+
+
+def test_jobs_run_in_order():
+    pool = solverJobs.SolverPool(2)
+    jobs = [pool.submit(pow, 2, power) for power in range(5)]
+    assert [wait_for(job) for job in jobs] == ["done"] * 5
+    assert [job.result for job in jobs] == [1, 2, 4, 8, 16]
+
+
+def test_failed_and_cancelled_jobs():
+    pool = solverJobs.SolverPool(1)
+    failed = pool.submit(int, "x")
+    assert wait_for(failed) == "failed"
+    assert isinstance(failed.error, ValueError)
+    release = threading.Event()
+    running = pool.submit(release.wait)
+    cancelled = pool.submit(pow, 2, 3)
+    cancelled.cancel()
+    release.set()
+    assert wait_for(running) == "done"
+    assert cancelled.poll() == "cancelled" and cancelled.result is None
+
+
+def test_no_worker_when_every_worker_is_stuck():
+    pool, release = stuck_pool(2)
+    assert pool.stuck_workers() == 2
+    job = pool.submit(pow, 2, 3)
+    assert job.poll() == "no worker"
+
+    # Once a stuck job finishes its worker can run jobs again.
+    release.set()
+    deadline = time.monotonic() + 5
+    while pool.stuck_workers() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    job = pool.submit(pow, 2, 3)
+    assert wait_for(job) == "done" and job.result == 8
+
+
+def test_one_stuck_worker_leaves_the_other_free():
+    pool = solverJobs.SolverPool(2)
+    release = threading.Event()
+    submit_stuck_job(pool, release)
+    assert pool.stuck_workers() == 1
+    job = pool.submit(pow, 2, 3)
+    assert wait_for(job) == "done"
+    release.set()
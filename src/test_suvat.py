@@ -0,0 +1,46 @@
+"""
+Checks every SUVAT rearrangement in 'suvat' against a motion where all five values are known.
+"""
+import numpy as np
+import pytest
+import sympy
+import suvat
+
+# u = 3 and a = 2 for t = 4 gives v = u + at = 11 and s = ut + at^2/2 = 28.
+VALUES = {"s": 28.0, "u": 3.0, "v": 11.0, "a": 2.0, "t": 4.0}
+PAIRS = [(missing, unknown) for missing in suvat.VARIABLE_NAMES for unknown in suvat.VARIABLE_NAMES if missing != unknown]
+
+
+@pytest.mark.parametrize("missing, unknown", PAIRS)
+def test_solve(missing, unknown):
+    known = {name: VALUES[name] for name in suvat.VARIABLE_NAMES if name not in (missing, unknown)}
+    value, rearrangement, _ = suvat.solve(missing, unknown, known)
+    assert rearrangement.known == list(known)
+    if missing == "t" and unknown in ("u", "v"):
+        # Without 't' the only equation is v^2 = u^2 + 2as, which cannot tell the sign of 'u' or 'v'.
+        assert abs(value) == pytest.approx(VALUES[unknown])
+    else:
+        assert value == pytest.approx(VALUES[unknown])
+
+
+@pytest.mark.parametrize("name", ["SUAT", "SVAT"])
+def test_equations_without_u_or_v_use_a(name):
+    assert sympy.Symbol("a") in suvat.SUVAT_EQUATIONS[name].free_symbols
+
+
+def test_solve_many_matches_solve():
+    missing, unknown = zip(*PAIRS)
+    values = np.tile([VALUES[name] for name in suvat.VARIABLE_NAMES], (len(PAIRS), 1))
+    answers, indexes = suvat.solve_many(missing, unknown, values)
+    for row, pair in enumerate(PAIRS):
+        known = {name: VALUES[name] for name in suvat.VARIABLE_NAMES if name not in pair}
+        value, _, index = suvat.solve(*pair, known)
+        assert answers[row] == pytest.approx(value)
+        assert indexes[row] == index
+
+
+def test_unknown_variable_is_rejected():
+    with pytest.raises(ValueError):
+        suvat.get_rearrangement("s", "s")
+    with pytest.raises(ValueError):
+        suvat.solve_many("x", "s", np.zeros((1, 5)))
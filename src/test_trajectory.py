@@ -0,0 +1,95 @@
+"""
+Checks that a trajectory written by 'trajectory.TrajectoryRecorder' reads back the same positions that were recorded.
+"""
+import random
+import numpy as np
+import pytest
+import physics
+import trajectory
+
+
+def record(path, steps, keyframe_interval):
+    random.seed(1)
+    system = physics.SolarSystem(None, body_num=40, bounds=(800, 800), physics_rate=12)
+    recorder = trajectory.TrajectoryRecorder(str(path), system, steps, keyframe_interval)
+    states = [system.get_state()]
+    for _ in range(steps):
+        system.step()
+        recorder.record(system)
+        states.append(system.get_state())
+    recorder.close()
+    return system, states
+
+
+@pytest.mark.parametrize("keyframe_interval", [1, 3])
+def test_round_trip(tmp_path, keyframe_interval):
+    path = tmp_path / "solar.traj"
+    system, states = record(path, 30, keyframe_interval)
+    recording = trajectory.TrajectoryFile(str(path))
+    assert recording.metadata["system"] == "SolarSystem"
+    assert recording.metadata["physics_rate"] == 12
+    assert recording.step_count == 30
+    radius, colour = system.get_appearance()
+    np.testing.assert_array_equal(recording.radius, radius.astype(np.float32))
+    np.testing.assert_array_equal(recording.colour, colour)
+    for step in range(0, 31, keyframe_interval):
+        expected = np.stack([states[step]["x"], states[step]["y"]], axis=1).astype(np.float32)
+        np.testing.assert_array_equal(recording.positions(step), expected)
+
+
+def test_steps_between_keyframes_are_interpolated(tmp_path):
+    path = tmp_path / "solar.traj"
+    record(path, 30, 3)
+    recording = trajectory.TrajectoryFile(str(path))
+    np.testing.assert_allclose(recording.positions(4), recording.frames[1] + (recording.frames[2] - recording.frames[1]) / 3,
+                               rtol=1e-6)
+    np.testing.assert_array_equal(recording.positions(100), recording.positions(30))
+
+
+def test_replay_seeks_to_any_step(tmp_path, screen):
+    path = tmp_path / "solar.traj"
+    record(path, 30, 1)
+    replay = trajectory.TrajectoryReplay(screen, str(path), back_button=True)
+    assert replay.physics_rate == 12
+    replay.seek(20)
+    replay.update_menu([])
+    assert replay.title.text == "Step 20 / 30"
+    replay.seek(1000)
+    assert replay.current_step == 30
+
+
+def test_file_grows_with_the_recording_and_is_released_on_close(tmp_path):
+    path = tmp_path / "solar.traj"
+    steps = 2 * trajectory.INITIAL_FRAMES + 10
+    system, states = record(path, steps, 1)
+    recording = trajectory.TrajectoryFile(str(path))
+    assert recording.frame_count == steps + 1
+    assert path.stat().st_size == trajectory._layout(40)[2] + (steps + 1) * 40 * 2 * 4
+    expected = np.stack([states[-1]["x"], states[-1]["y"]], axis=1).astype(np.float32)
+    np.testing.assert_array_equal(recording.positions(steps), expected)
+
+
+def test_closed_recorder_lets_go_of_the_file(tmp_path):
+    path = tmp_path / "solar.traj"
+    system = physics.SolarSystem(None, body_num=5, bounds=(800, 800))
+    recorder = trajectory.TrajectoryRecorder(str(path), system, 100)
+    recorder.close()
+    recorder.close()
+    assert recorder.frames is None and recorder.frame_count is None
+    assert recorder.is_full()
+    path.unlink()
+
+
+def test_record_and_replay_buttons_use_the_data_folder(screen):
+    import menus
+
+    system = menus.handle_record_clicked(menus.get_screen("PointP", screen), [], screen)
+    for _ in range(5):
+        system.step()
+    system = menus.handle_record_clicked(system, [], screen)
+    assert system.recorder is None
+    path = menus.get_recording_path("PointP")
+    assert path.startswith(trajectory.default_recording_folder())
+    assert trajectory.TrajectoryFile(path).step_count == 5
+    replay = menus.handle_replay_clicked(system, [], screen)
+    assert isinstance(replay, trajectory.TrajectoryReplay)
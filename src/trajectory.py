@@ -0,0 +1,333 @@
+"""
+Records the positions of every body in a simulation to a memory-mapped file and replays them without running any of the physics.
+Every recorded frame takes up the same number of bytes, so the frame for any step is found directly from its position in the file,
+which means a replay can jump to any step instantly, e.g.:
+    python batchRun.py solar --steps 100000 --record solar.traj --keyframe-interval 10
+    python trajectory.py solar.traj
+In the program itself, the 'Record' button on the 'Solar System' and 'Point Particles' screens records the simulation and the
+'Replay' button opens a 'TrajectoryReplay' screen of the last recording (see 'menus.handle_record_clicked'). These recordings are
+kept in the user's own data folder (see 'default_recording_folder').
+"""
+import argparse
+import json
+import math
+import os
+import numpy as np
+import pygame
+import buttons
+import rendering
+
+MAGIC = b"PPSTRAJ\x00"
+VERSION = 1
+# The file starts with a fixed size header: the magic bytes, the number of frames recorded so far (which is updated as the
+# recording goes on), then the length of and the JSON metadata itself.
+HEADER_SIZE = 4096
+# The file is made big enough for this many frames at first and then doubled in size whenever it is full, so a short recording
+# only takes up the space that it needs instead of the space for 'max_steps'.
+INITIAL_FRAMES = 256
+RECORDING_DIRECTORY_VARIABLE = "PHYSICS_HELPER_DATA_DIR"
+
+
+def default_recording_folder() -> str:
+    """
+    Returns the folder that the program's recordings are kept in: the folder named by the 'PHYSICS_HELPER_DATA_DIR' environment
+    variable if it is set, otherwise a 'physics-helper' folder in the user's data folder (%LOCALAPPDATA% on Windows, otherwise
+    $XDG_DATA_HOME or ~/.local/share). The folder is only made when the first recording is started.
+    """
+    folder = os.environ.get(RECORDING_DIRECTORY_VARIABLE)
+    if not folder:
+        user_data = os.environ.get("LOCALAPPDATA") if os.name == "nt" else os.environ.get("XDG_DATA_HOME")
+        folder = os.path.join(user_data or os.path.join(os.path.expanduser("~"), ".local", "share"), "physics-helper")
+    return folder
+
+
+def _layout(body_num: int) -> tuple:
+    """
+    Returns the byte offsets of the body radii, the body colours and the frames for a file with 'body_num' bodies.
+    """
+    radius_offset = HEADER_SIZE
+    colour_offset = radius_offset + 4 * body_num
+    frames_offset = colour_offset + 8 * math.ceil(3 * body_num / 8)
+    return radius_offset, colour_offset, frames_offset
+
+
+class TrajectoryRecorder:
+    """
+    Writes the positions of a simulation's bodies to a memory-mapped trajectory file. The file is made bigger in large blocks (see
+    'INITIAL_FRAMES'), so writing a frame is nearly always just a copy into memory that the operating system saves to disk in the
+    background. When the recorder is closed the file is cut down to the frames that were written.
+    """
+    def __init__(self: object, path: str, system: object, max_steps: int, keyframe_interval=1) -> object:
+        """
+        path: str
+            - the file that the trajectory is written to, it is overwritten if it already exists.
+        system: simulation object
+            - any simulation with 'get_state' and 'get_appearance' methods (e.g. 'SolarSystem' or 'PointParticleSystem').
+            - its current state is written as the first frame.
+        max_steps: int
+            - the most steps that will be recorded, the file never grows bigger than this many steps.
+        keyframe_interval: int [1]
+            - a frame is written every 'keyframe_interval' steps.
+            - the steps in between are drawn part way between the two frames either side of them during a replay.
+        """
+        radius, colour = system.get_appearance()
+        self.body_num = len(radius)
+        self.keyframe_interval = keyframe_interval
+        self.max_frames = max_steps // keyframe_interval + 1
+        self.step_count = 0
+
+        metadata = json.dumps({"version": VERSION, "body_num": self.body_num, "max_frames": self.max_frames,
+                               "keyframe_interval": keyframe_interval, "system": type(system).__name__,
+                               "physics_rate": getattr(system, "physics_rate", None)}).encode()
+        if len(metadata) > HEADER_SIZE - 20:
+            raise ValueError("Trajectory metadata does not fit in the header")
+        radius_offset, colour_offset, self.frames_offset = _layout(self.body_num)
+        self.path = path
+        self.capacity = min(self.max_frames, INITIAL_FRAMES)
+
+        with open(path, "wb") as file:
+            file.write(MAGIC + np.uint64(0).tobytes() + np.uint32(len(metadata)).tobytes() + metadata)
+            file.truncate(self.file_size(self.capacity))
+
+        np.memmap(path, np.float32, "r+", radius_offset, (self.body_num,))[:] = radius
+        np.memmap(path, np.uint8, "r+", colour_offset, (self.body_num, 3))[:] = colour
+        self.frame_count = np.memmap(path, np.uint64, "r+", 8, (1,))
+        self.frames = np.memmap(path, np.float32, "r+", self.frames_offset, (self.capacity, self.body_num, 2))
+        self.write_frame(system)
+
+    def file_size(self: object, frames: int) -> int:
+        """
+        Returns the size in bytes of the file with room for 'frames' frames.
+        """
+        return self.frames_offset + frames * self.body_num * 2 * 4
+
+    def release(self: object) -> None:
+        """
+        Saves the memory-mapped parts of the file to disk and lets go of them. The file cannot be resized while it is mapped, and
+        on Windows it cannot be deleted or written to by anything else either, so this is done before either of those.
+        """
+        self.frames.flush()
+        self.frame_count.flush()
+        # The memory maps are closed when the last reference to them goes, and nothing else keeps a reference to them.
+        self.frames = None
+        self.frame_count = None
+
+    def resize(self: object, frames: int) -> None:
+        """
+        Changes the size of the file to fit 'frames' frames.
+        """
+        with open(self.path, "r+b") as file:
+            file.truncate(self.file_size(frames))
+
+    def write_frame(self: object, system: object) -> None:
+        frame = int(self.frame_count[0])
+        if frame >= self.max_frames:
+            raise ValueError("The trajectory file is full, create the recorder with a larger 'max_steps'")
+        if frame >= self.capacity:
+            self.release()
+            self.capacity = min(self.max_frames, 2 * self.capacity)
+            self.resize(self.capacity)
+            self.frame_count = np.memmap(self.path, np.uint64, "r+", 8, (1,))
+            self.frames = np.memmap(self.path, np.float32, "r+", self.frames_offset, (self.capacity, self.body_num, 2))
+        state = system.get_state()
+        self.frames[frame, :, 0] = state["x"]
+        self.frames[frame, :, 1] = state["y"]
+        self.frame_count[0] = frame + 1
+
+    def record(self: object, system: object) -> None:
+        """
+        This method should be called after every step of the simulation. It writes a frame every 'keyframe_interval' steps.
+        """
+        self.step_count += 1
+        if self.step_count % self.keyframe_interval == 0:
+            self.write_frame(system)
+
+    def is_full(self: object) -> bool:
+        """
+        Returns True if every frame in the file has been written or the recorder has been closed, after which nothing more can be
+        recorded.
+        """
+        return self.frame_count is None or int(self.frame_count[0]) >= self.max_frames
+
+    def close(self: object) -> None:
+        """
+        Finishes the recording: saves it, closes the file and cuts it down to the frames that were written. Nothing more can be
+        recorded after this.
+        """
+        if self.frames is None:
+            return
+        frame_count = int(self.frame_count[0])
+        self.release()
+        self.resize(frame_count)
+
+
+class TrajectoryFile:
+    """
+    Reads a trajectory file written by 'TrajectoryRecorder'. The frames are memory-mapped, so only the frames that are used are
+    read from disk.
+    """
+    def __init__(self: object, path: str) -> object:
+        with open(path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+        if header[:8] != MAGIC:
+            raise ValueError(f"'{path}' is not a trajectory file")
+        metadata_length = int(np.frombuffer(header[16:20], np.uint32)[0])
+        self.metadata = json.loads(header[20:20 + metadata_length])
+        if self.metadata["version"] != VERSION:
+            raise ValueError(f"'{path}' is trajectory version {self.metadata['version']}, expected version {VERSION}")
+
+        self.body_num = self.metadata["body_num"]
+        self.keyframe_interval = self.metadata["keyframe_interval"]
+        radius_offset, colour_offset, frames_offset = _layout(self.body_num)
+        self.frame_count = int(np.frombuffer(header[8:16], np.uint64)[0])
+        self.radius = np.memmap(path, np.float32, "r", radius_offset, (self.body_num,))
+        self.colour = np.memmap(path, np.uint8, "r", colour_offset, (self.body_num, 3))
+        # Only the frames that had been written when the file was opened are read, as the rest of the file may not exist.
+        self.frames = np.memmap(path, np.float32, "r", frames_offset, (self.frame_count, self.body_num, 2))
+        # The last step that can be replayed.
+        self.step_count = (self.frame_count - 1) * self.keyframe_interval
+
+    def positions(self: object, step: float) -> np.ndarray:
+        """
+        Returns an array of the (x, y) position of every body at the given step. If the step falls between two keyframes then the
+        positions are interpolated between them.
+        """
+        step = min(max(step, 0), self.step_count)
+        frame, remainder = divmod(step, self.keyframe_interval)
+        frame = int(frame)
+        if remainder == 0 or frame + 1 >= self.frame_count:
+            return self.frames[frame]
+        fraction = remainder / self.keyframe_interval
+        return self.frames[frame] + fraction * (self.frames[frame + 1] - self.frames[frame])
+
+
+class TrajectoryReplay:
+    """
+    This is a screen that plays back a trajectory file. It has the same 'step' and 'update_menu' methods as the simulations, so it
+    can be driven by the same fixed timestep loop, but each step is only a jump to a new place in the file.
+    Controls: space plays/pauses, the left and right arrow keys jump back and forward by 1% of the run, ',' and '.' move by a single
+    step, and clicking or dragging on the bar at the bottom of the screen jumps to that point.
+    """
+    def __init__(self: object, screen: object, path: str, steps_per_frame=1, back_button=False) -> object:
+        """
+        screen: pygame screen object
+            - used as the pygame surface that the bodies and buttons are drawn to.
+        path: str
+            - the trajectory file to replay.
+        steps_per_frame: int [1]
+            - how many recorded steps the replay moves forward by on each call to 'step'.
+        back_button: bool [False]
+            - if True, then there is a 'Go Back' button so that the replay can be used as a screen of the menu system.
+        """
+        self.screen = screen
+        self.trajectory = TrajectoryFile(path)
+        self.steps_per_frame = steps_per_frame
+        # The replay is stepped as often as the simulation was, so that it plays back at the same speed.
+        self.physics_rate = self.trajectory.metadata.get("physics_rate")
+        self.current_step = 0
+        self.previous_step = 0
+        self.playing = True
+        self.dragging = False
+        self.alpha = 1.0
+        # The replay only needs to be redrawn on every frame while it is playing, when it is paused it is only redrawn on input.
+        self.animated = True
+        radius = self.trajectory.radius.astype(np.int64)
+        # Only the bodies with a radius of at least 1 pixel are drawn, each with its circle sprite from the shared cache.
+        self.drawn = np.flatnonzero(radius >= 1)
+        self.radius = radius[self.drawn]
+        self.sprites = rendering.SPRITES.get_many(self.trajectory.colour[self.drawn].tolist(), self.radius.tolist())
+
+        self.timeline = pygame.Rect(20, screen.get_height() - 30, screen.get_width() - 40, 12)
+        self.title = buttons.TextButton(screen, [screen.get_width() // 2, 30], 400, 40, (87, 201, 242), (18, 49, 227), 3, "Arial",
+                                        20, "", (0, 0, 0), False)
+        self.button_ls = [self.title]
+        if back_button:
+            self.button_ls.append(buttons.TextButton(screen, [screen.get_width() - 100, 50], 150, 80, (87, 201, 242),
+                                                     (18, 49, 227), 3, "Arial", 20, "Go Back", (0, 0, 0)))
+
+    def seek(self: object, step: int) -> None:
+        """
+        Jumps straight to the given step.
+        """
+        self.current_step = min(max(int(step), 0), self.trajectory.step_count)
+        self.previous_step = self.current_step
+
+    def step(self: object) -> None:
+        self.previous_step = self.current_step
+        if self.playing:
+            self.current_step = min(self.current_step + self.steps_per_frame, self.trajectory.step_count)
+
+    def handle_events(self: object, events) -> None:
+        jump = max(self.trajectory.step_count // 100, 1)
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.playing = not self.playing
+                elif event.key == pygame.K_LEFT:
+                    self.seek(self.current_step - jump)
+                elif event.key == pygame.K_RIGHT:
+                    self.seek(self.current_step + jump)
+                elif event.key == pygame.K_COMMA:
+                    self.seek(self.current_step - 1)
+                elif event.key == pygame.K_PERIOD:
+                    self.seek(self.current_step + 1)
+            elif event.type == pygame.MOUSEBUTTONDOWN and self.timeline.collidepoint(event.pos):
+                self.dragging = True
+            elif event.type == pygame.MOUSEBUTTONUP:
+                self.dragging = False
+
+        if self.dragging:
+            fraction = (pygame.mouse.get_pos()[0] - self.timeline.left) / self.timeline.width
+            self.seek(fraction * self.trajectory.step_count)
+        self.animated = self.playing and self.current_step < self.trajectory.step_count
+
+    def draw(self: object) -> None:
+        step = self.previous_step + self.alpha * (self.current_step - self.previous_step)
+        positions = self.trajectory.positions(step)[self.drawn].astype(np.int64)
+        rendering.draw_sprites(self.screen, self.sprites, (positions[:, 0] - self.radius).tolist(),
+                               (positions[:, 1] - self.radius).tolist())
+
+        pygame.draw.rect(self.screen, (50, 50, 50), self.timeline)
+        progress = self.current_step / max(self.trajectory.step_count, 1)
+        pygame.draw.rect(self.screen, (87, 201, 242), (self.timeline.left, self.timeline.top, int(self.timeline.width * progress),
+                                                       self.timeline.height))
+
+    def update_menu(self: object, events) -> None:
+        self.handle_events(events)
+        self.draw()
+        self.title.text = f"Step {self.current_step} / {self.trajectory.step_count}" + ("" if self.playing else " (paused)")
+        for button in self.button_ls:
+            button.update(events)
+            button.draw()
+
+
+def main():
+    import simulationLoop
+
+    parser = argparse.ArgumentParser(description="Replay a recorded trajectory file.")
+    parser.add_argument("path")
+    parser.add_argument("--steps-per-frame", type=int, default=1)
+    parser.add_argument("--frame-rate", type=int, default=60)
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((800, 650))
+    replay = TrajectoryReplay(screen, args.path, args.steps_per_frame)
+    loop = simulationLoop.FixedTimestepLoop(args.frame_rate, 5, args.frame_rate)
+
+    while True:
+        frame_time = loop.tick()
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return
+        loop.advance(replay.step, frame_time)
+        replay.alpha = loop.alpha
+        replay.update_menu(events)
+        pygame.display.update()
+        screen.fill((0, 0, 0))
+
+
+if __name__ == "__main__":
+    main()